@@ -1,206 +1,114 @@
 # app.py  (PSL 2.0 AI Match Predictor + Compliance Monitor)
 # ---------------------------------------------------------
 # Includes:
-# - Two Tabs at top (Predictor / Compliance)
+# - Tabs at top (Predictor / Compliance / Season Projection)
 # - Compliance reads PSL02_Compliance_Log.xlsx (Matches + Appearances)
+# - Model code lives in the psl package (no Streamlit); this file is only the UI
 # - FIXED: Name matching via PlayerKey normalization (handles A.H. Asad Mughni vs Asad Mughni, (vc), dots, etc.)
 # - FIXED: Clear file diagnostics (shows which file is being read, sheets, and row counts)
 # ---------------------------------------------------------
 
-import os, base64, re
+import base64
 import numpy as np
 import pandas as pd
 import streamlit as st
-from PIL import Image
 import altair as alt
 
+from psl.config import (
+    BG_IMAGE, BRAND_IMAGE, BG_WIDTHS, BRAND_HEIGHT, STATIC_URL,
+    LOGO_TILE_PX, LOGO_HEADER_PX, MIN_MATCHES_REQUIRED,
+)
+from psl.assets import logo_bytes, logo_sprite, image_variant, publish_static
+from psl.tournament import QUALIFY_TOP
+from psl import profiling
+from psl.profiling import timed
+from psl import (
+    load_squads, build_player_ratings_and_components, rating_index, best_xi, predict_match,
+    simulate_xi_match, matchup_matrix, season_projection, load_compliance_index,
+)
+
 # ----------------------------
 # App Config
 # ----------------------------
 st.set_page_config(page_title="PSL 2.0 AI Match Predictor", layout="wide")
-
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-SQUADS_XLSX = os.path.join(BASE_DIR, "PSL_Team_Players.xlsx")
-BG_IMAGE = os.path.join(BASE_DIR, "assets", "bg.jpg")
-BRAND_IMAGE = os.path.join(BASE_DIR, "assets", "PSL brand.jpg")
-LOGO_DIR = os.path.join(BASE_DIR, "team logos")
-
-S01 = {
-    "bat": os.path.join(BASE_DIR, "Season 01", "1441602_batting_leaderboard.csv"),
-    "bowl": os.path.join(BASE_DIR, "Season 01", "1441602_bowling_leaderboard.csv"),
-    "field": os.path.join(BASE_DIR, "Season 01", "1441602_fielding_leaderboard.csv"),
-    "mvp": os.path.join(BASE_DIR, "Season 01", "1441602_mvp_leaderboard.csv"),
-}
-S02 = {
-    "bat": os.path.join(BASE_DIR, "Season 02", "1786448_batting_leaderboard.csv"),
-    "bowl": os.path.join(BASE_DIR, "Season 02", "1786448_bowling_leaderboard.csv"),
-    "field": os.path.join(BASE_DIR, "Season 02", "1786448_fielding_leaderboard.csv"),
-    "mvp": os.path.join(BASE_DIR, "Season 02", "1786448_mvp_leaderboard.csv"),
-}
-
-TEAM_LOGOS = {
-    "Bubak Blasters": "Bubak.jpg",
-    "Fazilpur Falcons": "Fazilpur.jpg",
-    "Kot Bahadur Shah Bulls": "KBS.jpg",
-    "Keamari Kings": "Keamari.jpg",
-    "Mahmoodkot Mavericks": "MKM.jpg",
-    "Macchike Mustangs": "Mustangs.jpg",
-    "Port Qasim Panthers": "PortQasim.jpg",
-    "Shikarpur Stallions": "Shikarpur.jpg",
-}
-
-# Compliance file (you update after every match)
-COMPLIANCE_XLSX = os.path.join(BASE_DIR, "PSL02_Compliance_Log.xlsx")
-MIN_MATCHES_REQUIRED = 2
-
-# ----------------------------
-# Model settings
-# ----------------------------
-W_RECENT = 0.68
-W_BAT, W_BOWL, W_FIELD, W_MVP = 0.40, 0.40, 0.10, 0.10
-PROB_SCALE = 3.2
+profiling.begin_run()   # PSL_PROFILE=1 to record; see the profiler panel at the bottom
 
 # ----------------------------
 # Helpers
 # ----------------------------
-def file_to_base64(path: str) -> str:
-    try:
-        with open(path, "rb") as f:
-            return base64.b64encode(f.read()).decode()
-    except:
-        return ""
-
-def to_num(x):
-    try:
-        return float(str(x).replace(",", "").strip())
-    except:
-        return 0.0
-
-def zscore(series: pd.Series) -> pd.Series:
-    v = series.astype(float)
-    mu = v.mean()
-    sd = v.std(ddof=0)
-    if sd == 0 or np.isnan(sd):
-        sd = 1.0
-    out = (v - mu) / sd
-    return out.replace([np.inf, -np.inf], 0).fillna(0)
-
-def sigmoid(x):
-    if np.isnan(x) or np.isinf(x):
-        return 0.5
-    return float(1 / (1 + np.exp(-x)))
-
-def pick_name_col(df: pd.DataFrame) -> str:
-    cols = list(df.columns)
-    for c in cols:
-        if str(c).strip().lower() in ["player", "player name", "name", "batsman", "bowler", "fielder"]:
-            return c
-    for c in cols:
-        if "player" in str(c).lower() or "name" in str(c).lower():
-            return c
-    return cols[0]
-
-def find_col(df: pd.DataFrame, options):
-    cols_lower = [str(c).lower() for c in df.columns]
-    for opt in options:
-        if opt.lower() in cols_lower:
-            return df.columns[cols_lower.index(opt.lower())]
-    for opt in options:
-        for i, c in enumerate(cols_lower):
-            if opt.lower() in c:
-                return df.columns[i]
-    return None
-
-def get_logo(team_name: str):
-    fn = TEAM_LOGOS.get(team_name)
-    if not fn:
-        return None
-    path = os.path.join(LOGO_DIR, fn)
-    if os.path.exists(path):
-        try:
-            return Image.open(path)
-        except:
-            return None
-    return None
-
-def best_xi(team_squad, ratings_df, n=11):
-    valid = [p for p in team_squad if p in ratings_df.index]
-    valid_sorted = sorted(valid, key=lambda p: float(ratings_df.loc[p, "rating"]), reverse=True)
-    return valid_sorted[:n]
-
-def team_strength(xi, ratings_df):
-    s = 0.0
-    for p in xi:
-        if p in ratings_df.index:
-            v = float(ratings_df.loc[p, "rating"])
-            if not np.isnan(v) and not np.isinf(v):
-                s += v
-    return float(s) if (not np.isnan(s) and not np.isinf(s)) else 0.0
-
-# --- Name normalization to match squad vs appearances ---
-# Handles: "A.H. Asad Mughni" vs "Asad Mughni", "(vc)", dots, extra spaces, etc.
-def clean_name(s: str) -> str:
-    s = str(s).strip().lower()
-    s = re.sub(r"\(.*?\)", " ", s)          # remove (vc), (c), etc
-    s = re.sub(r"[^a-z\s]", " ", s)         # remove dots/numbers/specials
-    s = re.sub(r"\s+", " ", s).strip()
-    # remove single-letter initials (a h asad -> asad) but keep normal names
-    parts = [p for p in s.split() if len(p) > 1]
-    return " ".join(parts)
-
-# ----------------------------
-# Data Load
-# ----------------------------
-@st.cache_data(show_spinner=False)
-def load_squads():
-    df = pd.read_excel(SQUADS_XLSX, sheet_name="Team Players")
-
-    # Required cols
-    df["Team"] = df["Team"].astype(str).str.strip()
-    df["Player"] = df["Player"].astype(str).str.strip()
-
-    # Optional Role col
-    if "Role" in df.columns:
-        df["Role"] = df["Role"].astype(str).str.strip()
-    else:
-        df["Role"] = ""
-
-    df = df[(df["Team"] != "") & (df["Team"].str.lower() != "nan") &
-            (df["Player"] != "") & (df["Player"].str.lower() != "nan")]
-    return df
-
+STATIC_SERVING = bool(st.get_option("server.enableStaticServing"))
+
+def data_uri(data, mime: str) -> str:
+    return f"data:{mime};base64,{base64.b64encode(data).decode()}" if data else ""
+
+def asset_url(stem: str, data, ext: str, mime: str) -> str:
+    """app/static URL for `data` when static serving is on, else an inline data URI."""
+    if data and STATIC_SERVING:
+        name = publish_static(stem, data, ext)
+        if name:
+            return f"{STATIC_URL}/{name}"
+    return data_uri(data, mime)
+
+@timed()
+def logo_sprite_css(teams) -> dict:
+    """Puts the tile sprite in the page once; returns {team: cell index} for team_tile_grid."""
+    sprite, cells = logo_sprite(teams, LOGO_TILE_PX)
+    n = max(len(teams), 1)
+    st.markdown(
+        f"<style>.logoSprite {{ background-image: url('{asset_url('logos', sprite, 'webp', 'image/webp')}');"
+        f" background-size: {n * 100}% 100%; }}</style>",
+        unsafe_allow_html=True,
+    )
+    return cells
 
 # ----------------------------
-# Compliance & Participation (PSL02_Compliance_Log.xlsx)
+# UI: Compliance
 # ----------------------------
-@st.cache_data(show_spinner=False, ttl=10)
-def load_compliance_log(path: str):
-    """Loads Matches + Appearances sheets. TTL keeps it fresh after each match update."""
-    if not os.path.exists(path):
-        return pd.DataFrame(), pd.DataFrame()
-
-    try:
-        matches = pd.read_excel(path, sheet_name="Matches")
-    except Exception:
-        matches = pd.DataFrame()
-
-    try:
-        apps = pd.read_excel(path, sheet_name="Appearances")
-    except Exception:
-        apps = pd.DataFrame()
-
-    if not apps.empty:
-        for c in ["Team", "Player"]:
-            if c in apps.columns:
-                apps[c] = apps[c].astype(str).str.strip()
-        if "MatchID" in apps.columns:
-            apps["MatchID"] = pd.to_numeric(apps["MatchID"], errors="coerce")
-        apps = apps.dropna(subset=[c for c in ["MatchID", "Team", "Player"] if c in apps.columns])
-        apps = apps.drop_duplicates(subset=[c for c in ["MatchID", "Team", "Player"] if c in apps.columns]).reset_index(drop=True)
-
-    return matches, apps
+ALL_TEAMS = "All Teams"
+SHOW_FILTERS = {
+    "Squad": "Squad",
+    "Managers": "Manager",
+    "Mentors": "Mentor",
+    "Supporters": "Supporter",
+    "Brand Ambassadors": "Brand Ambassador",
+}
 
+def all_teams_compliance_view(index: dict, show: str):
+    summary = index["summary"]
+    if summary.empty:
+        st.warning("No matches found in PSL02_Compliance_Log.xlsx.")
+        return
+    if show in SHOW_FILTERS:
+        summary = summary[summary["TRole"] == SHOW_FILTERS[show]]
+
+    met_col = f"Min {MIN_MATCHES_REQUIRED} Met"
+    per_team = summary.groupby("Team", sort=True).agg(
+        Members=("Player's Name", "size"),
+        Matches=("Total Team Matches", "max"),
+        **{met_col: (met_col, lambda s: int((s == "✅").sum()))},
+    ).reset_index()
+    st.dataframe(per_team, use_container_width=True, hide_index=True)
+
+    heat = index["heat"]
+    if not heat.empty:
+        chart = alt.Chart(heat).mark_rect().encode(
+            x=alt.X("Round:O", title="Team's match"),
+            y=alt.Y("Team:N", title=None),
+            color=alt.Color("Played:Q", title="Members played"),
+            tooltip=["Team", "Round", "Match", "MatchID", "Played"],
+        ).properties(height=34 * max(1, heat["Team"].nunique()))
+        st.altair_chart(chart, use_container_width=True)
+
+    target_h = int(min(950, max(420, (len(summary) + 1) * 32)))
+    st.dataframe(summary, use_container_width=True, hide_index=True, height=target_h)
+    st.download_button(
+        "Download CSV",
+        summary.to_csv(index=False).encode("utf-8"),
+        file_name="psl_compliance_all_teams.csv",
+        mime="text/csv",
+    )
 
+@timed()
 def compliance_matrix_page(squads_df: pd.DataFrame):
     st.subheader("📋 PSL Compliance Matrix")
     st.markdown(
@@ -209,8 +117,6 @@ def compliance_matrix_page(squads_df: pd.DataFrame):
         unsafe_allow_html=True
     )
 
-    matches_df, apps_df = load_compliance_log(COMPLIANCE_XLSX)
-
     if squads_df.empty:
         st.error("Squads file is empty or could not be loaded.")
         return
@@ -220,7 +126,7 @@ def compliance_matrix_page(squads_df: pd.DataFrame):
         st.error("No teams found in squads data.")
         return
 
-    team = st.selectbox("Select Team", teams, index=0)
+    team = st.selectbox("Select Team", teams + [ALL_TEAMS], index=0, key="cm_team")
 
     # -----------------------------
     # Filter buttons (WORKING)
@@ -233,242 +139,21 @@ def compliance_matrix_page(squads_df: pd.DataFrame):
         key="cm_filter"
     )
 
-    # ---- Prefer mapper outputs if present ----
-    player_master_path = os.path.join(BASE_DIR, "player_master.xlsx")
-    apps_mapped_path = os.path.join(BASE_DIR, "appearances_mapped.xlsx")
-
-    @st.cache_data(show_spinner=False, ttl=30)
-    def load_player_master():
-        if os.path.exists(player_master_path):
-            pm = pd.read_excel(player_master_path)
-            if "Player" not in pm.columns and "player_name_raw" in pm.columns:
-                pm["Player"] = pm["player_name_raw"]
-            if "Team_canonical" not in pm.columns and "Team" in pm.columns:
-                pm["Team_canonical"] = pm["Team"].astype(str).str.strip()
-            if "player_name_key" not in pm.columns:
-                src = "player_name_raw" if "player_name_raw" in pm.columns else "Player"
-                pm["player_name_key"] = pm[src].apply(clean_name)
-            return pm[["player_id", "Team_canonical", "Player", "player_name_key"]].drop_duplicates()
-
-        # fallback: build from squads
-        tmp = squads_df.copy()
-        tmp["Team_canonical"] = tmp["Team"].astype(str).str.strip()
-        tmp["Player"] = tmp["Player"].astype(str).str.strip()
-        tmp["player_name_key"] = tmp["Player"].apply(clean_name)
-        keys = tmp[["player_name_key"]].drop_duplicates().sort_values("player_name_key").reset_index(drop=True)
-        keys["player_id"] = ["P" + str(i + 1).zfill(4) for i in range(len(keys))]
-        pm = tmp.merge(keys, on="player_name_key", how="left")
-        return pm[["player_id", "Team_canonical", "Player", "player_name_key"]].drop_duplicates()
-
-    @st.cache_data(show_spinner=False, ttl=30)
-    def load_appearances_mapped(apps_raw: pd.DataFrame, pm: pd.DataFrame):
-        if os.path.exists(apps_mapped_path):
-            am = pd.read_excel(apps_mapped_path)
-            if "Team_canonical" not in am.columns and "Team" in am.columns:
-                am["Team_canonical"] = am["Team"].astype(str).str.strip()
-            if "player_name_key" not in am.columns and "Player" in am.columns:
-                am["player_name_key"] = am["Player"].apply(clean_name)
-            return am
-
-        if apps_raw.empty:
-            return apps_raw
-
-        tmp = apps_raw.copy()
-        tmp["Team_canonical"] = tmp["Team"].astype(str).str.strip()
-        tmp["player_name_key"] = tmp["Player"].apply(clean_name)
-
-        lookup = pm[["player_id", "Team_canonical", "player_name_key"]].drop_duplicates()
-        tmp = tmp.merge(lookup, on=["Team_canonical", "player_name_key"], how="left")
-
-        # global fallback ignoring team
-        miss = tmp["player_id"].isna()
-        if miss.any():
-            gl = pm[["player_id", "player_name_key"]].drop_duplicates()
-            tmp2 = tmp.loc[miss].merge(gl, on="player_name_key", how="left", suffixes=("", "_g"))
-            tmp.loc[miss, "player_id"] = tmp2["player_id_g"].values
-
-        return tmp
-
-    pm = load_player_master()
-    apps_mapped = load_appearances_mapped(apps_df, pm)
+    index = load_compliance_index()
+    if team == ALL_TEAMS:
+        all_teams_compliance_view(index, show)
+        return
 
-    # -----------------------------
-    # Determine team matches
-    # -----------------------------
-    team_match_ids = []
-    if not matches_df.empty and "MatchID" in matches_df.columns:
-        md = matches_df.copy()
-        md["MatchID"] = pd.to_numeric(md["MatchID"], errors="coerce")
-        colA = find_col(md, ["TeamA", "Team A", "Team1", "Team 1", "Home", "HomeTeam"])
-        colB = find_col(md, ["TeamB", "Team B", "Team2", "Team 2", "Away", "AwayTeam", "Visitor"])
-        if colA and colB:
-            team_match_ids = md.loc[(md[colA] == team) | (md[colB] == team), "MatchID"].dropna().unique().tolist()
-        elif "Team" in md.columns:
-            team_match_ids = md.loc[md["Team"] == team, "MatchID"].dropna().unique().tolist()
-
-    if not team_match_ids and not apps_df.empty and "MatchID" in apps_df.columns:
-        team_match_ids = apps_df.loc[apps_df["Team"] == team, "MatchID"].dropna().unique().tolist()
-
-    team_match_ids = sorted([int(x) for x in team_match_ids if pd.notna(x)])
-    if not team_match_ids:
+    matrix_df = index["matrix"].get(team)
+    if matrix_df is None:
         st.warning(f"No matches found for **{team}** in PSL02_Compliance_Log.xlsx.")
         return
 
-    total_team_matches = len(team_match_ids)
-
-    # Friendly headers
-    label_by_mid = {mid: "vs" for mid in team_match_ids}
-    if not matches_df.empty and "MatchID" in matches_df.columns:
-        md = matches_df.copy()
-        md["MatchID"] = pd.to_numeric(md["MatchID"], errors="coerce")
-        if "MatchDate" in md.columns:
-            md["MatchDate"] = pd.to_datetime(md["MatchDate"], errors="coerce")
-
-        colA = find_col(md, ["TeamA", "Team A", "Team1", "Team 1", "Home", "HomeTeam"])
-        colB = find_col(md, ["TeamB", "Team B", "Team2", "Team 2", "Away", "AwayTeam", "Visitor"])
-
-        for _, r in md.iterrows():
-            if pd.isna(r.get("MatchID")):
-                continue
-            mid = int(r["MatchID"])
-            if mid not in label_by_mid:
-                continue
-
-            opp = ""
-            if colA and colB:
-                ta = str(r.get(colA, "")).strip()
-                tb = str(r.get(colB, "")).strip()
-                if ta == str(team).strip():
-                    opp = tb
-                elif tb == str(team).strip():
-                    opp = ta
-
-            dt_txt = ""
-            if "MatchDate" in md.columns and pd.notna(r.get("MatchDate")):
-                dt_txt = r["MatchDate"].strftime("%d-%b")
-
-            label = f"vs {opp}" if opp else "vs"
-            if dt_txt:
-                label += f" ({dt_txt})"
-            label_by_mid[mid] = label
-
-    match_cols = [label_by_mid[mid] for mid in team_match_ids]
-
-    # -----------------------------
-    # Build squad_team and BRING ROLE IN (THIS FIXES IT)
-    # -----------------------------
-    squad_team = pm.loc[pm["Team_canonical"] == str(team).strip()].copy()
-    if squad_team.empty:
-        # fallback from squads_df if master doesn't include team
-        squad_team = squads_df.loc[squads_df["Team"] == team].copy()
-        squad_team["Team_canonical"] = squad_team["Team"].astype(str).str.strip()
-        squad_team["Player"] = squad_team["Player"].astype(str).str.strip()
-        squad_team["player_name_key"] = squad_team["Player"].apply(clean_name)
-        keys = squad_team[["player_name_key"]].drop_duplicates().sort_values("player_name_key").reset_index(drop=True)
-        keys["player_id"] = ["P" + str(i + 1).zfill(4) for i in range(len(keys))]
-        squad_team = squad_team.merge(keys, on="player_name_key", how="left")
-
-    # ✅ Role lookup from squads_df using clean_name key
-    team_roles = squads_df.loc[squads_df["Team"] == team, ["Player", "Role"]].copy()
-    team_roles["player_name_key"] = team_roles["Player"].astype(str).apply(clean_name)
-    role_lookup = team_roles.drop_duplicates("player_name_key").set_index("player_name_key")["Role"].to_dict()
-
-    squad_team["Role"] = squad_team["player_name_key"].map(role_lookup).fillna("Squad")
-
-    def role_bucket(role: str) -> str:
-        r = str(role).strip().lower()
-        if "brand" in r and "ambassador" in r:
-            return "Brand Ambassador"
-        if "manager" in r:
-            return "Manager"
-        if "mentor" in r:
-            return "Mentor"
-        if "support" in r:
-            return "Supporter"
-        return "Squad"
-
-    squad_team["TRole"] = squad_team["Role"].apply(role_bucket)
-
-    # -----------------------------
-    # Team appearances
-    # -----------------------------
-    team_apps = apps_mapped.copy()
-    if not team_apps.empty:
-        team_apps["MatchID"] = pd.to_numeric(team_apps["MatchID"], errors="coerce")
-         # ensure name key exists (for fallback matching)
-        if "player_name_key" not in team_apps.columns and "Player" in team_apps.columns:
-            team_apps["player_name_key"] = team_apps["Player"].apply(clean_name)
-
-        team_apps = team_apps.loc[
-        (team_apps["Team_canonical"] == str(team).strip()) &
-        (team_apps["MatchID"].isin(team_match_ids))
-         ].copy()
-
-    # -----------------------------
-    # Build matrix rows (+ TRole)
-    # -----------------------------
-    # -----------------------------
-    # Build matrix rows (+ TRole)  ✅ for ALL roles
-    # -----------------------------
-    rows = []
-    for _, r in squad_team.sort_values(["TRole", "Player"]).iterrows():
-        pid = r.get("player_id", None)
-        pname = r.get("Player", "")
-        trole = r.get("TRole", "Squad")
-        pkey = r.get("player_name_key", clean_name(pname))
-
-        played = set()
-
-        if not team_apps.empty:
-            # Strong match by player_id (preferred)
-            if pid and "player_id" in team_apps.columns:
-                played = set(
-                team_apps.loc[team_apps["player_id"] == pid, "MatchID"]
-                .dropna().astype(int).tolist()
-                )
-
-            # Fallback match by normalized name key (covers staff or unmapped IDs)
-            if not played and "player_name_key" in team_apps.columns:
-                played = set(
-                team_apps.loc[team_apps["player_name_key"] == pkey, "MatchID"]
-                .dropna().astype(int).tolist()
-                )
-
-        row = {"Player's Name": pname, "TRole": trole}
-
-        for mid in team_match_ids:
-            row[label_by_mid[mid]] = "✅" if mid in played else "❌"
-
-        row["Matches Played"] = int(len(played))          # ✅ 0 if none
-        row["Total Team Matches"] = int(total_team_matches)
-
-        rows.append(row)
-
-    matrix_df = pd.DataFrame(rows)
-
-    
-    # --- Force column order: Matches Played BEFORE Total Team Matches ---
-    base_cols = ["Player's Name", "TRole"]
-    tail_cols = ["Matches Played", "Total Team Matches"]
-
-    # match columns are everything between base and tail
-    match_cols = [c for c in matrix_df.columns if c not in base_cols + tail_cols]
-
-    matrix_df = matrix_df[base_cols + match_cols + tail_cols]
-
     # -----------------------------
     # Apply filter (WORKING)
     # -----------------------------
-    if show == "Squad":
-        matrix_df = matrix_df[matrix_df["TRole"] == "Squad"]
-    elif show == "Managers":
-        matrix_df = matrix_df[matrix_df["TRole"] == "Manager"]
-    elif show == "Mentors":
-        matrix_df = matrix_df[matrix_df["TRole"] == "Mentor"]
-    elif show == "Supporters":
-        matrix_df = matrix_df[matrix_df["TRole"] == "Supporter"]
-    elif show == "Brand Ambassadors":
-        matrix_df = matrix_df[matrix_df["TRole"] == "Brand Ambassador"]
+    if show in SHOW_FILTERS:
+        matrix_df = matrix_df[matrix_df["TRole"] == SHOW_FILTERS[show]]
 
     # -----------------------------
     # Render table (bigger height)
@@ -481,165 +166,11 @@ def compliance_matrix_page(squads_df: pd.DataFrame):
         height=target_h
     )
 
-
-def build_component_scores(bat, bowl, field, mvp):
-    """
-    Build component score dictionaries keyed by clean_name(player),
-    so messy CSV names still match your canonical squad names.
-    """
-
-    # --------------------
-    # Batting
-    # --------------------
-    bname = pick_name_col(bat)
-    runs_c = find_col(bat, ["runs"])
-    sr_c   = find_col(bat, ["sr", "strike rate"])
-    avg_c  = find_col(bat, ["avg", "average"])
-    inns_c = find_col(bat, ["inns", "innings"])
-    f50_c  = find_col(bat, ["50s", "fifties"])
-    f100_c = find_col(bat, ["100s", "centuries"])
-
-    bat["__player__"] = bat[bname].astype(str).str.strip()
-    bat_score = {}
-
-    for _, r in bat.iterrows():
-        p_raw = str(r["__player__"]).strip()
-        if not p_raw or p_raw.lower() == "nan":
-            continue
-
-        key = clean_name(p_raw)  # ✅ normalized key
-
-        runs = to_num(r.get(runs_c, 0)) if runs_c else 0
-        sr   = to_num(r.get(sr_c, 0)) if sr_c else 0
-        avg  = to_num(r.get(avg_c, 0)) if avg_c else 0
-        inns = max(1.0, to_num(r.get(inns_c, 1))) if inns_c else 1.0
-        f50  = to_num(r.get(f50_c, 0)) if f50_c else 0
-        f100 = to_num(r.get(f100_c, 0)) if f100_c else 0
-
-        bat_score[key] = runs + (sr * 0.6) + (avg * 0.8) + (f50 * 10) + (f100 * 25) + (np.log(inns + 1) * 2)
-
-    # --------------------
-    # Bowling
-    # --------------------
-    wname = pick_name_col(bowl)
-    wk_c  = find_col(bowl, ["wkts", "wickets"])
-    eco_c = find_col(bowl, ["econ", "economy"])
-    avg_c2 = find_col(bowl, ["avg", "average"])
-    sr_c2  = find_col(bowl, ["sr", "strike rate"])
-    mat_c  = find_col(bowl, ["mat", "matches"])
-
-    bowl["__player__"] = bowl[wname].astype(str).str.strip()
-    bowl_score = {}
-
-    for _, r in bowl.iterrows():
-        p_raw = str(r["__player__"]).strip()
-        if not p_raw or p_raw.lower() == "nan":
-            continue
-
-        key = clean_name(p_raw)  # ✅ normalized key
-
-        wk  = to_num(r.get(wk_c, 0)) if wk_c else 0
-        eco = to_num(r.get(eco_c, 0)) if eco_c else 0
-        avg2 = to_num(r.get(avg_c2, 0)) if avg_c2 else 0
-        sr2  = to_num(r.get(sr_c2, 0)) if sr_c2 else 0
-        mat  = max(1.0, to_num(r.get(mat_c, 1))) if mat_c else 1.0
-
-        bowl_score[key] = (wk * 25) + (np.log(mat + 1) * 2) - (eco * 8) - (avg2 * 0.6) - (sr2 * 0.4)
-
-    # --------------------
-    # Fielding
-    # --------------------
-    fname = pick_name_col(field)
-    ct_c  = find_col(field, ["catches", "ct"])
-    ro_c  = find_col(field, ["run out", "runouts", "ro"])
-
-    field["__player__"] = field[fname].astype(str).str.strip()
-    field_score = {}
-
-    for _, r in field.iterrows():
-        p_raw = str(r["__player__"]).strip()
-        if not p_raw or p_raw.lower() == "nan":
-            continue
-
-        key = clean_name(p_raw)  # ✅ normalized key
-
-        ct = to_num(r.get(ct_c, 0)) if ct_c else 0
-        ro = to_num(r.get(ro_c, 0)) if ro_c else 0
-
-        field_score[key] = (ct * 8) + (ro * 10)
-
-    # --------------------
-    # MVP
-    # --------------------
-    mname = pick_name_col(mvp)
-    pts_c = find_col(mvp, ["points", "pts", "score"])
-
-    mvp["__player__"] = mvp[mname].astype(str).str.strip()
-    mvp_score = {}
-
-    for _, r in mvp.iterrows():
-        p_raw = str(r["__player__"]).strip()
-        if not p_raw or p_raw.lower() == "nan":
-            continue
-
-        key = clean_name(p_raw)  # ✅ normalized key
-
-        mvp_score[key] = to_num(r.get(pts_c, 0)) if pts_c else 0
-
-    return bat_score, bowl_score, field_score, mvp_score
-
-
-@st.cache_data(show_spinner=False)
-def build_player_ratings_and_components():
-    s1_maps = build_component_scores(
-        pd.read_csv(S01["bat"]), pd.read_csv(S01["bowl"]), pd.read_csv(S01["field"]), pd.read_csv(S01["mvp"])
-    )
-    s2_maps = build_component_scores(
-        pd.read_csv(S02["bat"]), pd.read_csv(S02["bowl"]), pd.read_csv(S02["field"]), pd.read_csv(S02["mvp"])
-    )
-
-    # Build canonical player list from squads
-    squads = load_squads()
-    players = squads["Player"].astype(str).tolist()
-
-    player_key_map = {p: clean_name(p) for p in players}
-
-
-    def blended(comp_idx):
-        v1 = pd.Series({p: float(s1_maps[comp_idx].get(player_key_map[p], 0)) for p in players})
-        v2 = pd.Series({p: float(s2_maps[comp_idx].get(player_key_map[p], 0)) for p in players})
-        z1 = zscore(v1); z2 = zscore(v2)
-        return ((1 - W_RECENT)*z1 + W_RECENT*z2).replace([np.inf, -np.inf], 0).fillna(0)
-
-    bat_z   = blended(0)
-    bowl_z  = blended(1)
-    field_z = blended(2)
-    mvp_z   = blended(3)
-
-    rating = (W_BAT*bat_z) + (W_BOWL*bowl_z) + (W_FIELD*field_z) + (W_MVP*mvp_z)
-    rating = rating.replace([np.inf, -np.inf], 0).fillna(0)
-
-    ratings_df = pd.DataFrame({"player": players, "rating": rating.values}).set_index("player")
-
-    comp_df = pd.DataFrame({
-        "Batting": bat_z,
-        "Bowling": bowl_z,
-        "Fielding": field_z,
-        "MVP": mvp_z,
-        "Overall": rating
-    }).fillna(0)
-
-    return ratings_df, comp_df
-
 # ----------------------------
 # UI Styling
 # ----------------------------
-bg_b64 = file_to_base64(BG_IMAGE)
-brand_b64 = file_to_base64(BRAND_IMAGE)
-
-st.markdown(
-f"""
-<style>
+def page_css(bg: str, bg_small: str) -> str:
+    return f"""
 @import url('https://fonts.googleapis.com/css2?family=Inter:wght@400;600;800;900&display=swap');
 html, body, [class*="css"] {{
   font-family: 'Inter', system-ui, -apple-system, Segoe UI, Roboto, Arial, sans-serif;
@@ -650,11 +181,15 @@ html, body, [class*="css"] {{
     radial-gradient(1200px 700px at 50% -10%, rgba(122,162,255,0.18), rgba(0,0,0,0) 55%),
     radial-gradient(900px 600px at 90% 20%, rgba(255,122,217,0.14), rgba(0,0,0,0) 55%),
     linear-gradient(180deg, rgba(6,10,22,0.38) 0%, rgba(6,10,22,0.62) 55%, rgba(6,10,22,0.74) 100%),
-    url("data:image/jpg;base64,{bg_b64}");
+    var(--psl-bg);
+  --psl-bg: url("{bg}");
   background-size: cover;
   background-position: center;
   background-attachment: fixed;
 }}
+@media (max-width: 820px) {{
+  .stApp {{ --psl-bg: url("{bg_small}"); }}
+}}
 
 .block-container {{
   padding-top: 86px;
@@ -750,6 +285,20 @@ h1,h2,h3,h4 {{
   background: rgba(0,0,0,0.12);
   border-top: 3px solid rgba(255,255,255,0.14);
 }}
+.logoSprite {{
+  width: 100%;
+  aspect-ratio: 1 / 1;
+  background-repeat: no-repeat;
+  border-radius: 10px;
+}}
+.logoMissing {{
+  aspect-ratio: 1 / 1;
+  display: flex;
+  align-items: center;
+  justify-content: center;
+  font-size: 11px;
+  color: rgba(245,247,255,0.70);
+}}
 .tileSelected .logoBox {{
   border-top: 3px solid rgba(255,122,217,0.95);
   background: rgba(255,122,217,0.10);
@@ -1003,14 +552,34 @@ div[data-testid="stDataFrame"] thead tr th {{
 .stButton > button:hover {{
   color: #0b1220 !important;
 }}
+"""
 
+@timed()
+def page_style() -> str:
+    """
+    With static serving the page CSS is a hashed file under app/static and
+    each rerun only sends the one-line @import; the browser fetches the CSS
+    and images once and revalidates them after that. Without it (or on a
+    read-only disk) the CSS is inlined with data-URI images as before.
+    """
+    bg = [image_variant(BG_IMAGE, w) for w in BG_WIDTHS]
+    if STATIC_SERVING:
+        names = [publish_static(f"bg-{w}", b, "webp") if b else None for w, b in zip(BG_WIDTHS, bg)]
+        if all(names):
+            css = publish_static("app", page_css(*names).encode(), "css")   # url() relative to the css file
+            if css:
+                return f"<style>@import url('{STATIC_URL}/{css}');</style>"
+    return f"<style>{page_css(*(data_uri(b, 'image/webp') for b in bg))}</style>"
 
+brand_src = asset_url("brand", image_variant(BRAND_IMAGE, height=BRAND_HEIGHT), "webp", "image/webp")
 
-</style>
+st.markdown(
+f"""
+{page_style()}
 
 <div class="topbar">
   <div class="brandWrap">
-    <img class="brandImg" src="data:image/jpg;base64,{brand_b64}" />
+    <img class="brandImg" src="{brand_src}" />
     <div class="appTitle">PSL 2.0 AI Match Predictor</div>
   </div>
 </div>
@@ -1021,16 +590,28 @@ div[data-testid="stDataFrame"] thead tr th {{
 # ----------------------------
 # Tabs
 # ----------------------------
+# Only the open tab's body runs (on_change="rerun" + tab.open, Streamlit 1.55+), so using the
+# predictor never touches the compliance log and vice versa. Widgets in a tab
+# that isn't drawn lose their state; re-assigning the keys keeps it.
+KEPT_WIDGET_KEYS = ("cm_team", "cm_filter", "pred_mode")
+for k in list(st.session_state):
+    if k in KEPT_WIDGET_KEYS or k.startswith(("stats_", "search_xi_")):
+        st.session_state[k] = st.session_state[k]
+
 st.markdown("<div style='height:6px'></div>", unsafe_allow_html=True)
-tab_predictor, tab_compliance = st.tabs(["🏏 Match Predictor", "📋 Compliance"])
+tab_predictor, tab_compliance, tab_season = st.tabs(
+    ["🏏 Match Predictor", "📋 Compliance", "🏆 Season Projection"], key="view", on_change="rerun"
+)
 
 # ----------------------------
 # UI: Team tiles
 # ----------------------------
-def team_tile_grid(title, teams, selected_key):
+@timed()
+def team_tile_grid(title, teams, selected_key, cells):
     st.markdown(f"### {title}")
     st.markdown('<div class="small">Click Select under logo</div>', unsafe_allow_html=True)
 
+    last = max(len(teams) - 1, 1)
     cols = st.columns(4)
     for i, t in enumerate(teams):
         with cols[i % 4]:
@@ -1038,31 +619,27 @@ def team_tile_grid(title, teams, selected_key):
             tile_class = "tile tileSelected" if selected else "tile"
             badge_html = '<div class="selBadge">Selected</div>' if selected else ""
 
-            logo = get_logo(t)
-
-            st.markdown(f'<div class="{tile_class}">', unsafe_allow_html=True)
-            st.markdown('<div class="logoBox">', unsafe_allow_html=True)
-            if logo:
-                st.image(logo, use_container_width=True)
+            if t in cells:
+                logo_html = f'<div class="logoSprite" style="background-position: {cells[t] / last * 100:.4f}% 0"></div>'
             else:
-                st.caption("Logo missing")
-            st.markdown('</div>', unsafe_allow_html=True)
-
-            st.markdown(f'<div class="tileName">{t}</div>{badge_html}', unsafe_allow_html=True)
+                logo_html = '<div class="logoMissing">Logo missing</div>'
+            st.markdown(
+                f'<div class="{tile_class}"><div class="logoBox">{logo_html}</div>'
+                f'<div class="tileName">{t}</div>{badge_html}</div>',
+                unsafe_allow_html=True,
+            )
 
             st.markdown('<div class="tileBtn">', unsafe_allow_html=True)
             if st.button("Select", key=f"{selected_key}_{t}"):
                 st.session_state[selected_key] = t
             st.markdown('</div>', unsafe_allow_html=True)
 
-            st.markdown("</div>", unsafe_allow_html=True)
-
 # ----------------------------
 # Player stats popover + chart (labels)
 # ----------------------------
 def stats_chart_with_labels(player, comp_df):
     if player not in comp_df.index:
-        st.info("No stats found for this player in S01/S02 leaderboards.")
+        st.info("No stats found for this player in any season's leaderboards.")
         return
 
     s = comp_df.loc[player, ["Batting", "Bowling", "Fielding", "MVP", "Overall"]].astype(float)
@@ -1082,6 +659,11 @@ def stats_chart_with_labels(player, comp_df):
 
     st.altair_chart((bar + labels).properties(height=220), use_container_width=True)
 
+# Fragments: the stats popover, each XI editor and the prediction block rerun
+# on their own when used. They share state only through st.session_state
+# ("xi_a" / "xi_b"); everything else comes in as arguments.
+@st.fragment
+@timed()
 def player_stats_popover(team_name, squad, comp_df):
     with st.popover("Player stats"):
         p = st.selectbox(f"Pick player ({team_name})", squad, key=f"stats_{team_name}")
@@ -1091,6 +673,8 @@ def player_stats_popover(team_name, squad, comp_df):
 # ----------------------------
 # XI Selector
 # ----------------------------
+@st.fragment
+@timed()
 def xi_editor(team_name, squad, ratings_df, state_key, comp_df):
     if state_key not in st.session_state:
         st.session_state[state_key] = best_xi(squad, ratings_df, 11)
@@ -1099,8 +683,7 @@ def xi_editor(team_name, squad, ratings_df, state_key, comp_df):
 
     search = st.text_input(f"Search players ({team_name})", "", key=f"search_{state_key}")
 
-    df = pd.DataFrame({"Player": squad})
-    df["Rating"] = df["Player"].apply(lambda p: float(ratings_df.loc[p, "rating"]) if p in ratings_df.index else 0.0)
+    df = pd.DataFrame({"Player": squad, "Rating": rating_index(ratings_df).rating(squad)})
     df["In XI"] = df["Player"].isin(st.session_state[state_key])
     df = df.sort_values("Rating", ascending=False).reset_index(drop=True)
 
@@ -1123,11 +706,9 @@ def xi_editor(team_name, squad, ratings_df, state_key, comp_df):
     chosen = edited.loc[edited["In XI"] == True, "Player"].tolist()
 
     if len(chosen) > 11:
-        full = pd.DataFrame({"Player": squad})
-        full["Rating"] = full["Player"].apply(lambda p: float(ratings_df.loc[p, "rating"]) if p in ratings_df.index else 0.0)
-        keep = full[full["Player"].isin(chosen)].sort_values("Rating", ascending=False)["Player"].tolist()[:11]
-        chosen = keep
-        st.warning("You selected more than 11. I kept the best 11 (by rating).")
+        picked = set(chosen)
+        chosen = best_xi([p for p in squad if p in picked], ratings_df, 11, only_eligible=False)
+        st.warning("You selected more than 11. I kept the best 11 (by rating, with enough bowlers and a keeper).")
 
     st.session_state[state_key] = chosen
     st.caption(f"Selected: {len(chosen)}/11")
@@ -1164,125 +745,270 @@ def prediction_card(team, pct, strength):
         unsafe_allow_html=True
     )
 
-# =========================================================
-# TAB 1: Compliance Monitor
-# =========================================================
-with tab_compliance:
-    squads_df = load_squads()
-    with st.container(border=True):
-        compliance_matrix_page(squads_df)
+PREDICTION_MODES = ["Rating model", "Monte Carlo simulation"]
+SIM_MODE = PREDICTION_MODES[1]
 
-# =========================================================
-# TAB 2: Match Predictor
-# =========================================================
-with tab_predictor:
-    squads_df = load_squads()
-    ratings, comp_df = build_player_ratings_and_components()
-    teams = sorted(squads_df["Team"].unique().tolist())
+def simulation_summary(team_a, team_b, sim):
+    lvl = int(round(sim["level"] * 100))
+    lo, hi = sim["p_a_ci"]
+    st.caption(
+        f"{sim['n_sims']:,} simulated matches · {team_a} win {lo*100:.1f}–{hi*100:.1f}% ({lvl}% CI) · "
+        f"ties {sim['p_tie']*100:.1f}%"
+    )
+    st.caption(
+        f"Score ({lvl}% range): {team_a} {sim['median_a']:.0f} [{sim['score_ci_a'][0]:.0f}–{sim['score_ci_a'][1]:.0f}] · "
+        f"{team_b} {sim['median_b']:.0f} [{sim['score_ci_b'][0]:.0f}–{sim['score_ci_b'][1]:.0f}]"
+    )
 
+    # bin here so only ~40 rows per team go to the browser, not every simulation
+    edges = np.histogram_bin_edges(np.concatenate([sim["scores_a"], sim["scores_b"]]), bins=40)
+    dist = pd.concat([
+        pd.DataFrame({"Team": t, "Score": edges[:-1], "Simulations": np.histogram(s, bins=edges)[0]})
+        for t, s in ((team_a, sim["scores_a"]), (team_b, sim["scores_b"]))
+    ], ignore_index=True)
+    chart = alt.Chart(dist).mark_bar(opacity=0.6).encode(
+        x=alt.X("Score:Q"),
+        y=alt.Y("Simulations:Q", stack=None),
+        color=alt.Color("Team:N"),
+    ).properties(height=220)
+    st.altair_chart(chart, use_container_width=True)
+
+@st.fragment
+@timed()
+def prediction_panel(team_a, team_b, ratings_df):
+    # the XI editors don't rerun this block, so the XIs are read (and checked) on click
     with st.container(border=True):
-        st.subheader("Team Selection")
+        mode = st.radio("Prediction model", PREDICTION_MODES, horizontal=True, key="pred_mode")
+        predict = st.button("Predict", type="primary")
 
-        colA, colMid, colB = st.columns([1, 0.045, 1], vertical_alignment="top")
-        with colA:
-            team_tile_grid("Team A", teams, "team_a")
-        with colMid:
-            st.markdown('<div class="teamDivider"></div>', unsafe_allow_html=True)
-        with colB:
-            team_tile_grid("Team B", teams, "team_b")
-
-        sel_a = st.session_state.get("team_a")
-        sel_b = st.session_state.get("team_b")
-
-        go_disabled = (not sel_a) or (not sel_b) or (sel_a == sel_b)
-        if sel_a and sel_b and sel_a == sel_b:
-            st.warning("Select two different teams.")
-
-        go = st.button("Go", type="primary", disabled=go_disabled)
-
-        # Show quick squad lists as soon as both teams are selected
-        if sel_a and sel_b and sel_a != sel_b:
-            a_squad = squads_df.loc[squads_df["Team"] == sel_a, "Player"].dropna().astype(str).tolist()
-            b_squad = squads_df.loc[squads_df["Team"] == sel_b, "Player"].dropna().astype(str).tolist()
-            a_tbl = pd.DataFrame({"Player (Team A)": a_squad})
-            b_tbl = pd.DataFrame({"Player (Team B)": b_squad})
+    if not predict:
+        return
+    xi_a = st.session_state.get("xi_a", [])
+    xi_b = st.session_state.get("xi_b", [])
+    if len(xi_a) != 11 or len(xi_b) != 11:
+        st.warning("Select exactly 11 players for both teams.")
+        return
 
-    if "go_done" not in st.session_state:
-        st.session_state.go_done = False
+    pred = predict_match(xi_a, xi_b, ratings_df)
+    sA, sB = pred["strength_a"], pred["strength_b"]
 
-    if go:
-        st.session_state.go_done = True
-        for k in ["xi_a", "xi_b", "search_xi_a", "search_xi_b"]:
-            if k in st.session_state:
-                del st.session_state[k]
+    sim = None
+    if mode == SIM_MODE:
+        sim = simulate_xi_match(xi_a, xi_b)
+        pA = sim["p_a"]
+    else:
+        pA = pred["p_a"]
+    pctA = int(round(pA * 100))
+    pctB = 100 - pctA
+
+    c1, c2 = st.columns(2)
+    with c1:
+        prediction_card(team_a, pctA, sA)
+    with c2:
+        prediction_card(team_b, pctB, sB)
+
+    if sim is not None:
+        simulation_summary(team_a, team_b, sim)
+
+@timed()
+def season_projection_page():
+    st.subheader("Projected Points Table")
+    with st.spinner("Simulating the rest of the season..."):
+        proj = season_projection()
+    st.caption(
+        f"{proj['n_runs']:,} simulated seasons · {proj['remaining']} fixtures left · "
+        f"win 2 pts, tie/no result 1 · top {QUALIFY_TOP} qualify · level teams split at random (no run rate in the log)"
+    )
+    st.dataframe(
+        proj["table"],
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            f"Top {QUALIFY_TOP} %": st.column_config.ProgressColumn(format="%.1f%%", min_value=0, max_value=100),
+        },
+    )
 
-    if st.session_state.go_done:
-        team_a = st.session_state.get("team_a")
-        team_b = st.session_state.get("team_b")
+    st.markdown("**Finishing position (%)**")
+    st.dataframe(
+        proj["positions"],
+        use_container_width=True,
+        column_config={c: st.column_config.NumberColumn(format="%.1f") for c in proj["positions"].columns},
+    )
 
-        if not team_a or not team_b or team_a == team_b:
-            st.stop()
+    if not proj["fixtures"].empty:
+        st.markdown("**Remaining fixtures**")
+        st.dataframe(
+            proj["fixtures"],
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                "Team 1 win %": st.column_config.ProgressColumn(format="%.1f%%", min_value=0, max_value=100),
+            },
+        )
+
+@timed()
+def matchup_matrix_page():
+    st.subheader("Who Beats Whom")
+    mm = matchup_matrix()
+    st.caption("Rating-model win chance of the row team against the column team, best XI vs best XI.")
+
+    heat = (mm["p"] * 100).rename_axis("Team").reset_index().melt(
+        id_vars="Team", var_name="Opponent", value_name="Win %"
+    ).dropna()
+    base = alt.Chart(heat).encode(
+        x=alt.X("Opponent:N", sort=mm["teams"], title=None),
+        y=alt.Y("Team:N", sort=mm["teams"], title=None),
+    )
+    chart = base.mark_rect().encode(
+        color=alt.Color("Win %:Q", scale=alt.Scale(domain=[0, 100], scheme="redyellowgreen")),
+        tooltip=["Team", "Opponent", alt.Tooltip("Win %:Q", format=".1f")],
+    ) + base.mark_text(fontSize=11).encode(text=alt.Text("Win %:Q", format=".0f"))
+    st.altair_chart(chart.properties(height=340), use_container_width=True)
 
-        squad_a = squads_df.loc[squads_df["Team"] == team_a, "Player"].tolist()
-        squad_b = squads_df.loc[squads_df["Team"] == team_b, "Player"].tolist()
+    strength = mm["strength"].sort_values(ascending=False).rename("XI strength").rename_axis("Team").reset_index()
+    st.dataframe(strength, use_container_width=True, hide_index=True,
+                 column_config={"XI strength": st.column_config.NumberColumn(format="%.2f")})
 
+# =========================================================
+# TAB 1: Compliance Monitor
+# =========================================================
+if tab_compliance.open:
+    with tab_compliance:
+        squads_df = load_squads()
         with st.container(border=True):
-            st.subheader("Playing XI")
-            st.markdown('<div class="small">Tick players in XI (exactly 11). Use Player stats popover for quick stats.</div>', unsafe_allow_html=True)
-
-            b1, b2, b3 = st.columns([1, 1, 1])
-            with b1:
-                if st.button(f"Auto-pick Best XI: {team_a}", use_container_width=True):
-                    st.session_state["xi_a"] = best_xi(squad_a, ratings, 11)
-            with b2:
-                if st.button(f"Auto-pick Best XI: {team_b}", use_container_width=True):
-                    st.session_state["xi_b"] = best_xi(squad_b, ratings, 11)
-            with b3:
-                if st.button("Reset Both", use_container_width=True):
-                    st.session_state["xi_a"] = best_xi(squad_a, ratings, 11)
-                    st.session_state["xi_b"] = best_xi(squad_b, ratings, 11)
-
-            left, right = st.columns(2)
-
-            with left:
-                with st.container(border=True):
-                    logo = get_logo(team_a)
-                    if logo:
-                        st.image(logo, width=90)
-                    st.markdown(f"### {team_a}")
-                    _ = xi_editor(team_a, squad_a, ratings, "xi_a", comp_df)
-
-            with right:
-                with st.container(border=True):
-                    logo = get_logo(team_b)
-                    if logo:
-                        st.image(logo, width=90)
-                    st.markdown(f"### {team_b}")
-                    _ = xi_editor(team_b, squad_b, ratings, "xi_b", comp_df)
-
-        can_predict = (len(st.session_state.get("xi_a", [])) == 11 and len(st.session_state.get("xi_b", [])) == 11)
+            compliance_matrix_page(squads_df)
 
+# =========================================================
+# TAB 3: Season Projection
+# =========================================================
+if tab_season.open:
+    with tab_season:
         with st.container(border=True):
-            predict = st.button("Predict", type="primary", disabled=not can_predict)
-            if not can_predict:
-                st.warning("Select exactly 11 players for both teams.")
-
-        if predict:
-            xi_a = st.session_state["xi_a"]
-            xi_b = st.session_state["xi_b"]
+            season_projection_page()
+        with st.container(border=True):
+            matchup_matrix_page()
 
-            sA = team_strength(xi_a, ratings)
-            sB = team_strength(xi_b, ratings)
+# =========================================================
+# TAB 2: Match Predictor
+# =========================================================
+if tab_predictor.open:
+    with tab_predictor:
+        squads_df = load_squads()
+        ratings, comp_df = build_player_ratings_and_components()
+        teams = sorted(squads_df["Team"].unique().tolist())
 
-            pA = sigmoid((sA - sB) / PROB_SCALE)
-            pctA = int(round(pA * 100))
-            pctB = 100 - pctA
+        with st.container(border=True):
+            st.subheader("Team Selection")
+            logo_cells = logo_sprite_css(teams)
+
+            colA, colMid, colB = st.columns([1, 0.045, 1], vertical_alignment="top")
+            with colA:
+                team_tile_grid("Team A", teams, "team_a", logo_cells)
+            with colMid:
+                st.markdown('<div class="teamDivider"></div>', unsafe_allow_html=True)
+            with colB:
+                team_tile_grid("Team B", teams, "team_b", logo_cells)
+
+            sel_a = st.session_state.get("team_a")
+            sel_b = st.session_state.get("team_b")
+
+            go_disabled = (not sel_a) or (not sel_b) or (sel_a == sel_b)
+            if sel_a and sel_b and sel_a == sel_b:
+                st.warning("Select two different teams.")
+
+            go = st.button("Go", type="primary", disabled=go_disabled)
+
+            # Show quick squad lists as soon as both teams are selected
+            if sel_a and sel_b and sel_a != sel_b:
+                a_squad = squads_df.loc[squads_df["Team"] == sel_a, "Player"].dropna().astype(str).tolist()
+                b_squad = squads_df.loc[squads_df["Team"] == sel_b, "Player"].dropna().astype(str).tolist()
+                a_tbl = pd.DataFrame({"Player (Team A)": a_squad})
+                b_tbl = pd.DataFrame({"Player (Team B)": b_squad})
+
+        if "go_done" not in st.session_state:
+            st.session_state.go_done = False
+
+        if go:
+            st.session_state.go_done = True
+            for k in ["xi_a", "xi_b", "search_xi_a", "search_xi_b"]:
+                if k in st.session_state:
+                    del st.session_state[k]
+
+        if st.session_state.go_done:
+            team_a = st.session_state.get("team_a")
+            team_b = st.session_state.get("team_b")
+
+            if not team_a or not team_b or team_a == team_b:
+                st.stop()
+
+            squad_a = squads_df.loc[squads_df["Team"] == team_a, "Player"].tolist()
+            squad_b = squads_df.loc[squads_df["Team"] == team_b, "Player"].tolist()
+
+            with st.container(border=True):
+                st.subheader("Playing XI")
+                st.markdown('<div class="small">Tick players in XI (exactly 11). Use Player stats popover for quick stats.</div>', unsafe_allow_html=True)
+
+                b1, b2, b3 = st.columns([1, 1, 1])
+                with b1:
+                    if st.button(f"Auto-pick Best XI: {team_a}", use_container_width=True):
+                        st.session_state["xi_a"] = best_xi(squad_a, ratings, 11)
+                with b2:
+                    if st.button(f"Auto-pick Best XI: {team_b}", use_container_width=True):
+                        st.session_state["xi_b"] = best_xi(squad_b, ratings, 11)
+                with b3:
+                    if st.button("Reset Both", use_container_width=True):
+                        st.session_state["xi_a"] = best_xi(squad_a, ratings, 11)
+                        st.session_state["xi_b"] = best_xi(squad_b, ratings, 11)
+
+                left, right = st.columns(2)
+
+                with left:
+                    with st.container(border=True):
+                        logo = logo_bytes(team_a, LOGO_HEADER_PX)
+                        if logo:
+                            st.image(logo, width=90)
+                        st.markdown(f"### {team_a}")
+                        xi_editor(team_a, squad_a, ratings, "xi_a", comp_df)
+
+                with right:
+                    with st.container(border=True):
+                        logo = logo_bytes(team_b, LOGO_HEADER_PX)
+                        if logo:
+                            st.image(logo, width=90)
+                        st.markdown(f"### {team_b}")
+                        xi_editor(team_b, squad_b, ratings, "xi_b", comp_df)
+
+            prediction_panel(team_a, team_b, ratings)
 
-            c1, c2 = st.columns(2)
-            with c1:
-                prediction_card(team_a, pctA, sA)
-            with c2:
-                prediction_card(team_b, pctB, sB)
+# ----------------------------
+# Profiler (PSL_PROFILE=1)
+# ----------------------------
+def profiler_panel():
+    runs = profiling.recent_runs()[::-1]
+    with st.expander(f"⏱ Profiler · last {len(runs)} runs"):
+        if not runs:
+            st.caption("Nothing recorded yet.")
+            return
+        st.dataframe(
+            pd.DataFrame([{
+                "Run": r["run"],
+                "At": pd.Timestamp(r["ts"], unit="s").strftime("%H:%M:%S"),
+                "Total ms": r["total_ms"],
+                "Spans": len(r["spans"]),
+                "Cache misses": sum(s.get("cache") == "miss" for s in r["spans"]),
+            } for r in runs]),
+            use_container_width=True, hide_index=True,
+        )
+        i = st.selectbox("Breakdown", range(len(runs)), key="profiler_run",
+                         format_func=lambda i: f"{runs[i]['run']} · {runs[i]['total_ms']:.1f} ms")
+        spans = pd.DataFrame(runs[i]["spans"])
+        spans.insert(0, "Stage", ["· " * d + n for d, n in zip(spans.pop("depth"), spans.pop("name"))])
+        st.dataframe(spans, use_container_width=True, hide_index=True)
+        st.caption(f"JSONL: {profiling.LOG_PATH}")
+
+if profiling.ENABLED:
+    profiling.end_run()
+    profiler_panel()
 
 # ----------------------------
 # Footer
@@ -1297,4 +1023,4 @@ st.markdown(
     </div>
     """,
     unsafe_allow_html=True
-)
\ No newline at end of file
+)
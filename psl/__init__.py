@@ -0,0 +1,28 @@
+# psl  (PSL 2.0 model core, no Streamlit)
+# ---------------------------------------------------------
+# Loaders, name normalization, scoring, ratings, XI selection, predictions,
+# season projection and compliance. app.py is the Streamlit UI over this;
+# batch jobs, workers and benchmarks import it directly:
+#
+#   import psl
+#   ratings, comp = psl.build_player_ratings_and_components()
+#   xis = psl.best_xis(psl.load_squads(), ratings)
+#
+# Results are memoized per input version (file hashes), so repeat calls in
+# one process are cheap. Returned frames are shared: copy before mutating.
+# ---------------------------------------------------------
+
+from .normalize import clean_name, clean_names, zscore, sigmoid, to_num, to_num_array, pick_name_col, find_col
+from .loaders import file_digest, read_excel_cached, read_excel_sheets_cached, load_squads
+from .seasons import discover_seasons, read_season_leaderboards, season_weights
+from .matching import NameIndex, name_similarity, leaderboard_matches, match_report
+from .identity import PlayerIds, player_ids
+from .scoring import build_component_scores, compute_player_ratings_and_components
+from .ratings import ratings_snapshot_key, build_player_ratings_and_components, RatingIndex, rating_index
+from .selection import solve_xi, solve_xis, load_xi_roles, best_xi, best_xis
+from .prediction import (
+    team_strength, win_probability, predict_match, load_sim_profiles, simulate_xi_match, matchup_matrix,
+)
+from .season import season_projection
+from .mapper import update_mappings
+from .compliance import load_compliance_log, load_compliance_index, role_bucket
@@ -0,0 +1,173 @@
+# psl/assets.py  (images: decoded once, resized, sprite sheets, static files)
+# ---------------------------------------------------------
+# The logo files are ~0.5-1 MP JPEGs shown at ~150 px. Decoding and
+# resizing happen once per (file version, size) for the whole process;
+# callers get small encoded bytes that stay identical across reruns.
+#
+# publish_static() writes those bytes to STATIC_DIR under a content-hashed
+# name, so the browser fetches each version once and a changed image gets
+# a new URL instead of a stale cached copy.
+# ---------------------------------------------------------
+
+import io, os, glob, hashlib, threading
+from functools import lru_cache
+
+from PIL import Image
+
+from .config import LOGO_DIR, TEAM_LOGOS, STATIC_DIR
+from .profiling import cached
+
+
+def _file_version(path: str):
+    try:
+        info = os.stat(path)
+    except OSError:
+        return None
+    return path, info.st_size, info.st_mtime_ns
+
+
+def logo_path(team: str):
+    fn = TEAM_LOGOS.get(team)
+    if not fn:
+        return None
+    path = os.path.join(LOGO_DIR, fn)
+    return path if os.path.exists(path) else None
+
+
+def _logo_version(team: str):
+    path = logo_path(team)
+    return None if path is None else _file_version(path)
+
+
+@lru_cache(maxsize=64)
+def _logo_image(version: tuple, px: int) -> Image.Image:
+    path = version[0]
+    with Image.open(path) as im:
+        im = im.convert("RGBA")
+        im.thumbnail((px, px), Image.LANCZOS)
+    # centre on a transparent px x px square so every cell lines up
+    cell = Image.new("RGBA", (px, px), (0, 0, 0, 0))
+    cell.paste(im, ((px - im.width) // 2, (px - im.height) // 2))
+    return cell
+
+
+def _encode(im: Image.Image, fmt: str) -> bytes:
+    buf = io.BytesIO()
+    if fmt == "WEBP":
+        im.save(buf, "WEBP", quality=85, method=4)
+    else:
+        im.save(buf, "PNG", optimize=True)
+    return buf.getvalue()
+
+
+def logo_image(team: str, px: int):
+    """Square px x px RGBA logo, or None when the team has no logo file. Shared: don't mutate."""
+    version = _logo_version(team)
+    if version is None:
+        return None
+    try:
+        return _logo_image(version, px)
+    except Exception:
+        return None
+
+
+@lru_cache(maxsize=64)
+def _logo_bytes(version: tuple, px: int, fmt: str) -> bytes:
+    return _encode(_logo_image(version, px), fmt)
+
+
+def logo_bytes(team: str, px: int, fmt: str = "WEBP"):
+    """Encoded px x px logo; the same bytes every call, so the browser can cache the media URL."""
+    version = _logo_version(team)
+    if version is None:
+        return None
+    try:
+        return _logo_bytes(version, px, fmt)
+    except Exception:
+        return None
+
+
+@lru_cache(maxsize=8)
+def _logo_sprite(versions: tuple, px: int, fmt: str):
+    sheet = Image.new("RGBA", (px * len(versions), px), (0, 0, 0, 0))
+    for i, version in enumerate(versions):
+        if version is not None:
+            try:
+                sheet.paste(_logo_image(version, px), (i * px, 0))
+            except Exception:
+                pass
+    return _encode(sheet, fmt)
+
+
+def logo_sprite(teams, px: int, fmt: str = "WEBP"):
+    """
+    One horizontal strip with every team's logo in a px x px cell, in
+    `teams` order. Returns (encoded bytes, {team: cell index}) for teams
+    that have a logo; the grid shows cell i with
+    background-size: n*100%, background-position: i/(n-1)*100%.
+    """
+    teams = list(teams)
+    versions = tuple(_logo_version(t) for t in teams)
+    cells = {t: i for i, (t, v) in enumerate(zip(teams, versions)) if v is not None}
+    return cached("logo_sprite", _logo_sprite, versions, px, fmt), cells
+
+
+# ----------------------------
+# Page images
+# ----------------------------
+@lru_cache(maxsize=16)
+def _image_variant(version: tuple, width: int, height: int, fmt: str, quality: int) -> bytes:
+    with Image.open(version[0]) as im:
+        im = im.convert("RGB")
+        im.thumbnail((width or im.width, height or im.height), Image.LANCZOS)
+        buf = io.BytesIO()
+        if fmt == "WEBP":
+            im.save(buf, "WEBP", quality=quality, method=4)
+        else:
+            im.save(buf, "JPEG", quality=quality, optimize=True, progressive=True)
+    return buf.getvalue()
+
+
+def image_variant(path: str, width: int = 0, height: int = 0, fmt: str = "WEBP", quality: int = 80):
+    """`path` scaled down to fit width x height (0 = unbounded), re-encoded; None if unreadable."""
+    version = _file_version(path)
+    if version is None:
+        return None
+    try:
+        return cached("image_variant", _image_variant, version, width, height, fmt, quality)
+    except Exception:
+        return None
+
+
+# ----------------------------
+# Static files
+# ----------------------------
+_PUBLISHED = {}   # (stem, ext, sha) -> file name, so reruns skip the stat
+
+def publish_static(stem: str, data: bytes, ext: str):
+    """
+    Write `data` to STATIC_DIR/<stem>.<hash>.<ext> (once) and return the
+    file name, or None if the directory isn't writable. Older versions of
+    the same stem are removed.
+    """
+    digest = hashlib.sha256(data).hexdigest()[:12]
+    key = (stem, ext, digest)
+    name = _PUBLISHED.get(key)
+    if name:
+        return name
+    name = f"{stem}.{digest}.{ext}"
+    path = os.path.join(STATIC_DIR, name)
+    try:
+        if not os.path.exists(path):
+            os.makedirs(STATIC_DIR, exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+            for old in glob.glob(os.path.join(STATIC_DIR, f"{glob.escape(stem)}.*.{ext}")):
+                if old != path:
+                    os.remove(old)
+    except OSError:
+        return None
+    _PUBLISHED[key] = name
+    return name
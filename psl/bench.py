@@ -0,0 +1,273 @@
+# psl/bench.py  (benchmark suite on synthetic leagues)
+# ---------------------------------------------------------
+#   python -m psl bench                              # 1x 10x 100x 1000x, print + save results
+#   python -m psl bench --scales 1 10 --repeat 5
+#   python -m psl bench --scales 10 --seasons 8          # cost per added season
+#   python -m psl bench --save-baseline              # also write bench/baseline.json
+#   python -m psl bench --compare bench/baseline.json --fail-over 1.5
+#
+# Each scale is a synthetic data directory (synthetic.py, generated once
+# under CACHE_DIR/bench) and runs in its own `python -m psl.bench --worker`
+# process with PSL_DATA_DIR pointing at it, so config paths, lru caches and
+# snapshots all belong to that scale. Stages are timed `repeat` times; a
+# "cold" stage drops the in-process caches (and on-disk snapshots where
+# noted) before every repeat, a "warm" one measures the steady state.
+#
+# Results are JSON: {"meta": {...}, "scales": {"1": {"sizes", "stages":
+# {stage: {"min_ms", "median_ms", "repeat"}}}}}. --compare prints the
+# median ratio per stage against an earlier file.
+#
+# --budget caps the seconds one stage may take at one scale: repeats stop
+# once it is spent, and a stage whose single run would cross it at the
+# next scale (10x the rows) is recorded as {"skipped": true} from there on.
+# ---------------------------------------------------------
+
+import os, sys, json, glob, time, shutil, platform, subprocess
+from datetime import datetime, timezone
+
+import numpy as np
+
+from .config import BASE_DIR, CACHE_DIR
+
+SCALES = (1, 10, 100, 1000)
+BASELINE = os.path.join(BASE_DIR, "bench", "baseline.json")
+BENCH_DIR = os.path.join(CACHE_DIR, "bench")
+PREDICT_FIXTURES = 1000
+SIM_SEED = 7
+
+
+def _timed(fn, repeat: int, setup=None, budget_s: float = None) -> dict:
+    """Best/median of `repeat` runs; stops repeating once the runs so far used up budget_s."""
+    times = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        t = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t) * 1000)
+        if budget_s is not None and sum(times) > budget_s * 1000:
+            break
+    return {"min_ms": round(min(times), 3), "median_ms": round(float(np.median(times)), 3), "repeat": len(times)}
+
+
+# ----------------------------
+# Worker: runs inside PSL_DATA_DIR=<synthetic dir>
+# ----------------------------
+def run_stages(repeat: int, budget_s: float = None, skip=()) -> dict:
+    # imported here: config must already see this process's PSL_DATA_DIR
+    import pandas as pd
+    from . import loaders, scoring, seasons, matching, identity, ratings, selection, prediction, compliance, mapper
+    from .config import CACHE_DIR as data_cache, COMPLIANCE_XLSX, IDENTITY_CSV
+
+    def drop_snapshots(pattern="*"):
+        for p in glob.glob(os.path.join(data_cache, pattern)):
+            if os.path.isfile(p):
+                os.remove(p)
+
+    def drop_log():
+        with compliance._LOG_STATES_LOCK:
+            compliance._LOG_STATES.clear()
+
+    stages = {}
+    drop_snapshots()
+
+    def timed(name, fn, setup=None):
+        stages[name] = {"skipped": True} if name in skip else _timed(fn, repeat, setup, budget_s)
+
+    timed("load_squads (excel)",
+        loaders.load_squads,
+        lambda: (loaders._load_squads.cache_clear(), loaders._FILE_DIGESTS.clear(), drop_snapshots("*.parquet")),
+    )
+    timed("load_squads (snapshot)", loaders.load_squads, loaders._load_squads.cache_clear)
+    squads = loaders.load_squads()
+
+    found = seasons.discover_seasons()
+    # before/after for the loader: every column, inferred dtypes, one file at a time
+    timed("read_leaderboards (full)", lambda: [pd.read_csv(s[k]) for s in found for k in seasons.LEADERBOARDS])
+    timed("read_leaderboards", lambda: seasons.read_season_leaderboards(found))
+    frames = seasons.read_season_leaderboards(found)
+
+    timed("name_matches (compute)",
+        matching.leaderboard_matches,
+        lambda: (matching._leaderboard_matches.cache_clear(), drop_snapshots("name_matches_*.parquet")),
+    )
+    timed("name_matches (snapshot)", matching.leaderboard_matches, matching._leaderboard_matches.cache_clear)
+
+    def drop_registry():
+        identity._player_ids.cache_clear()
+        if os.path.exists(IDENTITY_CSV):
+            os.remove(IDENTITY_CSV)
+
+    timed("player_ids (new registry)", identity.player_ids, drop_registry)
+    timed("player_ids (registry)", identity.player_ids, identity._player_ids.cache_clear)
+    ids = identity.player_ids()
+    sources = [matching.season_source(s) for s in found]
+    timed("build_component_scores",
+        lambda: [scoring.build_component_scores(*f, pids=ids.of_frames(f, src)) for f, src in zip(frames, sources)]
+    )
+
+    timed("ratings (compute)", scoring.compute_player_ratings_and_components)
+    timed("ratings (snapshot)",
+        ratings.build_player_ratings_and_components, ratings._ratings_for_snapshot.cache_clear
+    )
+    ratings_df, _ = ratings.build_player_ratings_and_components()
+
+    timed("xi_roles", selection.compute_xi_roles)
+    timed("rating_index", lambda: ratings.RatingIndex(ratings_df))
+    timed("best_xis", lambda: selection.best_xis(squads, ratings_df))
+
+    best = selection.best_xis(squads, ratings_df)
+    teams = sorted(best)
+    rng = np.random.default_rng(SIM_SEED)
+    pairs = [tuple(rng.choice(len(teams), 2, replace=False)) for _ in range(PREDICT_FIXTURES)]
+    timed(f"predict_match x{PREDICT_FIXTURES}",
+        lambda: [prediction.predict_match(best[teams[a]], best[teams[b]], ratings_df) for a, b in pairs]
+    )
+    timed("sim_profiles", prediction.compute_sim_profiles)
+    a, b = pairs[0]
+    timed("simulate_xi_match",
+        lambda: prediction.simulate_xi_match(best[teams[a]], best[teams[b]], seed=SIM_SEED)
+    )
+
+    timed("compliance_log (excel)",
+        lambda: compliance.load_compliance_log(COMPLIANCE_XLSX),
+        lambda: (drop_log(), loaders._FILE_DIGESTS.clear(), drop_snapshots("PSL02_Compliance_Log__*.parquet")),
+    )
+    timed("compliance_log (snapshot)", lambda: compliance.load_compliance_log(COMPLIANCE_XLSX), drop_log)
+
+    _, apps = compliance.load_compliance_log(COMPLIANCE_XLSX)
+    last = apps["MatchID"].max()
+    timed("mapper (rebuild)", lambda: mapper.update_mappings(squads, apps, rebuild=True))
+    timed("mapper (one new match)",
+        lambda: mapper.update_mappings(squads, apps),
+        lambda: mapper.update_mappings(squads, apps[apps["MatchID"] < last], rebuild=True),
+    )
+    timed("mapper (up to date)", lambda: mapper.update_mappings(squads, apps))
+    version = compliance.compliance_index_version()
+    timed("compliance_index",
+        lambda: compliance._compliance_index(version), compliance._compliance_index.cache_clear
+    )
+    return stages
+
+
+def _worker_main(argv) -> int:
+    from .synthetic import MANIFEST
+
+    # the worker deletes the pid registry and every snapshot: only ever inside a synthetic league
+    # (BENCH_DIR itself moves with PSL_DATA_DIR here, so the league's manifest is the check)
+    data_dir = os.environ.get("PSL_DATA_DIR")
+    if not data_dir or not os.path.isfile(os.path.join(data_dir, MANIFEST)):
+        print("refusing to run: PSL_DATA_DIR must point at a synthetic league (python -m psl bench)", file=sys.stderr)
+        return 2
+    opt = lambda name, default: argv[argv.index(name) + 1] if name in argv else default
+    skip = [s for s in opt("--skip", "").split("|") if s]
+    print(json.dumps(run_stages(int(opt("--repeat", 3)), float(opt("--budget", 0)) or None, skip)))
+    return 0
+
+
+# ----------------------------
+# Driver
+# ----------------------------
+def _meta() -> dict:
+    import pandas as pd
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR, capture_output=True, text=True, timeout=10
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "when": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def run_scale(scale: int, repeat: int, budget_s: float = None, skip=(), seasons: int = 2, log=sys.stderr) -> dict:
+    from .synthetic import generate_league
+
+    data_dir = os.path.join(BENCH_DIR, f"x{scale}" if seasons == 2 else f"x{scale}-s{seasons}")
+    t = time.perf_counter()
+    sizes = generate_league(data_dir, scale, seasons=seasons)
+    print(f"x{scale}: data ready in {time.perf_counter() - t:.1f}s {sizes}", file=log, flush=True)
+
+    shutil.rmtree(os.path.join(data_dir, ".cache"), ignore_errors=True)
+    env = {**os.environ, "PSL_DATA_DIR": data_dir}
+    env.pop("PSL_PROFILE", None)
+    proc = subprocess.run(
+        [sys.executable, "-m", "psl.bench", "--worker", "--repeat", str(repeat),
+         "--budget", str(budget_s or 0), "--skip", "|".join(skip)],
+        cwd=BASE_DIR, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"x{scale} worker failed:\n{proc.stderr[-2000:]}")
+    return {"sizes": sizes, "stages": json.loads(proc.stdout.strip().splitlines()[-1])}
+
+
+def compare(new: dict, old: dict, fail_over: float = None, out=sys.stdout) -> bool:
+    """Print median ratios new/old per scale and stage; False if any is above fail_over."""
+    ok = True
+    for scale, res in new["scales"].items():
+        before = old.get("scales", {}).get(scale)
+        if not before:
+            continue
+        print(f"x{scale}", file=out)
+        for stage, t in res["stages"].items():
+            b = before["stages"].get(stage)
+            if "median_ms" not in t or (b and "median_ms" not in b):
+                continue
+            if not b:
+                print(f"  {stage:<28} {t['median_ms']:>11.2f} ms   (new)", file=out)
+                continue
+            ratio = t["median_ms"] / b["median_ms"] if b["median_ms"] else float("inf")
+            flag = ""
+            if fail_over and ratio > fail_over:
+                ok, flag = False, "  REGRESSION"
+            print(f"  {stage:<28} {b['median_ms']:>11.2f} -> {t['median_ms']:>11.2f} ms  x{ratio:.2f}{flag}", file=out)
+    return ok
+
+
+def print_results(results: dict, out=sys.stdout):
+    scales = list(results["scales"])
+    stages = list(results["scales"][scales[0]]["stages"]) if scales else []
+    print(f"{'median ms':<28}" + "".join(f"{'x' + s:>12}" for s in scales), file=out)
+    for stage in stages:
+        row = [results["scales"][s]["stages"].get(stage, {}).get("median_ms") for s in scales]
+        print(f"{stage:<28}" + "".join(f"{v:>12.2f}" if v is not None else f"{'-':>12}" for v in row), file=out)
+
+
+def main(args) -> int:
+    results = {"meta": {**_meta(), "repeat": args.repeat, "budget_s": args.budget, "seasons": args.seasons}, "scales": {}}
+    skip = set()
+    for scale in sorted(args.scales):
+        res = results["scales"][str(scale)] = run_scale(scale, args.repeat, args.budget, sorted(skip), args.seasons)
+        # a stage whose single run, scaled up linearly, would blow the budget is left out of larger scales
+        for stage, t in res["stages"].items():
+            if "min_ms" in t and args.budget and t["min_ms"] / 1000 * 10 > args.budget:
+                skip.add(stage)
+
+    print_results(results)
+    out = args.output or os.path.join(BENCH_DIR, f"results-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    paths = [out] + ([BASELINE] if args.save_baseline else [])
+    for path in paths:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=1)
+        print(f"saved {path}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            ok = compare(results, json.load(f), args.fail_over)
+        if not ok:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    if "--worker" in sys.argv:
+        sys.exit(_worker_main(sys.argv))
+    sys.exit("use: python -m psl bench")
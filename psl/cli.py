@@ -0,0 +1,300 @@
+# psl/cli.py  (batch predictions from the command line)
+# ---------------------------------------------------------
+#   python -m psl predict fixtures.csv                  # CSV/JSONL in, JSONL out
+#   python -m psl predict - --format csv < fixtures.jsonl
+#   python -m psl predict --remaining                   # unplayed Matches-sheet fixtures
+#   python -m psl serve / loadtest                      # HTTP service, see service.py
+#   python -m psl bench                                 # synthetic-league benchmarks, see bench.py
+#   python -m psl names [--all] [-o report.csv]         # name matches to review, see matching.py
+#   python -m psl map [--rebuild]                       # player_master / appearances_mapped, see mapper.py
+#
+# A fixture row needs team_a / team_b (Team1 / Team2, home / away also work).
+# Optional xi_a / xi_b: a JSON list, or names separated by "|" in CSV; a given
+# XI must be 11 different members of that team's squad (else an error row).
+# Missing XIs use the auto-picked best XI. Rows are streamed one at a time:
+# ratings and best XIs load once, memory does not grow with the input.
+# ---------------------------------------------------------
+
+import argparse, csv, json, os, sys
+from collections import namedtuple
+from difflib import get_close_matches
+from functools import lru_cache
+
+from .config import COMPLIANCE_XLSX, SIM_RUNS, SIM_SEED
+from .normalize import clean_name, clean_names
+from .loaders import load_squads
+from .ratings import build_player_ratings_and_components
+from .selection import XI_SIZE, best_xis
+from .prediction import team_strength, win_probability, simulate_xi_match
+from .compliance import load_compliance_log
+from .season import season_fixtures
+
+TEAM_A_KEYS = ["team_a", "TeamA", "Team A", "Team1", "Team 1", "home", "Home"]
+TEAM_B_KEYS = ["team_b", "TeamB", "Team B", "Team2", "Team 2", "away", "Away"]
+OUTPUT_FIELDS = [
+    "team_a", "team_b", "strength_a", "strength_b", "p_a", "p_b", "model", "xi_a", "xi_b", "line", "error",
+]
+JsonLine = namedtuple("JsonLine", "line text")   # a JSONL row, parsed per row so one bad line is one error row
+
+
+def _first(row: dict, keys):
+    for k in keys:
+        v = row.get(k)
+        if v not in (None, ""):
+            return v
+    return None
+
+
+def _parse_xi(value):
+    if value in (None, ""):
+        return None
+    if isinstance(value, list):
+        return [str(p).strip() for p in value]
+    if not isinstance(value, str):
+        raise ValueError(f"a list of names or a '|'-separated string, not {type(value).__name__}")
+    text = str(value).strip()
+    if text.startswith("["):
+        return [str(p).strip() for p in json.loads(text)]
+    return [p.strip() for p in text.split("|") if p.strip()]
+
+
+def read_fixtures(stream, fmt: str):
+    """Yield fixture rows from a CSV (dicts) or JSONL (JsonLine, decoded by predict_stream) stream."""
+    if fmt == "csv":
+        yield from csv.DictReader(stream)
+        return
+    for n, line in enumerate(stream, 1):
+        line = line.strip()
+        if line:
+            yield JsonLine(n, line)
+
+
+def remaining_fixtures():
+    """Unplayed fixtures from the compliance log's Matches sheet."""
+    matches_df, _ = load_compliance_log(COMPLIANCE_XLSX)
+    for team_a, team_b, result in season_fixtures(matches_df):
+        if result is None:
+            yield {"team_a": team_a, "team_b": team_b}
+
+
+class Predictor:
+    """Ratings, squads and best XIs loaded once; predict() is then per row."""
+
+    def __init__(self, model: str = "rating", sims: int = SIM_RUNS, seed=SIM_SEED):
+        self.model, self.sims, self.seed = model, sims, seed
+        self.squads = load_squads()
+        self.ratings, _ = build_player_ratings_and_components()
+        self.best = best_xis(self.squads, self.ratings)
+        self.teams = {t.casefold(): t for t in self.best}
+        # given XIs may say "Mazhar Iqbal" for the squad's "Mazhar Iqbal (c)"
+        keyed = self.squads.assign(key=clean_names(self.squads["Player"]))
+        self.players = {t: dict(zip(g["key"], g["Player"])) for t, g in keyed.groupby("Team")}
+        # the same XIs come up row after row (auto-picked ones always do)
+        self.strength = lru_cache(maxsize=4096)(lambda xi: team_strength(xi, self.ratings))
+
+    def team(self, name):
+        if name is None:
+            raise ValueError("missing team")
+        key = str(name).strip().casefold()
+        if key in self.teams:
+            return self.teams[key]
+        close = get_close_matches(key, list(self.teams), n=1, cutoff=0.85)   # "Kemari Kings"
+        if close:
+            return self.teams[close[0]]
+        raise ValueError(f"unknown team: {name}")
+
+    def xi(self, team: str, value, side: str = "xi"):
+        """The auto-picked best XI, or the given one: exactly XI_SIZE unique members of the team's squad."""
+        try:
+            given = _parse_xi(value)
+        except ValueError as e:   # also a "[..." string that isn't JSON
+            raise ValueError(f"{side}: {e}") from None
+        if not given:
+            return self.best[team]
+        names = self.players.get(team, {})
+        xi = [names.get(clean_name(p)) for p in given]
+        unknown = [p for p, n in zip(given, xi) if n is None]
+        if unknown:
+            raise ValueError(f"{side}: not in the {team} squad: {', '.join(unknown)}")
+        if len(set(xi)) != len(xi):
+            raise ValueError(f"{side}: players listed twice: {', '.join(sorted({n for n in xi if xi.count(n) > 1}))}")
+        if len(xi) != XI_SIZE:
+            raise ValueError(f"{side}: needs {XI_SIZE} players, got {len(xi)}")
+        return xi
+
+    def predict(self, row: dict) -> dict:
+        team_a = self.team(_first(row, TEAM_A_KEYS))
+        team_b = self.team(_first(row, TEAM_B_KEYS))
+        xi_a = self.xi(team_a, row.get("xi_a"), "xi_a")
+        xi_b = self.xi(team_b, row.get("xi_b"), "xi_b")
+
+        s_a, s_b = self.strength(tuple(xi_a)), self.strength(tuple(xi_b))
+        if self.model == "sim":
+            p_a = simulate_xi_match(xi_a, xi_b, n_sims=self.sims, seed=self.seed)["p_a"]
+        else:
+            p_a = win_probability(s_a, s_b)
+        return {
+            "team_a": team_a,
+            "team_b": team_b,
+            "strength_a": round(s_a, 6),
+            "strength_b": round(s_b, 6),
+            "p_a": round(p_a, 6),
+            "p_b": round(1 - p_a, 6),
+            "model": self.model,
+            "xi_a": xi_a,
+            "xi_b": xi_b,
+        }
+
+
+def predict_stream(rows, predictor: Predictor):
+    """
+    Generator: one output dict per input row; bad rows (JSONL lines that do
+    not parse, rows that are not objects, unknown teams) carry an `error`
+    instead of stopping the run.
+    """
+    for row in rows:
+        line = None
+        try:
+            if isinstance(row, JsonLine):
+                line = row.line
+                row = json.loads(row.text)
+            if not isinstance(row, dict):
+                raise ValueError(f"fixture must be a JSON object, not {type(row).__name__}")
+            out = predictor.predict(row)
+        except Exception as e:
+            out = {"team_a": _first(row, TEAM_A_KEYS), "team_b": _first(row, TEAM_B_KEYS)} if isinstance(row, dict) else {}
+            if line is not None:
+                out["line"] = line
+            out["error"] = str(e)
+        yield out
+
+
+def write_predictions(results, stream, fmt: str) -> tuple:
+    """Write as results arrive; returns (rows written, rows with errors)."""
+    n = errors = 0
+    writer = None
+    if fmt == "csv":
+        writer = csv.DictWriter(stream, fieldnames=OUTPUT_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+    for out in results:
+        n += 1
+        errors += "error" in out
+        if writer is not None:
+            writer.writerow({
+                **out,
+                "xi_a": "|".join(out.get("xi_a") or []),
+                "xi_b": "|".join(out.get("xi_b") or []),
+            })
+        else:
+            stream.write(json.dumps(out, ensure_ascii=False) + "\n")
+    return n, errors
+
+
+def _input_format(path: str, given):
+    if given:
+        return given
+    return "jsonl" if path.lower().endswith((".jsonl", ".json", ".ndjson")) else "csv"
+
+
+def names_main(args) -> int:
+    """Counts per source/status, then the rows a reviewer should look at (every row with --all)."""
+    from .matching import match_report
+
+    report = match_report()
+    counts = report.groupby(["source", "status"]).size().unstack(fill_value=0)
+    print(counts.to_string(), file=sys.stderr)
+    rows = report if args.all else report[report["status"] != "exact"]
+    if args.output:
+        rows.to_csv(args.output, index=False)
+        print(f"saved {args.output}", file=sys.stderr)
+    else:
+        cols = ["source", "name", "match", "score", "status", "runner_up", "runner_up_score"]
+        print(rows[cols].to_string(index=False))
+    return 0
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m psl", description="PSL 2.0 model tools")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    p = sub.add_parser("predict", help="stream win probabilities for fixtures")
+    p.add_argument("input", nargs="?", default="-", help="CSV or JSONL fixtures file, '-' for stdin")
+    p.add_argument("--remaining", action="store_true", help="use the unplayed fixtures in the Matches sheet")
+    p.add_argument("--input-format", choices=["csv", "jsonl"], help="default: from the file extension (stdin: csv)")
+    p.add_argument("--format", choices=["jsonl", "csv"], default="jsonl", help="output format")
+    p.add_argument("-o", "--output", default="-", help="output file, '-' for stdout")
+    p.add_argument("--model", choices=["rating", "sim"], default="rating")
+    p.add_argument("--sims", type=int, default=SIM_RUNS, help="Monte Carlo runs per fixture (--model sim)")
+    p.add_argument("--seed", type=int, default=SIM_SEED)
+    p.add_argument("--strict", action="store_true", help="exit 1 if any row failed")
+
+    p = sub.add_parser("serve", help="HTTP/JSON prediction service (see psl/service.py)")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8765)
+    p.add_argument("--reload-interval", type=float, default=2.0, help="seconds between input change checks")
+
+    p = sub.add_parser("loadtest", help="hammer a running service with keep-alive GETs")
+    p.add_argument("--url", default="http://127.0.0.1:8765/health")
+    p.add_argument("-n", "--requests", type=int, default=10000)
+    p.add_argument("-c", "--concurrency", type=int, default=32)
+
+    p = sub.add_parser("bench", help="time the pipeline on synthetic leagues (see psl/bench.py)")
+    p.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100, 1000], help="league size multiples")
+    p.add_argument("--repeat", type=int, default=3)
+    p.add_argument("--seasons", type=int, default=2, help="Season NN folders per synthetic league")
+    p.add_argument("--budget", type=float, default=120.0,
+                   help="seconds one stage may take per scale; slower stages are skipped at larger scales")
+    p.add_argument("-o", "--output", help="results JSON (default: .cache/bench/results-<time>.json)")
+    p.add_argument("--save-baseline", action="store_true", help="also write bench/baseline.json")
+    p.add_argument("--compare", help="earlier results JSON to compare medians against")
+    p.add_argument("--fail-over", type=float, help="exit 1 if any stage's median grows by more than this factor")
+
+    p = sub.add_parser("names", help="leaderboard/appearance name matches against the squads (see psl/matching.py)")
+    p.add_argument("--all", action="store_true", help="also list exact matches")
+    p.add_argument("-o", "--output", help="write the report as CSV instead of printing it")
+
+    p = sub.add_parser("map", help="update player_master / appearances_mapped from the compliance log (see psl/mapper.py)")
+    p.add_argument("--rebuild", action="store_true", help="map every Appearances row, not just MatchIDs past the watermark")
+    p.add_argument("--no-xlsx", action="store_true", help="only write the Parquet outputs")
+
+    args = ap.parse_args(argv)
+    if args.cmd == "map":
+        from . import mapper
+        return mapper.main(args)
+    if args.cmd == "names":
+        return names_main(args)
+    if args.cmd == "bench":
+        from . import bench
+        return bench.main(args)
+    if args.cmd in ("serve", "loadtest"):
+        import asyncio
+        from . import service   # imports this module, so not at the top
+
+        if args.cmd == "serve":
+            try:
+                asyncio.run(service.serve(args.host, args.port, args.reload_interval))
+            except KeyboardInterrupt:
+                pass
+        else:
+            print(json.dumps(asyncio.run(service.loadtest(args.url, args.requests, args.concurrency))))
+        return 0
+
+    predictor = Predictor(args.model, args.sims, args.seed)
+
+    src = sys.stdin if args.input == "-" else open(args.input, newline="", encoding="utf-8-sig")
+    dst = sys.stdout if args.output == "-" else open(args.output, "w", newline="", encoding="utf-8")
+    try:
+        rows = remaining_fixtures() if args.remaining else read_fixtures(src, _input_format(args.input, args.input_format))
+        n, errors = write_predictions(predict_stream(rows, predictor), dst, args.format)
+    except BrokenPipeError:
+        # reader went away (`| head`): stop quietly, like other CLI tools
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+    finally:
+        if src is not sys.stdin:
+            src.close()
+        if dst is not sys.stdout:
+            dst.close()
+
+    print(f"{n} fixtures, {errors} errors", file=sys.stderr)
+    return 1 if (args.strict and errors) else 0
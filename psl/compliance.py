@@ -0,0 +1,333 @@
+# psl/compliance.py  (PSL02_Compliance_Log.xlsx: loading + who-played matrices)
+# ---------------------------------------------------------
+
+import os, threading
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from .config import (
+    COMPLIANCE_XLSX, MIN_MATCHES_REQUIRED, SQUADS_XLSX, PLAYER_MASTER_XLSX, APPS_MAPPED_XLSX,
+)
+from .normalize import find_col, clean_names
+from .loaders import file_digest, read_excel_sheets_cached, load_squads
+from .mapper import build_player_master, load_mappings, mapper_inputs_key
+from .profiling import span, cached
+
+# ----------------------------
+# Compliance & Participation (PSL02_Compliance_Log.xlsx)
+# ----------------------------
+APPEARANCE_KEYS = ["MatchID", "Team", "Player"]
+
+def _clean_appearances(apps: pd.DataFrame) -> pd.DataFrame:
+    if not apps.empty:
+        apps = apps.copy()
+        for c in ["Team", "Player"]:
+            if c in apps.columns:
+                apps[c] = apps[c].astype(str).str.strip()
+        if "MatchID" in apps.columns:
+            apps["MatchID"] = pd.to_numeric(apps["MatchID"], errors="coerce")
+        apps = apps.dropna(subset=[c for c in APPEARANCE_KEYS if c in apps.columns])
+        apps = apps.drop_duplicates(subset=[c for c in APPEARANCE_KEYS if c in apps.columns]).reset_index(drop=True)
+    return apps
+
+_LOG_STATES = {}
+_LOG_STATES_LOCK = threading.Lock()
+
+def _compliance_log_state(path: str) -> dict:
+    """Last good load of the log, shared by every caller in the process."""
+    with _LOG_STATES_LOCK:
+        state = _LOG_STATES.get(path)
+        if state is None:
+            state = {
+                "lock": threading.Lock(), "sig": None,
+                "matches": pd.DataFrame(), "apps_raw": pd.DataFrame(), "apps": pd.DataFrame(),
+            }
+            _LOG_STATES[path] = state
+            _watch_compliance_log(path, state)
+    return state
+
+def _refresh_compliance_log(path: str, state: dict):
+    """
+    Re-read the log if its size/mtime changed. The whole workbook is parsed
+    again (openpyxl has no "from row n" read); only the cleaning is
+    incremental: when the new Appearances sheet starts with the rows already
+    loaded, just the appended rows are cleaned and merged.
+    """
+    with state["lock"]:
+        try:
+            info = os.stat(path)
+        except OSError:
+            state.update(sig=None, matches=pd.DataFrame(), apps_raw=pd.DataFrame(), apps=pd.DataFrame())
+            return
+        sig = (info.st_size, info.st_mtime_ns)
+        if sig == state["sig"]:
+            return
+
+        try:
+            sheets = read_excel_sheets_cached(path, ["Matches", "Appearances"])
+        except Exception:
+            return  # half-saved / locked file: keep serving the last good load, retry next call
+        matches = sheets.get("Matches", pd.DataFrame())
+        apps_raw = sheets.get("Appearances", pd.DataFrame())
+
+        old_raw, n = state["apps_raw"], len(state["apps_raw"])
+        if n and len(apps_raw) >= n and apps_raw.iloc[:n].equals(old_raw):
+            # scorer appended rows after a match: clean only the new ones (the read above was full)
+            apps = state["apps"]
+            if len(apps_raw) > n:
+                apps = pd.concat([apps, _clean_appearances(apps_raw.iloc[n:])], ignore_index=True)
+                apps = apps.drop_duplicates(subset=[c for c in APPEARANCE_KEYS if c in apps.columns]).reset_index(drop=True)
+        else:
+            apps = _clean_appearances(apps_raw)
+
+        state.update(sig=sig, matches=matches, apps_raw=apps_raw, apps=apps)
+
+def _watch_compliance_log(path: str, state: dict):
+    """
+    Reload as soon as the log is saved (watchdog/inotify; optional, see
+    requirements.txt). Without watchdog, load_compliance_log's stat check is
+    the fallback.
+    """
+    try:
+        from watchdog.observers import Observer
+        from watchdog.events import FileSystemEventHandler
+    except ImportError:
+        return
+
+    target = os.path.abspath(path)
+
+    class _Handler(FileSystemEventHandler):
+        def on_any_event(self, event):
+            # Excel saves via temp file + rename, so check the destination too
+            touched = {os.path.abspath(p) for p in (event.src_path, getattr(event, "dest_path", "")) if p}
+            if target in touched:
+                _refresh_compliance_log(path, state)
+
+    try:
+        observer = Observer()
+        observer.daemon = True
+        observer.schedule(_Handler(), os.path.dirname(target), recursive=False)
+        observer.start()
+    except Exception:
+        pass  # no inotify slots etc. -> polling fallback only
+
+def load_compliance_log(path: str):
+    """
+    Loads Matches + Appearances sheets. Zero parse work while the file is
+    unchanged; re-read right after each save (watcher, or stat check per call).
+    Returned frames are shared across callers: copy before mutating.
+    """
+    state = _compliance_log_state(path)
+    with span("load_compliance_log"):
+        _refresh_compliance_log(path, state)
+    return state["matches"], state["apps"]
+
+
+MATCH_TEAM_A_COLS = ["TeamA", "Team A", "Team1", "Team 1", "Home", "HomeTeam"]
+MATCH_TEAM_B_COLS = ["TeamB", "Team B", "Team2", "Team 2", "Away", "AwayTeam", "Visitor"]
+
+def role_bucket(role: str) -> str:
+    r = str(role).strip().lower()
+    if "brand" in r and "ambassador" in r:
+        return "Brand Ambassador"
+    if "manager" in r:
+        return "Manager"
+    if "mentor" in r:
+        return "Mentor"
+    if "support" in r:
+        return "Supporter"
+    return "Squad"
+
+def get_team_match_ids(matches_df: pd.DataFrame, apps_df: pd.DataFrame, team: str) -> list:
+    """Sorted int MatchIDs for a team (Matches sheet first, Appearances as fallback)."""
+    team_match_ids = []
+    if not matches_df.empty and "MatchID" in matches_df.columns:
+        md = matches_df.copy()
+        md["MatchID"] = pd.to_numeric(md["MatchID"], errors="coerce")
+        colA = find_col(md, MATCH_TEAM_A_COLS)
+        colB = find_col(md, MATCH_TEAM_B_COLS)
+        if colA and colB:
+            team_match_ids = md.loc[(md[colA] == team) | (md[colB] == team), "MatchID"].dropna().unique().tolist()
+        elif "Team" in md.columns:
+            team_match_ids = md.loc[md["Team"] == team, "MatchID"].dropna().unique().tolist()
+
+    if not team_match_ids and not apps_df.empty and "MatchID" in apps_df.columns:
+        team_match_ids = apps_df.loc[apps_df["Team"] == team, "MatchID"].dropna().unique().tolist()
+
+    return sorted([int(x) for x in team_match_ids if pd.notna(x)])
+
+def match_labels(matches_df: pd.DataFrame, team: str, team_match_ids) -> dict:
+    """{MatchID: "vs Opponent (dd-Mon)"} header labels, built column-wise."""
+    label_by_mid = {mid: "vs" for mid in team_match_ids}
+    if matches_df.empty or "MatchID" not in matches_df.columns:
+        return label_by_mid
+
+    md = matches_df.copy()
+    md["MatchID"] = pd.to_numeric(md["MatchID"], errors="coerce")
+    md = md.loc[md["MatchID"].notna()]
+    mids = md["MatchID"].astype(int)
+    md, mids = md.loc[mids.isin(team_match_ids)], mids.loc[mids.isin(team_match_ids)]
+    if md.empty:
+        return label_by_mid
+
+    colA = find_col(md, MATCH_TEAM_A_COLS)
+    colB = find_col(md, MATCH_TEAM_B_COLS)
+    opp = pd.Series("", index=md.index, dtype=object)
+    if colA and colB:
+        t = str(team).strip()
+        ta = md[colA].astype(object).map(str).astype(object).str.strip()
+        tb = md[colB].astype(object).map(str).astype(object).str.strip()
+        opp = tb.where(ta == t, ta.where(tb == t, ""))
+
+    label = ("vs " + opp).where(opp != "", "vs")
+    if "MatchDate" in md.columns:
+        dt_txt = pd.to_datetime(md["MatchDate"], errors="coerce").dt.strftime("%d-%b")
+        label = label.where(dt_txt.isna(), label + " (" + dt_txt.astype(object) + ")")
+
+    # later rows win for a repeated MatchID, like the old row loop
+    label_by_mid.update(zip(mids.tolist(), label.tolist()))
+    return label_by_mid
+
+def _played_matrix(team_apps: pd.DataFrame, col: str, keys, team_match_ids) -> np.ndarray:
+    """bool[len(keys), len(team_match_ids)]: keys[i] has an appearance in team_match_ids[j] (matched on `col`)."""
+    if team_apps.empty or col not in team_apps.columns:
+        return np.zeros((len(keys), len(team_match_ids)), dtype=bool)
+
+    pairs = team_apps[[col, "MatchID"]].dropna()
+    hit = pd.crosstab(pairs[col].to_numpy(dtype=object), pairs["MatchID"].astype(int).to_numpy()) > 0
+    hit = hit.reindex(index=pd.Index(keys, dtype=object), columns=team_match_ids, fill_value=False)
+    return hit.to_numpy(dtype=bool)
+
+def build_compliance_matrix(squad_team: pd.DataFrame, team_apps: pd.DataFrame, team_match_ids, label_by_mid) -> pd.DataFrame:
+    """
+    ✅/❌ matrix for one team via a crosstab of (player, MatchID).
+    A member is matched on player_id first; if that finds no matches, on player_name_key.
+    """
+    squad_team = squad_team.sort_values(["TRole", "Player"]).reset_index(drop=True)
+    n = len(squad_team)
+
+    pids = squad_team["player_id"] if "player_id" in squad_team.columns else pd.Series([None] * n, dtype=object)
+    has_pid = pids.astype(object).where(pids.notna(), None).map(bool).to_numpy(dtype=bool)
+    by_id = _played_matrix(team_apps, "player_id", pids.tolist(), team_match_ids)
+    by_key = _played_matrix(team_apps, "player_name_key", squad_team["player_name_key"].tolist(), team_match_ids)
+
+    use_id = has_pid & by_id.any(axis=1)
+    played = np.where(use_id[:, None], by_id, by_key)
+    cells = np.where(played, "✅", "❌")
+
+    cols = {"Player's Name": squad_team["Player"].tolist(), "TRole": squad_team["TRole"].tolist()}
+    for j, mid in enumerate(team_match_ids):
+        cols[label_by_mid[mid]] = cells[:, j]   # same label twice -> last match wins, first position kept
+    cols["Matches Played"] = played.sum(axis=1).astype(int)          # ✅ 0 if none
+    cols["Total Team Matches"] = np.full(n, len(team_match_ids), dtype=int)
+    return pd.DataFrame(cols)
+
+def team_compliance_matrix(team, squads_df, matches_df, apps_df, pm, team_apps_all) -> pd.DataFrame:
+    """Unfiltered ✅/❌ matrix for one team, or None when the team has no matches yet."""
+    team_match_ids = get_team_match_ids(matches_df, apps_df, team)
+    if not team_match_ids:
+        return None
+
+    # Friendly headers
+    label_by_mid = match_labels(matches_df, team, team_match_ids)
+
+    # Build squad_team and BRING ROLE IN
+    squad_team = pm.loc[pm["Team_canonical"] == str(team).strip()].copy()
+    if squad_team.empty:
+        # fallback from squads_df if master doesn't include team
+        squad_team = build_player_master(squads_df.loc[squads_df["Team"] == team])
+
+    # ✅ Role lookup from squads_df using clean_name key
+    team_roles = squads_df.loc[squads_df["Team"] == team, ["Player", "Role"]].copy()
+    team_roles["player_name_key"] = clean_names(team_roles["Player"].astype(str))
+    role_lookup = team_roles.drop_duplicates("player_name_key").set_index("player_name_key")["Role"].to_dict()
+
+    squad_team["Role"] = squad_team["player_name_key"].map(role_lookup).fillna("Squad")
+    squad_team["TRole"] = squad_team["Role"].apply(role_bucket)
+
+    # Team appearances
+    team_apps = team_apps_all.get(str(team).strip(), pd.DataFrame())
+    if not team_apps.empty:
+        team_apps = team_apps.loc[team_apps["MatchID"].isin(team_match_ids)]
+
+    matrix_df = build_compliance_matrix(squad_team, team_apps, team_match_ids, label_by_mid)
+
+    # --- Force column order: Matches Played BEFORE Total Team Matches ---
+    base_cols = ["Player's Name", "TRole"]
+    tail_cols = ["Matches Played", "Total Team Matches"]
+    match_cols = [c for c in matrix_df.columns if c not in base_cols + tail_cols]
+    return matrix_df[base_cols + match_cols + tail_cols]
+
+def compliance_index_version() -> str:
+    """Changes whenever the log, the squads or the mapper outputs change."""
+    state = _compliance_log_state(COMPLIANCE_XLSX)
+    return repr((
+        state["sig"],
+        file_digest(SQUADS_XLSX),
+        file_digest(PLAYER_MASTER_XLSX),
+        file_digest(APPS_MAPPED_XLSX),
+        mapper_inputs_key(),   # identity registry + match settings
+    ))
+
+def load_compliance_index() -> dict:
+    load_compliance_log(COMPLIANCE_XLSX)  # picks up a saved log before versioning
+    return cached("compliance_index", _compliance_index, compliance_index_version())
+
+@lru_cache(maxsize=4)
+def _compliance_index(version: str) -> dict:
+    """
+    League-wide compliance, built once per data version:
+    team -> match IDs / header labels / ✅❌ matrix (with role buckets),
+    plus a long all-teams summary and a team x round heatmap frame.
+    Shared read-only across callers.
+    """
+    squads_df = load_squads()
+    matches_df, apps_df = load_compliance_log(COMPLIANCE_XLSX)
+    with span("player_mapping"):
+        pm, apps_mapped = load_mappings(squads_df, apps_df)   # only MatchIDs past the mapper's watermark are mapped
+
+    # appearances prepared once, then split per team
+    team_apps_all = {}
+    if not apps_mapped.empty:
+        apps = apps_mapped.copy()
+        apps["MatchID"] = pd.to_numeric(apps["MatchID"], errors="coerce")
+        if "player_name_key" not in apps.columns and "Player" in apps.columns:
+            apps["player_name_key"] = clean_names(apps["Player"])
+        team_apps_all = {t: g for t, g in apps.groupby("Team_canonical", sort=False)}
+
+    teams = sorted(squads_df["Team"].dropna().unique().tolist())
+    matrix, match_ids, summary, heat = {}, {}, [], []
+    for team in teams:
+        with span("team_compliance_matrix", team=team):
+            m = team_compliance_matrix(team, squads_df, matches_df, apps_df, pm, team_apps_all)
+        if m is None:
+            continue
+        matrix[team] = m
+        match_ids[team] = mids = get_team_match_ids(matches_df, apps_df, team)
+
+        summary.append(pd.DataFrame({
+            "Team": team,
+            "Player's Name": m["Player's Name"],
+            "TRole": m["TRole"],
+            "Matches Played": m["Matches Played"],
+            "Total Team Matches": m["Total Team Matches"],
+            f"Min {MIN_MATCHES_REQUIRED} Met": np.where(m["Matches Played"] >= MIN_MATCHES_REQUIRED, "✅", "❌"),
+        }))
+
+        # keyed by round (the team's 1st, 2nd, ... match) so every team shares the x axis;
+        # the per-team "vs X (dd-Mon)" label is only for the tooltip
+        label_by_mid = match_labels(matches_df, team, mids)
+        labels = [label_by_mid[mid] for mid in mids]
+        heat.append(pd.DataFrame({
+            "Team": team,
+            "Round": np.arange(1, len(mids) + 1),
+            "MatchID": mids,
+            "Match": labels,
+            "Played": [int((m[label] == "✅").sum()) for label in labels],
+        }))
+
+    summary_df = pd.concat(summary, ignore_index=True) if summary else pd.DataFrame()
+    heat_df = pd.concat(heat, ignore_index=True) if heat else pd.DataFrame()
+    return {"teams": teams, "match_ids": match_ids, "matrix": matrix, "summary": summary_df, "heat": heat_df}
@@ -0,0 +1,84 @@
+# psl/config.py  (paths + model settings)
+# ---------------------------------------------------------
+# Everything here is plain data; importing it has no side effects.
+# ---------------------------------------------------------
+
+import os
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# League data (squads, leaderboards, compliance log) and its snapshot cache.
+# PSL_DATA_DIR points them at another copy, e.g. the benchmark's synthetic leagues.
+DATA_DIR = os.environ.get("PSL_DATA_DIR") or BASE_DIR
+SQUADS_XLSX = os.path.join(DATA_DIR, "PSL_Team_Players.xlsx")
+BG_IMAGE = os.path.join(BASE_DIR, "assets", "bg.jpg")
+BRAND_IMAGE = os.path.join(BASE_DIR, "assets", "PSL brand.jpg")
+LOGO_DIR = os.path.join(BASE_DIR, "team logos")
+
+# Leaderboards: every "Season NN/<tournament id>_<kind>_leaderboard.csv" set
+# under DATA_DIR is a season (psl/seasons.py), so a new season is a file drop.
+
+TEAM_LOGOS = {
+    "Bubak Blasters": "Bubak.jpg",
+    "Fazilpur Falcons": "Fazilpur.jpg",
+    "Kot Bahadur Shah Bulls": "KBS.jpg",
+    "Keamari Kings": "Keamari.jpg",
+    "Mahmoodkot Mavericks": "MKM.jpg",
+    "Macchike Mustangs": "Mustangs.jpg",
+    "Port Qasim Panthers": "PortQasim.jpg",
+    "Shikarpur Stallions": "Shikarpur.jpg",
+}
+LOGO_TILE_PX = 192         # tile grid cell (~150 css px at 4 per half-page row) with headroom for hi-dpi
+LOGO_HEADER_PX = 180       # XI editor header, shown at 90 css px
+
+# On-disk snapshots (safe to delete; rebuilt from the inputs above)
+CACHE_DIR = os.path.join(DATA_DIR, ".cache")
+
+# Streamlit static serving (server.enableStaticServing): files in <app dir>/static
+# are served at app/static/. Generated from assets/ and team logos/; safe to delete.
+STATIC_DIR = os.path.join(BASE_DIR, "static")
+STATIC_URL = "app/static"
+BG_WIDTHS = (1536, 820)    # desktop, phones (max-width: 820px)
+BRAND_HEIGHT = 88          # topbar logo, shown at 44 css px
+
+# Compliance file (you update after every match)
+COMPLIANCE_XLSX = os.path.join(DATA_DIR, "PSL02_Compliance_Log.xlsx")
+MIN_MATCHES_REQUIRED = 2
+
+# Mapper outputs (psl/mapper.py, `python -m psl map`): the .xlsx copies are for people
+# and only the command writes them. The .parquet files the compliance index reads and
+# the .json MatchID watermark of the incremental updates are cache (rebuilt if deleted).
+PLAYER_MASTER_XLSX = os.path.join(DATA_DIR, "player_master.xlsx")
+APPS_MAPPED_XLSX = os.path.join(DATA_DIR, "appearances_mapped.xlsx")
+PLAYER_MASTER_PARQUET = os.path.join(CACHE_DIR, "player_master.parquet")
+APPS_MAPPED_PARQUET = os.path.join(CACHE_DIR, "appearances_mapped.parquet")
+MAPPER_STATE_JSON = os.path.join(CACHE_DIR, "appearances_mapped.json")
+
+# Player identity registry (psl/identity.py): the integer pid of every person.
+# Data, not cache: pids stay fixed across runs, and a wrong link is fixed by editing its row.
+IDENTITY_CSV = os.path.join(DATA_DIR, "player_identity.csv")
+
+# ----------------------------
+# Model settings
+# ----------------------------
+SEASON_DECAY = 0.32 / 0.68    # weight of each older season relative to the next (two seasons: 32/68)
+W_BAT, W_BOWL, W_FIELD, W_MVP = 0.40, 0.40, 0.10, 0.10
+PROB_SCALE = 3.2
+
+# Monte Carlo mode
+SIM_RUNS = 20000
+SIM_SEED = 2026            # fixed so the same XIs always show the same numbers
+SIM_PRIOR_BALLS = 30       # shrink small samples toward replacement level
+SIM_REPLACEMENT = {"bat_rpb": 0.85, "bat_pout": 1.25, "bowl_runs": 1.15, "bowl_wkts": 0.80}
+
+# Season projection
+SEASON_RUNS = 100000
+
+# Name matching (psl/matching.py): squad <-> leaderboard <-> appearances
+MATCH_MIN_SCORE = 0.80     # weaker best matches stay unmatched
+MATCH_MARGIN = 0.10        # best must beat the runner-up by this, else "ambiguous"
+
+# Auto-pick XI: role minimums, with roles read from the leaderboards
+XI_MINIMUMS = {"bowler": 5, "keeper": 1, "batter": 5}   # 10 overs need 5 bowlers at 2 each
+BOWLER_MIN_BALLS = 6
+BATTER_MIN_BALLS = 10
+NON_PLAYING_ROLES = ("Mentor", "Brand Ambassador")       # only picked if they appear in a leaderboard
@@ -0,0 +1,202 @@
+# psl/identity.py  (one integer id per person: squads, leaderboards, compliance)
+# ---------------------------------------------------------
+# Every person in the squads gets a pid, a positive int64 handed out once
+# and kept in IDENTITY_CSV next to the data. Unlike .cache it is not
+# disposable: pids stay the same from run to run, and a wrong link is fixed
+# by editing its row. The registry holds links (kind, ref) -> pid:
+#
+#   squad        clean_name key of a squad Player
+#   leaderboard  a leaderboard player_id (one per account; a re-registered
+#                player has several), linked to the squad person its name
+#                matches (matching.py: exact or fuzzy) in any season, so an
+#                id whose name only matched once ("Asad Ahmed" in Season 02)
+#                carries its pid to every season ("Asad" in Season 01)
+#
+# Leaderboard ids that match no squad member get no pid until a squad lists
+# them; nothing downstream reads those rows. Links already in the registry
+# are never re-decided.
+#
+# Downstream joins go through PlayerIds: leaderboard rows resolve with one
+# integer map over player_id (the MVP files have none and go through the
+# same season's names), squad Players through a dict, and everything keyed
+# by person (component scores, XI roles, sim profiles, compliance) is keyed
+# by pid.
+# ---------------------------------------------------------
+
+import os, hashlib, threading
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from .config import IDENTITY_CSV
+from .normalize import clean_names, pick_name_col, find_col
+from .loaders import file_digest, load_squads
+from .seasons import PLAYER_ID_COLUMN, discover_seasons, read_season_leaderboards
+from .matching import APPLIED, leaderboard_matches, name_matches_key, season_source
+from .profiling import span, cached
+
+IDENTITY_VERSION = 1       # bump when the linking rules below change
+REGISTRY_COLUMNS = ["pid", "kind", "ref", "name"]
+NO_PID = -1
+
+
+class PlayerIds:
+    """pid lookups for squad Players and leaderboard frames; built by player_ids()."""
+
+    def __init__(self, squad: dict, seasons: dict, by_player: dict):
+        self.squad = squad            # clean_name key -> pid
+        self.seasons = seasons        # season_source -> {"ids": {player_id: pid}, "names": {key: pid}}
+        self.by_player = by_player    # squad Player string as written -> pid (no normalization)
+
+    def of_players(self, players) -> np.ndarray:
+        """int64 pid per name (NO_PID if not a squad person); squad spellings skip clean_name."""
+        names = [str(p).strip() for p in players]
+        out = np.array([self.by_player.get(n, NO_PID) for n in names], dtype=np.int64)
+        miss = np.flatnonzero(out == NO_PID)
+        if len(miss):
+            keys = clean_names(pd.Series([names[i] for i in miss], dtype=object))
+            out[miss] = [self.squad.get(k, NO_PID) for k in keys]
+        return out
+
+    def of_frame(self, df: pd.DataFrame, source: str) -> np.ndarray:
+        """int64 pid per leaderboard row of season `source` (NO_PID for people outside the squads)."""
+        season = self.seasons.get(source, {"ids": {}, "names": {}})
+        col = find_col(df, PLAYER_ID_COLUMN)
+        if col is not None:
+            got = pd.to_numeric(df[col], errors="coerce").map(season["ids"])
+        else:
+            got = clean_names(df[pick_name_col(df)].astype(str).str.strip()).map(season["names"])
+        return got.fillna(NO_PID).to_numpy(dtype=np.int64)
+
+    def of_frames(self, frames, source: str) -> list:
+        return [self.of_frame(f, source) for f in frames]
+
+# ----------------------------
+# Registry (persistent)
+# ----------------------------
+def load_registry(path: str = IDENTITY_CSV) -> pd.DataFrame:
+    try:
+        reg = pd.read_csv(path, dtype={"kind": str, "ref": str, "name": str}, keep_default_na=False)
+    except FileNotFoundError:
+        return pd.DataFrame({c: pd.Series(dtype="int64" if c == "pid" else object) for c in REGISTRY_COLUMNS})
+    reg["pid"] = reg["pid"].astype("int64")
+    return reg[REGISTRY_COLUMNS]
+
+def save_registry(reg: pd.DataFrame, path: str = IDENTITY_CSV):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    reg[REGISTRY_COLUMNS].to_csv(tmp, index=False)
+    os.replace(tmp, path)
+
+def _leaderboard_rows(report: pd.DataFrame) -> pd.DataFrame:
+    """(source, player_id, name, key, pid-to-be) per leaderboard row with an id, joined to its name match."""
+    seasons = discover_seasons()
+    parts = []
+    for s, frames in zip(seasons, read_season_leaderboards(seasons, ("bat", "bowl", "field"))):
+        for f in frames:
+            col = find_col(f, PLAYER_ID_COLUMN)
+            if col is None:
+                continue
+            parts.append(pd.DataFrame({
+                "source": season_source(s),
+                "player_id": pd.to_numeric(f[col], errors="coerce"),
+                "name": f[pick_name_col(f)].map(str).str.strip(),
+            }))
+    if not parts:
+        return pd.DataFrame(columns=["source", "player_id", "name", "key", "status", "match_key", "score"])
+    rows = pd.concat(parts, ignore_index=True).dropna(subset=["player_id"])
+    rows["player_id"] = rows["player_id"].astype("int64")
+    return rows.merge(
+        report[["source", "name", "key", "status", "match_key", "score"]], on=["source", "name"], how="left"
+    )
+
+def resolve_identity(registry: pd.DataFrame, squads: pd.DataFrame, report: pd.DataFrame):
+    """(PlayerIds, registry rows to add) from the registry, the squads and the leaderboard match report."""
+    links = {(k, r): int(p) for p, k, r in zip(registry["pid"], registry["kind"], registry["ref"])}
+    next_pid = int(registry["pid"].max()) + 1 if len(registry) else 1
+    new = []
+
+    # squad people, in sheet order
+    players = squads["Player"].astype(str).str.strip()
+    keys = clean_names(players)
+    for key, name in zip(keys.tolist(), players.tolist()):
+        if key and ("squad", key) not in links:
+            links[("squad", key)] = next_pid
+            new.append((next_pid, "squad", key, name))
+            next_pid += 1
+    squad = {r: p for (k, r), p in links.items() if k == "squad"}
+    by_player = {n: squad[k] for n, k in zip(players.tolist(), keys.tolist()) if k in squad}
+
+    # leaderboard accounts: the best name match over all seasons (exact first, then newest, then score)
+    rows = _leaderboard_rows(report)
+    rows["own"] = rows["match_key"].where(rows["status"].isin(APPLIED)).map(squad)
+    order = {src: i for i, src in enumerate(dict.fromkeys(rows["source"]))}
+    direct = rows.dropna(subset=["own"]).assign(
+        inexact=lambda d: d["status"] != "exact", season=lambda d: d["source"].map(order),
+    ).sort_values(["inexact", "season", "score"], ascending=[True, False, False], kind="stable")
+    for account, name, own in direct.drop_duplicates("player_id")[["player_id", "name", "own"]].itertuples(index=False):
+        ref = str(account)
+        if ("leaderboard", ref) not in links:
+            links[("leaderboard", ref)] = int(own)
+            new.append((int(own), "leaderboard", ref, name))
+    by_id = {int(r): p for (k, r), p in links.items() if k == "leaderboard"}
+
+    seasons = {}
+    for src, part in rows.groupby("source", sort=False):
+        part = part.assign(pid=part["player_id"].map(by_id))
+        part = part[part["pid"].notna()].assign(direct=lambda d: d["pid"] == d["own"])
+        ids = part.groupby("player_id").agg(pid=("pid", "first"), direct=("direct", "any"))
+        # two accounts reaching one person in a season: keep the ones whose own name matched, so no merge
+        shared = ids["pid"].duplicated(keep=False)
+        ids = ids[~shared | ids["direct"]]
+        id_map = dict(zip(ids.index.tolist(), ids["pid"].astype("int64").tolist()))
+        seasons[src] = {"ids": id_map, "names": _season_names(part, id_map, report[report["source"] == src], squad)}
+
+    return PlayerIds(squad, seasons, by_player), pd.DataFrame(new, columns=REGISTRY_COLUMNS)
+
+def _season_names(rows: pd.DataFrame, id_map: dict, report: pd.DataFrame, squad: dict) -> dict:
+    """{clean_name key: pid} for files without player_id: a linked account's name, else the name's own match."""
+    linked = rows[rows["player_id"].isin(list(id_map))]
+    pairs = linked.assign(pid=linked["player_id"].map(id_map))[["key", "pid"]].drop_duplicates()
+    pairs = pairs[~pairs["key"].duplicated(keep=False)]   # a name two linked people share resolves to neither
+    names = dict(zip(pairs["key"].tolist(), pairs["pid"].astype("int64").tolist()))
+    own = report[report["status"].isin(APPLIED)]
+    for k, m in zip(own["key"].tolist(), own["match_key"].tolist()):
+        if m in squad:
+            names.setdefault(k, squad[m])
+    return names
+
+# ----------------------------
+# Memoized per input version
+# ----------------------------
+# key of a registry this process wrote -> the key it was resolved under. Resolving
+# the written registry gives the same pids, so it is not resolved again and the
+# ratings/mapper keys built on identity_key() stay put.
+_WRITTEN = {}
+
+def _inputs_key() -> str:
+    h = hashlib.sha256()
+    h.update(repr((IDENTITY_VERSION, name_matches_key(), file_digest(IDENTITY_CSV))).encode())
+    return h.hexdigest()[:24]
+
+def identity_key() -> str:
+    """Name-match inputs plus the registry itself (a hand edit re-resolves)."""
+    key = _inputs_key()
+    return _WRITTEN.get(key, key)
+
+@lru_cache(maxsize=4)
+def _player_ids(key: str) -> PlayerIds:
+    with span("resolve_identity"):
+        registry = load_registry()
+        ids, new = resolve_identity(registry, load_squads(), leaderboard_matches())
+    if len(new):
+        try:
+            save_registry(pd.concat([registry, new], ignore_index=True))
+            _WRITTEN[_inputs_key()] = key
+        except OSError:
+            pass   # read-only data dir: pids are still assigned deterministically from the inputs
+    return ids
+
+def player_ids() -> PlayerIds:
+    return cached("player_ids", _player_ids, identity_key())
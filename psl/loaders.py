@@ -0,0 +1,118 @@
+# psl/loaders.py  (file digests, Excel snapshot cache, squads)
+# ---------------------------------------------------------
+
+import os, re, glob, hashlib, threading
+from functools import lru_cache
+
+import pandas as pd
+
+from .config import CACHE_DIR, SQUADS_XLSX
+from .profiling import span, cached, cache_event
+
+# path -> ((size, mtime_ns), sha256); module level, so shared by the whole process
+_FILE_DIGESTS = {}
+
+def file_digest(path: str) -> str:
+    """sha256 of a file's bytes; only re-hashed when its size/mtime change."""
+    try:
+        info = os.stat(path)
+    except OSError:
+        return "missing"
+    sig = (info.st_size, info.st_mtime_ns)
+    memo = _FILE_DIGESTS
+    hit = memo.get(path)
+    if hit and hit[0] == sig:
+        return hit[1]
+
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    memo[path] = (sig, h.hexdigest())
+    return h.hexdigest()
+
+def tmp_path(path: str) -> str:
+    """Temp name for a write-then-os.replace; pid + thread id, since Streamlit reruns share one process."""
+    return f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+# ----------------------------
+# Data Load
+# ----------------------------
+def _slug(s) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "_", str(s)).strip("_") or "_"
+
+def _sheet_snapshot_path(path: str, sheet_name, digest: str):
+    prefix = f"{_slug(os.path.splitext(os.path.basename(path))[0])}__{_slug(sheet_name)}__"
+    return os.path.join(CACHE_DIR, f"{prefix}{digest[:16]}.parquet"), prefix
+
+def _write_sheet_snapshot(df: pd.DataFrame, snap: str, prefix: str):
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp = tmp_path(snap)
+        df.to_parquet(tmp, index=False)
+        os.replace(tmp, snap)
+        for old in glob.glob(os.path.join(CACHE_DIR, f"{prefix}*.parquet")):
+            if old != snap:
+                os.remove(old)
+    except Exception:
+        pass  # mixed-type columns Arrow can't store, read-only disk, ... -> just serve from Excel
+
+def read_excel_sheets_cached(path: str, sheet_names) -> dict:
+    """
+    {sheet: DataFrame} served from Parquet copies of the sheets in CACHE_DIR.
+    Copies are keyed on the workbook's content hash, so openpyxl only runs
+    again after the xlsx is edited, and then opens the workbook once for all
+    requested sheets. Sheets the workbook doesn't have are left out.
+    Excel stays the source of truth.
+    """
+    digest = file_digest(path)
+    if digest == "missing":
+        raise FileNotFoundError(path)
+
+    out, todo = {}, []
+    for sh in sheet_names:
+        snap, _ = _sheet_snapshot_path(path, sh, digest)
+        try:
+            out[sh] = pd.read_parquet(snap)
+        except Exception:
+            todo.append(sh)
+    cache_event("excel_snapshot", not todo, file=os.path.basename(path))
+
+    if todo:
+        with span("read_excel", file=os.path.basename(path), sheets=len(todo)), pd.ExcelFile(path) as xl:
+            for sh in todo:
+                if isinstance(sh, str) and sh not in xl.sheet_names:
+                    continue
+                df = xl.parse(sh)
+                _write_sheet_snapshot(df, *_sheet_snapshot_path(path, sh, digest))
+                out[sh] = df
+    return out
+
+def read_excel_cached(path: str, sheet_name=0) -> pd.DataFrame:
+    """pd.read_excel for one sheet, through the Parquet snapshot cache."""
+    sheets = read_excel_sheets_cached(path, [sheet_name])
+    if sheet_name not in sheets:
+        raise ValueError(f"Worksheet named '{sheet_name}' not found")
+    return sheets[sheet_name]
+
+def load_squads():
+    """Squads sheet (Team / Player / Role). Shared per file version: copy before mutating."""
+    return cached("load_squads", _load_squads, file_digest(SQUADS_XLSX))
+
+@lru_cache(maxsize=4)
+def _load_squads(version: str):
+    df = read_excel_cached(SQUADS_XLSX, sheet_name="Team Players")
+
+    # Required cols
+    df["Team"] = df["Team"].astype(str).str.strip()
+    df["Player"] = df["Player"].astype(str).str.strip()
+
+    # Optional Role col
+    if "Role" in df.columns:
+        df["Role"] = df["Role"].astype(str).str.strip()
+    else:
+        df["Role"] = ""
+
+    df = df[(df["Team"] != "") & (df["Team"].str.lower() != "nan") &
+            (df["Player"] != "") & (df["Player"].str.lower() != "nan")]
+    return df
@@ -0,0 +1,259 @@
+# psl/mapper.py  (player_master + appearances_mapped, kept up to date incrementally)
+# ---------------------------------------------------------
+#   python -m psl map              # bring the outputs up to date (new MatchIDs only)
+#   python -m psl map --rebuild    # map every Appearances row again
+#
+# player_master: one row per squad member (player_id = the pid from
+# identity.py, Team_canonical, Player, player_name_key).
+# appearances_mapped: the log's Appearances rows with the same columns,
+# player_id found by team + key, then key alone, then the fuzzy index.
+#
+# Both are written as Parquet under CACHE_DIR (what the compliance index
+# reads) and, from the command, as xlsx next to the data for people.
+# MAPPER_STATE_JSON holds the watermark: the highest MatchID mapped, plus
+# the row count and a hash of the rows up to it. A later run maps only rows
+# with a MatchID above the watermark and appends them. A full rebuild
+# happens when the squads, the identity registry or the match settings
+# change (the master itself changes), when rows at or below the watermark
+# were edited, or when the cache is gone.
+#
+# xlsx outputs this module did not write (their workbook creator is not
+# XLSX_CREATOR) come from some other tool; with no state file they are read
+# as they are, the way the app always did.
+# ---------------------------------------------------------
+
+import os, json, hashlib, threading
+
+import pandas as pd
+
+from .config import (
+    SQUADS_XLSX, PLAYER_MASTER_XLSX, APPS_MAPPED_XLSX, PLAYER_MASTER_PARQUET, APPS_MAPPED_PARQUET,
+    MAPPER_STATE_JSON, MATCH_MIN_SCORE, MATCH_MARGIN,
+)
+from .normalize import clean_names
+from .loaders import file_digest, read_excel_cached
+from .matching import MATCHING_VERSION, NameIndex, key_map
+from .identity import identity_key, player_ids
+from .profiling import span
+
+MAPPER_VERSION = 1         # bump when the mapping rules below change
+MASTER_COLUMNS = ["player_id", "Team_canonical", "Player", "player_name_key"]
+MAPPED_COLUMNS = ["MatchID", "Team", "Player", "Team_canonical", "player_name_key", "player_id"]
+XLSX_CREATOR = "psl.mapper"   # workbook property marking the xlsx copies as ours
+
+# ----------------------------
+# Mapping
+# ----------------------------
+def build_player_master(squads_df: pd.DataFrame) -> pd.DataFrame:
+    """One row per squad member; player_id is the person's pid (identity.py)."""
+    pm = squads_df.copy()
+    pm["Team_canonical"] = pm["Team"].astype(str).str.strip()
+    pm["Player"] = pm["Player"].astype(str).str.strip()
+    pm["player_name_key"] = clean_names(pm["Player"])
+    pm["player_id"] = pm["player_name_key"].map(player_ids().squad).astype("Int64")
+    return pm[MASTER_COLUMNS].drop_duplicates().reset_index(drop=True)
+
+def map_appearances(apps: pd.DataFrame, pm: pd.DataFrame) -> pd.DataFrame:
+    """Appearances rows with Team_canonical, player_name_key and player_id (NA when nobody matches)."""
+    if apps.empty:
+        return apps
+
+    tmp = apps.copy()
+    tmp["Team_canonical"] = tmp["Team"].astype(str).str.strip()
+    tmp["player_name_key"] = clean_names(tmp["Player"])
+
+    lookup = pm[["player_id", "Team_canonical", "player_name_key"]].drop_duplicates()
+    tmp = tmp.merge(lookup, on=["Team_canonical", "player_name_key"], how="left")
+
+    # global fallback ignoring team
+    miss = tmp["player_id"].isna()
+    if miss.any():
+        gl = pm[["player_id", "player_name_key"]].drop_duplicates()
+        tmp2 = tmp.loc[miss].merge(gl, on="player_name_key", how="left", suffixes=("", "_g"))
+        tmp.loc[miss, "player_id"] = tmp2["player_id_g"].values
+
+    # fuzzy fallback for spellings no key joins ("M Zubair." -> Muhammad Zubair); one match is distinct people
+    miss = tmp["player_id"].isna()
+    if miss.any() and not pm.empty:
+        report = NameIndex(pm["Player"].astype(str)).match(
+            tmp.loc[miss, "Player"], "Appearances", tmp.loc[miss, "MatchID"] if "MatchID" in tmp.columns else None
+        )
+        ids = pm.drop_duplicates("player_name_key").set_index("player_name_key")["player_id"]
+        moved = tmp.loc[miss, "player_name_key"].map(key_map(report))
+        tmp.loc[miss, "player_id"] = moved.map(ids).values
+
+    if pd.api.types.is_integer_dtype(pm["player_id"]):
+        tmp["player_id"] = tmp["player_id"].astype("Int64")   # pids stay ints through the NaN-producing merges
+    return tmp
+
+# ----------------------------
+# Outputs made elsewhere (no watermark)
+# ----------------------------
+def read_player_master_xlsx(path: str = PLAYER_MASTER_XLSX) -> pd.DataFrame:
+    pm = read_excel_cached(path)
+    if "Player" not in pm.columns and "player_name_raw" in pm.columns:
+        pm["Player"] = pm["player_name_raw"]
+    if "Team_canonical" not in pm.columns and "Team" in pm.columns:
+        pm["Team_canonical"] = pm["Team"].astype(str).str.strip()
+    if "player_name_key" not in pm.columns:
+        src = "player_name_raw" if "player_name_raw" in pm.columns else "Player"
+        pm["player_name_key"] = clean_names(pm[src])
+    return pm[MASTER_COLUMNS].drop_duplicates()
+
+def read_appearances_mapped_xlsx(path: str = APPS_MAPPED_XLSX) -> pd.DataFrame:
+    am = read_excel_cached(path)
+    if "Team_canonical" not in am.columns and "Team" in am.columns:
+        am["Team_canonical"] = am["Team"].astype(str).str.strip()
+    if "player_name_key" not in am.columns and "Player" in am.columns:
+        am["player_name_key"] = clean_names(am["Player"])
+    return am
+
+# ----------------------------
+# Incremental store
+# ----------------------------
+def mapper_inputs_key() -> str:
+    """Everything the master depends on; a change means every row is mapped again."""
+    h = hashlib.sha256()
+    h.update(repr((MAPPER_VERSION, identity_key(), MATCHING_VERSION, MATCH_MIN_SCORE, MATCH_MARGIN)).encode())
+    h.update(file_digest(SQUADS_XLSX).encode())
+    return h.hexdigest()[:24]
+
+def rows_digest(apps: pd.DataFrame) -> str:
+    """Order-independent hash of (MatchID, Team, Player) rows."""
+    return str(int(pd.util.hash_pandas_object(apps[["MatchID", "Team", "Player"]], index=False).sum()))
+
+def load_state(path: str = MAPPER_STATE_JSON):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _read_parquet(path: str):
+    try:
+        return pd.read_parquet(path)
+    except Exception:
+        return None
+
+def _write_atomic(path: str, write):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    root, ext = os.path.splitext(path)
+    tmp = f"{root}.{os.getpid()}.{threading.get_ident()}.tmp{ext}"   # keeps the extension: to_excel picks its writer by it
+    write(tmp)
+    os.replace(tmp, path)
+
+def _write_xlsx(path: str, df: pd.DataFrame):
+    with pd.ExcelWriter(path, engine="openpyxl") as writer:
+        df.to_excel(writer, index=False)
+        writer.book.properties.creator = XLSX_CREATOR
+
+def _is_ours(path: str) -> bool:
+    from openpyxl import load_workbook
+
+    try:
+        book = load_workbook(path, read_only=True)
+    except Exception:
+        return False
+    try:
+        return book.properties.creator == XLSX_CREATOR
+    finally:
+        book.close()
+
+def _write_json(path: str, obj):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(obj, f, indent=1)
+
+def save_outputs(pm: pd.DataFrame, mapped: pd.DataFrame, state: dict, master: bool = True, xlsx: bool = False):
+    """Parquet first, state last: a crash in between leaves rows above the old watermark, which are re-mapped."""
+    if master:
+        _write_atomic(PLAYER_MASTER_PARQUET, lambda p: pm.to_parquet(p, index=False))
+    _write_atomic(APPS_MAPPED_PARQUET, lambda p: mapped.to_parquet(p, index=False))
+    if xlsx:
+        _write_atomic(PLAYER_MASTER_XLSX, lambda p: _write_xlsx(p, pm))
+        _write_atomic(APPS_MAPPED_XLSX, lambda p: _write_xlsx(p, mapped))
+    _write_atomic(MAPPER_STATE_JSON, lambda p: _write_json(p, state))
+
+def update_mappings(squads_df: pd.DataFrame, apps_df: pd.DataFrame, rebuild: bool = False, xlsx: bool = False) -> dict:
+    """
+    Bring the outputs up to date with the log's Appearances rows and return
+    {"master", "appearances", "new_rows", "rebuilt", "saved"}. Nothing is
+    written when no row is new (unless the xlsx copies are asked for).
+    """
+    key = mapper_inputs_key()
+    cols = ["MatchID", "Team", "Player"]
+    apps = apps_df[cols] if not apps_df.empty else pd.DataFrame(columns=cols)
+
+    state = None if rebuild else load_state()
+    current = bool(state) and state.get("version") == MAPPER_VERSION and state.get("inputs") == key
+    pm = _read_parquet(PLAYER_MASTER_PARQUET) if current else None
+    old, wm = None, None
+    if pm is not None:
+        wm = state.get("watermark")
+        seen = apps[apps["MatchID"] <= wm] if wm is not None else apps.iloc[:0]
+        if len(seen) == state.get("rows") and rows_digest(seen) == state.get("digest"):
+            old = _read_parquet(APPS_MAPPED_PARQUET)
+            if old is not None and wm is not None:
+                old = old[old["MatchID"] <= wm]
+    master = pm is None
+    if master:
+        pm = build_player_master(squads_df)
+
+    if old is not None:
+        new = apps[apps["MatchID"] > wm] if wm is not None else apps
+        if new.empty and not xlsx:
+            return {"master": pm, "appearances": old, "new_rows": 0, "rebuilt": False, "saved": True}
+        with span("map_appearances", rows=len(new)):
+            mapped = pd.concat([old, map_appearances(new, pm)[MAPPED_COLUMNS]], ignore_index=True)
+    else:
+        new = apps
+        with span("map_appearances", rows=len(new)):
+            mapped = map_appearances(apps, pm)
+        mapped = mapped[MAPPED_COLUMNS] if not mapped.empty else pd.DataFrame(columns=MAPPED_COLUMNS)
+
+    state = {
+        "version": MAPPER_VERSION,
+        "inputs": key,
+        "watermark": float(mapped["MatchID"].max()) if len(mapped) else None,
+        "rows": len(mapped),
+        "digest": rows_digest(mapped),
+    }
+    try:
+        save_outputs(pm, mapped, state, master=master, xlsx=xlsx)
+        saved = True
+    except (OSError, ImportError):
+        saved = False   # read-only data dir or no Parquet engine: the mapping is still returned, just redone next time
+    return {"master": pm, "appearances": mapped, "new_rows": len(new), "rebuilt": old is None, "saved": saved}
+
+def load_mappings(squads_df: pd.DataFrame, apps_df: pd.DataFrame) -> tuple:
+    """(player_master, appearances_mapped) for the compliance index."""
+    external = [p for p in (PLAYER_MASTER_XLSX, APPS_MAPPED_XLSX) if os.path.exists(p) and not _is_ours(p)]
+    if external and load_state() is None:
+        pm = read_player_master_xlsx() if PLAYER_MASTER_XLSX in external else build_player_master(squads_df)
+        am = read_appearances_mapped_xlsx() if APPS_MAPPED_XLSX in external else map_appearances(apps_df, pm)
+        return pm, am
+    out = update_mappings(squads_df, apps_df)
+    return out["master"], out["appearances"]
+
+# ----------------------------
+# Command
+# ----------------------------
+def main(args) -> int:
+    import sys
+    from .loaders import load_squads
+    from .compliance import load_compliance_log   # compliance imports this module
+    from .config import COMPLIANCE_XLSX
+
+    _, apps = load_compliance_log(COMPLIANCE_XLSX)
+    out = update_mappings(load_squads(), apps, rebuild=args.rebuild, xlsx=not args.no_xlsx)
+    am = out["appearances"]
+    unmapped = int(am["player_id"].isna().sum()) if len(am) else 0
+    print(
+        f"{'rebuilt' if out['rebuilt'] else 'updated'}: {out['new_rows']} new rows, {len(am)} total "
+        f"({unmapped} unmapped), {len(out['master'])} squad rows, "
+        f"watermark MatchID {am['MatchID'].max() if len(am) else '-'}",
+        file=sys.stderr,
+    )
+    if not out["saved"]:
+        print("outputs NOT saved: the data directory is not writable", file=sys.stderr)
+        return 1
+    return 0
@@ -0,0 +1,261 @@
+# psl/matching.py  (squad <-> leaderboard <-> appearances name reconciliation)
+# ---------------------------------------------------------
+# clean_name keys only join two spellings that normalize to the same
+# string, so "M Aamir Khan" never met "Muhammad Aamir Khan" and every
+# leaderboard row like it scored 0. NameIndex reconciles the rest:
+#
+#   exact      clean_name key shared with exactly one squad member
+#   fuzzy      best similarity >= MATCH_MIN_SCORE, ahead of the runner-up
+#              by MATCH_MARGIN
+#   ambiguous  a near tie ("Umer": Umer Dilshad / Umer Farooq) -> not joined
+#   unmatched  nothing close enough (not in the squads) -> not joined
+#
+# Candidates come from a trigram index over name tokens (blocking), so a
+# lookup scores a few dozen names however big the universe gets. Similarity
+# aligns tokens: an initial agrees with any token of its letter, honorifics
+# (Muhammad, Syed, ...) weigh little, and "Kaleem Ullah" / "Kaleemullah" is
+# caught on the joined letters. Within a group of distinct people (one
+# leaderboard file, one match's appearances) a member already matched
+# exactly is not offered to the other names again, and a member or key two
+# names pull different ways is left ambiguous, so a join never merges two
+# people.
+#
+# Leaderboard matches are memoized per input version and kept on disk as
+# CACHE_DIR/name_matches_<key>.parquet; identity.py turns them into pids
+# and `python -m psl names` prints them.
+# ---------------------------------------------------------
+
+import os, re, glob, hashlib
+from difflib import SequenceMatcher
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from .config import SQUADS_XLSX, CACHE_DIR, MATCH_MIN_SCORE, MATCH_MARGIN
+from .normalize import clean_names, pick_name_col
+from .loaders import file_digest, load_squads, tmp_path
+from .seasons import discover_seasons, season_files, read_season_leaderboards
+from .profiling import span, cached, cache_event
+
+MATCHING_VERSION = 1       # bump when the scoring rules below change
+HONORIFICS = frozenset({
+    "m", "md", "muhammad", "mohammad", "muhammed", "mohammed", "syed", "sayyed", "hafiz", "sheikh", "shaikh",
+})
+TOKEN_MIN_SIM = 0.75       # weaker token pairs count as no match at all
+CANDIDATES = 25            # blocked candidates scored per lookup
+MAX_POSTING_SHARE = 0.02   # trigrams in more names than this are too common to block on
+APPLIED = ("exact", "fuzzy")
+REPORT_COLUMNS = ["source", "name", "key", "match", "match_key", "score", "status", "runner_up", "runner_up_score"]
+
+_PAREN_RE = re.compile(r"\(.*?\)")
+_SPLIT_RE = re.compile(r"[^a-z]+")
+
+
+def name_tokens(name) -> tuple:
+    """Lowercase letter tokens, "(c)"-style tags dropped, initials kept."""
+    return tuple(t for t in _SPLIT_RE.split(_PAREN_RE.sub(" ", str(name).strip().lower())) if t)
+
+def _weight(tok: str) -> float:
+    return 0.25 if len(tok) == 1 or tok in HONORIFICS else 1.0
+
+def _core(tokens) -> str:
+    """Joined letters without initials/honorifics: "m kaleem ullah" -> "kaleemullah"."""
+    core = [t for t in tokens if _weight(t) == 1.0]
+    return "".join(core or tokens)
+
+def _grams(tokens) -> set:
+    core = [t for t in tokens if _weight(t) == 1.0] or [t for t in tokens if len(t) > 1]
+    out = set()
+    for t in core:
+        padded = f" {t} "
+        out.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return out
+
+def _token_sim(a: str, b: str) -> float:
+    if a == b:
+        return 1.0
+    if len(a) == 1 or len(b) == 1:
+        return 1.0 if a[0] == b[0] else 0.0
+    r = SequenceMatcher(None, a, b).ratio()
+    return r if r >= TOKEN_MIN_SIM else 0.0
+
+def name_similarity(a, b) -> float:
+    """
+    0..1 for token tuples a (the lookup) and b (a squad name): weighted token
+    alignment, a's side counting 0.7 and b's 0.3, or the ratio of the joined
+    letters when that is higher.
+    """
+    if not a or not b:
+        return 0.0
+    sims = np.array([[_token_sim(x, y) for y in b] for x in a])
+    wa = np.array([_weight(t) for t in a])
+    wb = np.array([_weight(t) for t in b])
+    aligned = 0.7 * (wa * sims.max(axis=1)).sum() / wa.sum() + 0.3 * (wb * sims.max(axis=0)).sum() / wb.sum()
+    return float(max(aligned, SequenceMatcher(None, _core(a), _core(b)).ratio()))
+
+
+class NameIndex:
+    """Canonical (squad) names, looked up by clean_name key first and by blocked similarity after."""
+
+    def __init__(self, names):
+        self.names = list(dict.fromkeys(str(n).strip() for n in names))
+        self.keys = clean_names(pd.Series(self.names, dtype=object)).tolist()
+        self.tokens = [name_tokens(n) for n in self.names]
+        self.by_key = {}
+        for i, k in enumerate(self.keys):
+            self.by_key.setdefault(k, []).append(i)
+        self._postings = None
+
+    def _index(self) -> dict:
+        """trigram -> member ids; built on the first fuzzy lookup, skipping trigrams too common to narrow anything."""
+        if self._postings is None:
+            postings = {}
+            for i, toks in enumerate(self.tokens):
+                for g in _grams(toks):
+                    postings.setdefault(g, []).append(i)
+            cap = max(64, int(len(self.names) * MAX_POSTING_SHARE))
+            self._postings = {g: np.array(ids, dtype=np.int64) for g, ids in postings.items() if len(ids) <= cap}
+        return self._postings
+
+    def candidates(self, tokens, exclude=()) -> list:
+        """Member ids sharing the most trigrams with `tokens`, best first."""
+        postings = self._index()
+        hits = [postings[g] for g in _grams(tokens) if g in postings]
+        if not hits:
+            return []
+        ids, counts = np.unique(np.concatenate(hits), return_counts=True)
+        order = ids[np.argsort(-counts, kind="stable")]
+        return [i for i in order[:CANDIDATES + len(exclude)].tolist() if i not in exclude][:CANDIDATES]
+
+    def match(self, names, source: str = "", groups=None) -> pd.DataFrame:
+        """
+        Report (REPORT_COLUMNS) for the distinct non-blank names, one row each.
+        groups: optional label per name; names sharing a label are different people.
+        """
+        frame = pd.DataFrame({"name": list(names), "group": list(groups) if groups is not None else 0})
+        frame = frame[frame["name"].notna()]
+        frame["name"] = frame["name"].map(str).str.strip()
+        frame = frame[(frame["name"] != "") & (frame["name"].str.lower() != "nan")]
+        groups_of = frame.groupby("name", sort=False)["group"].agg(lambda g: set(g.tolist()))
+        queries = groups_of.index.tolist()
+        keys = clean_names(pd.Series(queries, dtype=object)).tolist()
+
+        found, claimed, todo = {}, {}, []
+        for j, k in enumerate(keys):
+            hit = self.by_key.get(k, [])
+            if len(hit) == 1:
+                found[j] = (hit[0], 1.0, "exact", None, 0.0)
+                for g in groups_of.iat[j]:
+                    claimed.setdefault(g, set()).add(hit[0])
+            else:
+                todo.append(j)
+
+        for j in todo:
+            toks = name_tokens(queries[j])
+            taken_here = set().union(*(claimed.get(g, ()) for g in groups_of.iat[j]))
+            pool = self.by_key.get(keys[j]) or self.candidates(toks, taken_here)   # same key, several members: tokens decide
+            scored = sorted(((name_similarity(toks, self.tokens[i]), i) for i in pool), key=lambda x: -x[0])
+            if not scored:
+                found[j] = (None, 0.0, "unmatched", None, 0.0)
+                continue
+            (best, i), (second, i2) = scored[0], (scored[1] if len(scored) > 1 else (0.0, None))
+            if best < MATCH_MIN_SCORE:
+                status = "unmatched"
+            elif best - second < MATCH_MARGIN:
+                status = "ambiguous"
+            else:
+                status = "fuzzy"
+            found[j] = (i, best, status, i2, second)
+
+        # a member pulled in by two keys, or a key pulled two ways: keep the strongest, flag the rest
+        fuzzy = sorted((j for j, f in found.items() if f[2] == "fuzzy"), key=lambda j: -found[j][1])
+        key_of, target_of = {}, {}
+        for j in fuzzy:
+            i, k = found[j][0], keys[j]
+            if key_of.setdefault(i, k) != k or target_of.setdefault(k, i) != i:
+                found[j] = (i, found[j][1], "ambiguous", *found[j][3:])
+
+        rows = []
+        for j, (q, k) in enumerate(zip(queries, keys)):
+            i, score, status, i2, second = found[j]
+            rows.append((
+                source, q, k,
+                self.names[i] if i is not None else None, self.keys[i] if i is not None else None,
+                round(score, 4), status,
+                self.names[i2] if i2 is not None else None, round(second, 4),
+            ))
+        return pd.DataFrame(rows, columns=REPORT_COLUMNS)
+
+
+def key_map(report: pd.DataFrame) -> dict:
+    """{lookup key: squad key} for the joins a report adds on top of plain clean_name equality."""
+    moved = report[(report["status"] == "fuzzy") & (report["key"] != report["match_key"])]
+    return dict(zip(moved["key"], moved["match_key"]))
+
+# ----------------------------
+# Leaderboards vs squads (memoized + on-disk)
+# ----------------------------
+def season_source(season: dict) -> str:
+    return f"{season['season']}/{season['tournament']}"
+
+def name_matches_key() -> str:
+    h = hashlib.sha256()
+    h.update(repr((MATCHING_VERSION, MATCH_MIN_SCORE, MATCH_MARGIN, sorted(HONORIFICS))).encode())
+    for path in [*season_files(discover_seasons()), SQUADS_XLSX]:
+        h.update(os.path.basename(path).encode())
+        h.update(file_digest(path).encode())
+    return h.hexdigest()[:24]
+
+def _save_report(path: str, report: pd.DataFrame):
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = tmp_path(path)
+        report.to_parquet(tmp, index=False)
+        os.replace(tmp, path)
+        for old in glob.glob(os.path.join(os.path.dirname(path), "name_matches_*.parquet")):
+            if old != path:
+                os.remove(old)
+    except Exception:
+        pass  # read-only disk etc.: matches are just recomputed next process
+
+@lru_cache(maxsize=4)
+def _leaderboard_matches(key: str) -> pd.DataFrame:
+    path = os.path.join(CACHE_DIR, f"name_matches_{key}.parquet")
+    try:
+        report = pd.read_parquet(path)
+        cache_event("name_matches_snapshot", True)
+        return report
+    except Exception:
+        cache_event("name_matches_snapshot", False)
+
+    seasons = discover_seasons()
+    index = NameIndex(load_squads()["Player"].astype(str))
+    parts = []
+    for s, frames in zip(seasons, read_season_leaderboards(seasons)):
+        with span("match_names", source=season_source(s)):
+            names = [f[pick_name_col(f)].astype(object) for f in frames]
+            groups = np.repeat(np.arange(len(frames)), [len(n) for n in names])   # one file: distinct people
+            parts.append(index.match(pd.concat(names, ignore_index=True), season_source(s), groups))
+    report = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=REPORT_COLUMNS)
+    _save_report(path, report)
+    return report
+
+def leaderboard_matches() -> pd.DataFrame:
+    """Match report for every season's leaderboard names against the squads."""
+    return cached("name_matches", _leaderboard_matches, name_matches_key())
+
+def match_report() -> pd.DataFrame:
+    """Leaderboard matches plus the compliance log's Appearances names, for review."""
+    from .compliance import load_compliance_log   # compliance imports this module
+    from .config import COMPLIANCE_XLSX
+
+    parts = [leaderboard_matches()]
+    try:
+        _, apps = load_compliance_log(COMPLIANCE_XLSX)
+    except FileNotFoundError:
+        apps = pd.DataFrame()
+    if "Player" in apps.columns:
+        groups = apps["MatchID"] if "MatchID" in apps.columns else None
+        parts.append(NameIndex(load_squads()["Player"].astype(str)).match(apps["Player"], "Appearances", groups))
+    return pd.concat(parts, ignore_index=True)
@@ -0,0 +1,113 @@
+# psl/normalize.py  (parsing + name normalization helpers)
+# ---------------------------------------------------------
+
+import re
+import numpy as np
+import pandas as pd
+
+def to_num(x):
+    try:
+        return float(str(x).replace(",", "").strip())
+    except:
+        return 0.0
+
+def to_num_array(series: pd.Series) -> np.ndarray:
+    """Column version of to_num (same parsing rules, one pass over the column)."""
+    if pd.api.types.is_bool_dtype(series):
+        return np.zeros(len(series), dtype=float)   # to_num("True") -> 0.0
+    if pd.api.types.is_numeric_dtype(series):
+        return series.to_numpy(dtype=float, na_value=np.nan)
+
+    values = series.to_numpy(dtype=object)
+    codes, uniq = pd.factorize(values)   # parse each distinct cell text once
+    txt = pd.Series(uniq, dtype=object).map(str).astype(object).str.replace(",", "", regex=False).str.strip()
+    parsed = pd.to_numeric(txt, errors="coerce").astype(float)
+    # cells the fast parser rejected ("nan", "inf", "-", junk...) go through to_num as before
+    bad = parsed.isna()
+    if bad.any():
+        parsed[bad] = txt[bad].map(to_num).astype(float)
+
+    missing = codes < 0
+    out = np.empty(len(values), dtype=float)
+    out[~missing] = parsed.to_numpy(dtype=float)[codes[~missing]]
+    if missing.any():
+        out[missing] = [to_num(v) for v in values[missing]]
+    return out
+
+def zscore(series: pd.Series) -> pd.Series:
+    v = series.astype(float)
+    mu = v.mean()
+    sd = v.std(ddof=0)
+    if sd == 0 or np.isnan(sd):
+        sd = 1.0
+    out = (v - mu) / sd
+    return out.replace([np.inf, -np.inf], 0).fillna(0)
+
+def zscore_rows(x: np.ndarray) -> np.ndarray:
+    """zscore along the last axis of an array (nan ignored in mean/sd, like pandas), in one pass per stat."""
+    x = np.asarray(x, dtype=float)
+    seen = ~np.isnan(x)
+    n = seen.sum(axis=-1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mu = np.where(seen, x, 0.0).sum(axis=-1, keepdims=True) / n
+        sd = np.sqrt(np.where(seen, (x - mu) ** 2, 0.0).sum(axis=-1, keepdims=True) / n)
+        sd = np.where((sd == 0) | np.isnan(sd), 1.0, sd)
+        out = (x - mu) / sd
+    return np.nan_to_num(out, nan=0.0, posinf=0.0, neginf=0.0)
+
+def sigmoid(x):
+    if np.isnan(x) or np.isinf(x):
+        return 0.5
+    return float(1 / (1 + np.exp(-x)))
+
+def pick_name_col(df: pd.DataFrame) -> str:
+    cols = list(df.columns)
+    for c in cols:
+        if str(c).strip().lower() in ["player", "player name", "name", "batsman", "bowler", "fielder"]:
+            return c
+    for c in cols:
+        if "player" in str(c).lower() or "name" in str(c).lower():
+            return c
+    return cols[0]
+
+def find_col(df: pd.DataFrame, options):
+    cols_lower = [str(c).lower() for c in df.columns]
+    for opt in options:
+        if opt.lower() in cols_lower:
+            return df.columns[cols_lower.index(opt.lower())]
+    for opt in options:
+        for i, c in enumerate(cols_lower):
+            if opt.lower() in c:
+                return df.columns[i]
+    return None
+
+# --- Name normalization to match squad vs appearances ---
+# Handles: "A.H. Asad Mughni" vs "Asad Mughni", "(vc)", dots, extra spaces, etc.
+def clean_name(s: str) -> str:
+    s = str(s).strip().lower()
+    s = re.sub(r"\(.*?\)", " ", s)          # remove (vc), (c), etc
+    s = re.sub(r"[^a-z\s]", " ", s)         # remove dots/numbers/specials
+    s = re.sub(r"\s+", " ", s).strip()
+    # remove single-letter initials (a h asad -> asad) but keep normal names
+    parts = [p for p in s.split() if len(p) > 1]
+    return " ".join(parts)
+
+def clean_names(names: pd.Series) -> pd.Series:
+    """clean_name over a whole Series: each distinct name is normalized once, in column passes."""
+    values = names.to_numpy(dtype=object)
+    codes, uniq = pd.factorize(values)
+    # object dtype keeps Python `re` semantics (\s, \b) identical to clean_name
+    s = pd.Series(uniq, dtype=object).map(str).astype(object).str.strip().str.lower()
+    s = s.str.replace(r"\(.*?\)", " ", regex=True)
+    s = s.str.replace(r"[^a-z\s]", " ", regex=True)
+    s = s.str.replace(r"\s+", " ", regex=True).str.strip()
+    # only [a-z] tokens are left, so \b[a-z]\b is exactly a single-letter initial
+    s = s.str.replace(r"\b[a-z]\b", " ", regex=True)
+    s = s.str.replace(r"\s+", " ", regex=True).str.strip()
+
+    missing = codes < 0  # None/NaN: str() differs per value ("none" vs "nan")
+    out = np.empty(len(values), dtype=object)
+    out[~missing] = s.to_numpy(dtype=object)[codes[~missing]]
+    if missing.any():
+        out[missing] = [clean_name(v) for v in values[missing]]
+    return pd.Series(out, index=names.index, dtype=object)
@@ -0,0 +1,228 @@
+# psl/prediction.py  (rating-model and Monte Carlo match predictions)
+# ---------------------------------------------------------
+
+import os, hashlib
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from .config import (
+    CACHE_DIR, PROB_SCALE, SIM_RUNS, SIM_SEED, SIM_PRIOR_BALLS, SIM_REPLACEMENT,
+    XI_MINIMUMS, BOWLER_MIN_BALLS, BATTER_MIN_BALLS, NON_PLAYING_ROLES,
+)
+from .normalize import sigmoid, find_col
+from .loaders import load_squads, tmp_path
+from .scoring import _num_col
+from .seasons import discover_seasons, read_season_leaderboards, season_weights
+from .matching import season_source
+from .identity import NO_PID, player_ids
+from .ratings import ratings_snapshot_key, build_player_ratings_and_components, _prune_snapshots, rating_index
+from .selection import best_xis
+from .simulation import simulate_match
+from .profiling import span, cached, cache_event
+
+# ----------------------------
+# Rating model
+# ----------------------------
+def team_strength(xi, ratings_df):
+    """Sum of the XI's ratings (unknown players count 0): one indexed sum via rating_index()."""
+    return rating_index(ratings_df).strength(xi)
+
+def win_probability(strength_a: float, strength_b: float) -> float:
+    """P(A beats B) from XI strengths (the Predictor's rating model)."""
+    return sigmoid((strength_a - strength_b) / PROB_SCALE)
+
+def predict_match(xi_a, xi_b, ratings_df) -> dict:
+    """Rating-model prediction for two XIs: strengths and win chances."""
+    s_a = team_strength(xi_a, ratings_df)
+    s_b = team_strength(xi_b, ratings_df)
+    p_a = win_probability(s_a, s_b)
+    return {"strength_a": s_a, "strength_b": s_b, "p_a": p_a, "p_b": 1 - p_a}
+
+# ----------------------------
+# Monte Carlo inputs (per-player rates from the leaderboards)
+# ----------------------------
+def _season_rates(frames, pids) -> pd.DataFrame:
+    """Per pid: batting/bowling ball counts and events, catches and matches for one season's bat/bowl/field frames."""
+    (bat, bowl, field), (bat_ids, bowl_ids, field_ids) = frames, pids
+
+    def keyed(df, key, cols):
+        out = pd.DataFrame({"key": key})
+        for name, (opts, default) in cols.items():
+            out[name] = _num_col(df, find_col(df, opts), default)
+        return out
+
+    b = keyed(bat, bat_ids, {
+        "balls": (["ball_faced", "balls faced", "bf"], 0.0),
+        "sr": (["strike_rate", "strike rate"], 0.0),
+        "avg": (["average", "avg"], np.nan),
+    })
+    b["bat_balls"] = np.nan_to_num(b["balls"])
+    b["bat_runs"] = b["bat_balls"] * np.nan_to_num(b["sr"]) / 100
+    # average is "-" (nan) when never dismissed
+    b["bat_outs"] = np.where(b["avg"] > 0, b["bat_runs"] / b["avg"].where(b["avg"] > 0, 1.0), 0.0)
+
+    w = keyed(bowl, bowl_ids, {
+        "bowl_balls": (["balls"], 0.0),
+        "econ": (["economy", "econ"], 0.0),
+        "bowl_wkts_n": (["total_wickets", "wickets", "wkts"], 0.0),
+    })
+    w["bowl_runs_n"] = np.nan_to_num(w["bowl_balls"]) * np.nan_to_num(w["econ"]) / 6
+
+    f = keyed(field, field_ids, {
+        "catches": (["catches", "ct"], 0.0),
+        "field_matches": (["total_match", "matches", "mat"], 0.0),
+    })
+
+    parts = [
+        b[["key", "bat_balls", "bat_runs", "bat_outs"]],
+        w[["key", "bowl_balls", "bowl_runs_n", "bowl_wkts_n"]],
+        f[["key", "catches", "field_matches"]],
+    ]
+    out = pd.concat(parts, ignore_index=True).fillna(0.0)
+    return out[out["key"] != NO_PID].groupby("key").sum()
+
+def compute_sim_profiles():
+    """(profiles indexed by pid, league baselines); seasons recency-weighted like the ratings."""
+    seasons = discover_seasons()
+    weights = season_weights(len(seasons)) * len(seasons)   # mean weight 1 keeps sample sizes honest
+    ids = player_ids()
+    rates = [
+        _season_rates(f, ids.of_frames(f, season_source(s)))
+        for s, f in zip(seasons, read_season_leaderboards(seasons, ("bat", "bowl", "field")))
+    ]
+    prof = pd.concat([r.mul(w) for r, w in zip(rates, weights)]).groupby(level=0).sum()
+
+    league = {
+        "bat_rpb": float(prof["bat_runs"].sum() / max(1.0, prof["bat_balls"].sum())),
+        "bat_pout": float(prof["bat_outs"].sum() / max(1.0, prof["bat_balls"].sum())),
+        "bowl_rpb": float(prof["bowl_runs_n"].sum() / max(1.0, prof["bowl_balls"].sum())),
+        "bowl_pwkt": float(prof["bowl_wkts_n"].sum() / max(1.0, prof["bowl_balls"].sum())),
+        "catch_rate": float(prof["catches"].sum() / max(1.0, prof["field_matches"].sum())),
+    }
+
+    k = SIM_PRIOR_BALLS
+    rep = SIM_REPLACEMENT
+    out = pd.DataFrame(index=prof.index)
+    out["bat_rpb"] = (prof["bat_runs"] + k * league["bat_rpb"] * rep["bat_rpb"]) / (prof["bat_balls"] + k)
+    out["bat_pout"] = (prof["bat_outs"] + k * league["bat_pout"] * rep["bat_pout"]) / (prof["bat_balls"] + k)
+    out["bowl_runs"] = (
+        (prof["bowl_runs_n"] + k * league["bowl_rpb"] * rep["bowl_runs"]) / (prof["bowl_balls"] + k)
+    ) / max(league["bowl_rpb"], 1e-9)
+    out["bowl_wkts"] = (
+        (prof["bowl_wkts_n"] + k * league["bowl_pwkt"] * rep["bowl_wkts"]) / (prof["bowl_balls"] + k)
+    ) / max(league["bowl_pwkt"], 1e-9)
+    out["catch_rate"] = prof["catches"] / prof["field_matches"].where(prof["field_matches"] > 0, np.nan)
+    return out, league
+
+@lru_cache(maxsize=4)
+def _sim_profiles_for(key: str):
+    return compute_sim_profiles()
+
+def load_sim_profiles():
+    return cached("sim_profiles", _sim_profiles_for, ratings_snapshot_key())
+
+def build_sim_team(xi, profiles: pd.DataFrame, league: dict, ids=None) -> dict:
+    """simulation.py team dict for an XI, batting order by expected runs per innings."""
+    rows = profiles.reindex((ids or player_ids()).of_players(xi))
+    rep = SIM_REPLACEMENT
+    bat_rpb = rows["bat_rpb"].fillna(league["bat_rpb"] * rep["bat_rpb"]).to_numpy(dtype=float)
+    bat_pout = rows["bat_pout"].fillna(league["bat_pout"] * rep["bat_pout"]).to_numpy(dtype=float)
+    order = np.argsort(-(bat_rpb / np.maximum(bat_pout, 1e-9)), kind="stable")
+
+    catch_rate = rows["catch_rate"].mean()
+    field = 1.0
+    if league["catch_rate"] > 0 and pd.notna(catch_rate):
+        field = float(np.clip((catch_rate / league["catch_rate"]) ** 0.25, 0.9, 1.1))
+
+    return {
+        "players": [list(xi)[i] for i in order],
+        "bat_rpb": bat_rpb[order],
+        "bat_pout": bat_pout[order],
+        "bowl_runs": rows["bowl_runs"].fillna(rep["bowl_runs"]).to_numpy(dtype=float)[order],
+        "bowl_wkts": rows["bowl_wkts"].fillna(rep["bowl_wkts"]).to_numpy(dtype=float)[order],
+        "field": field,
+    }
+
+def simulate_xi_match(xi_a, xi_b, n_sims=SIM_RUNS, seed=SIM_SEED) -> dict:
+    profiles, league = load_sim_profiles()
+    ids = player_ids()
+    with span("simulate_match", n_sims=n_sims):
+        return simulate_match(
+            build_sim_team(xi_a, profiles, league, ids),
+            build_sim_team(xi_b, profiles, league, ids),
+            n_sims=n_sims,
+            seed=seed,
+        )
+
+# ----------------------------
+# Matchup matrix (every pair, best XI vs best XI; snapshot next to the ratings)
+# ----------------------------
+def matchup_snapshot_key() -> str:
+    """Ratings key plus the XI rules (the only other inputs)."""
+    extra = repr((XI_MINIMUMS, BOWLER_MIN_BALLS, BATTER_MIN_BALLS, NON_PLAYING_ROLES))
+    return hashlib.sha256(f"{ratings_snapshot_key()}|{extra}".encode()).hexdigest()[:24]
+
+def matchup_snapshot_path(key: str) -> str:
+    return os.path.join(CACHE_DIR, f"matchups_{key}.npz")
+
+def compute_matchup_matrix(squads_df: pd.DataFrame, ratings: pd.DataFrame) -> dict:
+    """Best-XI strength per team and P(row beats column) for every pair in one broadcast."""
+    xis = best_xis(squads_df, ratings, 11)
+    teams = list(xis)
+    strength = rating_index(ratings).strengths([xis[t] for t in teams])
+    p = 1 / (1 + np.exp(-(strength[:, None] - strength[None, :]) / PROB_SCALE))
+    np.fill_diagonal(p, np.nan)
+    return {
+        "teams": teams,
+        "strength": pd.Series(strength, index=teams, name="strength"),
+        "p": pd.DataFrame(p, index=teams, columns=teams),
+    }
+
+def save_matchup_snapshot(path: str, mm: dict):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = tmp_path(path)
+    with open(tmp, "wb") as f:
+        np.savez(
+            f,
+            teams=np.array(mm["teams"], dtype=str),
+            strength=mm["strength"].to_numpy(dtype=float),
+            p=mm["p"].to_numpy(dtype=float),
+        )
+    os.replace(tmp, path)
+    _prune_snapshots(path, "matchups_*.npz")
+
+def load_matchup_snapshot(path: str):
+    if not os.path.exists(path):
+        return None
+    try:
+        with np.load(path, allow_pickle=False) as z:
+            teams = z["teams"].tolist()
+            return {
+                "teams": teams,
+                "strength": pd.Series(z["strength"], index=teams, name="strength"),
+                "p": pd.DataFrame(z["p"], index=teams, columns=teams),
+            }
+    except Exception:
+        return None
+
+@lru_cache(maxsize=4)
+def _matchups_for_snapshot(key: str) -> dict:
+    path = matchup_snapshot_path(key)
+    snap = load_matchup_snapshot(path)
+    cache_event("matchup_snapshot", snap is not None)
+    if snap is not None:
+        return snap
+
+    ratings, _ = build_player_ratings_and_components()
+    mm = compute_matchup_matrix(load_squads(), ratings)
+    try:
+        save_matchup_snapshot(path, mm)
+    except OSError:
+        pass
+    return mm
+
+def matchup_matrix() -> dict:
+    """{"teams", "strength" (Series), "p" (DataFrame: P(row beats column))} for the current ratings."""
+    return cached("matchup_matrix", _matchups_for_snapshot, matchup_snapshot_key())
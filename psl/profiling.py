@@ -0,0 +1,150 @@
+# psl/profiling.py  (opt-in timing spans + cache hit/miss records)
+# ---------------------------------------------------------
+#   PSL_PROFILE=1 streamlit run app.py
+#   PSL_PROFILE=1 PSL_PROFILE_LOG=/tmp/psl.jsonl python -m psl predict --remaining
+#
+# Off unless PSL_PROFILE is set. Off, span() hands back one shared no-op
+# context manager and cached() is a plain call, so the instrumented code
+# pays a function call per stage and nothing else.
+#
+# On, each script run (begin_run/end_run, one per Streamlit rerun) becomes
+# one JSONL record: {"run", "ts", "total_ms", "spans": [{"name", "ms",
+# "depth", "cache"?, ...}]}, spans in start order. A span opened outside a
+# run (CLI, service, fragment reruns) is written as a run of its own. The
+# last KEEP_RUNS records are kept in memory for the app's profiler panel.
+# ---------------------------------------------------------
+
+import os, json, time, threading, functools
+from collections import deque
+from contextlib import nullcontext
+
+from .config import CACHE_DIR
+
+ENABLED = os.environ.get("PSL_PROFILE", "").strip().lower() not in ("", "0", "false", "no")
+LOG_PATH = os.environ.get("PSL_PROFILE_LOG") or os.path.join(CACHE_DIR, "profile.jsonl")
+KEEP_RUNS = 20
+
+RUNS = deque(maxlen=KEEP_RUNS)    # finished runs, newest last; shared by the whole process
+_RUNS_LOCK = threading.Lock()
+_local = threading.local()        # per script thread: the open run and the span depth
+_NULL = nullcontext()
+
+
+def _state() -> dict:
+    state = getattr(_local, "state", None)
+    if state is None:
+        state = _local.state = {"depth": 0, "run": None}
+    return state
+
+
+def _finish(record: dict):
+    with _RUNS_LOCK:
+        RUNS.append(record)
+        try:
+            os.makedirs(os.path.dirname(LOG_PATH) or ".", exist_ok=True)
+            with open(LOG_PATH, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        except OSError:
+            pass  # read-only disk: the in-memory panel still works
+
+
+class _Span:
+    __slots__ = ("name", "attrs", "t0", "rec", "owns_run")
+
+    def __init__(self, name: str, attrs: dict):
+        self.name, self.attrs = name, attrs
+
+    def __enter__(self):
+        state = _state()
+        self.owns_run = state["run"] is None     # outside a run: this span is the run
+        if self.owns_run:
+            state["run"] = {"run": self.name, "ts": time.time(), "spans": []}
+        # appended on entry so a run's spans read in start order, parents first
+        self.rec = {"name": self.name, "ms": None, "depth": state["depth"]}
+        state["run"]["spans"].append(self.rec)
+        state["depth"] += 1
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        ms = round((time.perf_counter() - self.t0) * 1000, 3)
+        state = _state()
+        state["depth"] -= 1
+        self.rec["ms"] = ms
+        self.rec.update(self.attrs)
+        if exc[0] is not None:
+            self.rec["error"] = exc[0].__name__
+        if self.owns_run:
+            run, state["run"] = state["run"], None
+            run["total_ms"] = ms
+            _finish(run)
+        return False
+
+
+def span(name: str, **attrs):
+    """`with span("stage"):` times the block; attrs are copied into the record."""
+    if not ENABLED:
+        return _NULL
+    return _Span(name, attrs)
+
+
+def timed(name: str = None):
+    """Decorator form of span(); returns the function untouched when profiling is off."""
+    def wrap(fn):
+        if not ENABLED:
+            return fn
+        label = name or fn.__name__
+
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            with _Span(label, {}):
+                return fn(*args, **kwargs)
+        return inner
+    return wrap
+
+
+def cached(name: str, fn, *args):
+    """fn(*args) for an lru_cache'd fn, as a span marked cache "hit" or "miss"."""
+    if not ENABLED:
+        return fn(*args)
+    misses = fn.cache_info().misses
+    sp = _Span(name, {})
+    with sp:
+        out = fn(*args)
+        sp.attrs = {"cache": "hit" if fn.cache_info().misses == misses else "miss"}
+    return out
+
+
+def cache_event(name: str, hit: bool, **attrs):
+    """A zero-length span for caches that aren't an lru_cache (on-disk snapshots)."""
+    if not ENABLED:
+        return
+    state = _state()
+    if state["run"] is not None:
+        state["run"]["spans"].append(
+            {"name": name, "ms": 0.0, "depth": state["depth"], "cache": "hit" if hit else "miss", **attrs}
+        )
+
+
+def begin_run(label: str = "rerun"):
+    """Start collecting this thread's spans as one run (an unfinished previous run is closed first)."""
+    if not ENABLED:
+        return
+    end_run()
+    _state()["run"] = {"run": label, "ts": time.time(), "t0": time.perf_counter(), "spans": []}
+
+
+def end_run():
+    if not ENABLED:
+        return
+    state = _state()
+    run, state["run"] = state["run"], None
+    if run is None:
+        return
+    run["total_ms"] = round((time.perf_counter() - run.pop("t0")) * 1000, 3)
+    _finish(run)
+
+
+def recent_runs(n: int = KEEP_RUNS) -> list:
+    with _RUNS_LOCK:
+        return list(RUNS)[-n:]
@@ -0,0 +1,162 @@
+# psl/ratings.py  (ratings with an on-disk, content-addressed snapshot)
+# ---------------------------------------------------------
+
+import os, glob, hashlib, weakref
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from .config import (
+    SQUADS_XLSX, CACHE_DIR, SEASON_DECAY, W_BAT, W_BOWL, W_FIELD, W_MVP, PROB_SCALE,
+    MATCH_MIN_SCORE, MATCH_MARGIN,
+)
+from .loaders import file_digest, tmp_path
+from .scoring import compute_player_ratings_and_components
+from .seasons import discover_seasons, season_files
+from .matching import MATCHING_VERSION
+from .identity import identity_key
+from .profiling import span, cached, cache_event
+
+# ----------------------------
+# Ratings snapshot (on-disk, content-addressed)
+# ----------------------------
+RATINGS_SNAPSHOT_VERSION = 4   # bump when the scoring/blending code changes
+
+def ratings_snapshot_key() -> str:
+    """Hash of every ratings input file (all discovered seasons) plus the model constants."""
+    h = hashlib.sha256()
+    h.update(repr((
+        RATINGS_SNAPSHOT_VERSION, SEASON_DECAY, W_BAT, W_BOWL, W_FIELD, W_MVP, PROB_SCALE,
+        MATCHING_VERSION, MATCH_MIN_SCORE, MATCH_MARGIN, identity_key(),
+    )).encode())
+    for path in [*season_files(discover_seasons()), SQUADS_XLSX]:
+        h.update(os.path.basename(path).encode())
+        h.update(file_digest(path).encode())
+    return h.hexdigest()[:24]
+
+def ratings_snapshot_path(key: str) -> str:
+    return os.path.join(CACHE_DIR, f"ratings_{key}.npz")
+
+def save_ratings_snapshot(path: str, ratings_df: pd.DataFrame, comp_df: pd.DataFrame):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = tmp_path(path)
+    with open(tmp, "wb") as f:
+        np.savez(
+            f,
+            ratings_player=ratings_df.index.to_numpy(dtype=str),
+            rating=ratings_df["rating"].to_numpy(dtype=float),
+            comp_player=comp_df.index.to_numpy(dtype=str),
+            comp_columns=np.array(comp_df.columns, dtype=str),
+            comp_values=comp_df.to_numpy(dtype=float),
+        )
+    os.replace(tmp, path)  # readers never see a half-written snapshot
+    _prune_snapshots(path, "ratings_*.npz")
+
+def _prune_snapshots(path: str, pattern: str):
+    """Keep only the current snapshot of one kind."""
+    for old in glob.glob(os.path.join(os.path.dirname(path), pattern)):
+        if old != path:
+            try:
+                os.remove(old)
+            except OSError:
+                pass
+
+def load_ratings_snapshot(path: str):
+    """(ratings_df, comp_df) from a snapshot, or None if it is missing/unreadable."""
+    if not os.path.exists(path):
+        return None
+    try:
+        with np.load(path, allow_pickle=False) as z:
+            ratings_df = pd.DataFrame(
+                {"player": z["ratings_player"].tolist(), "rating": z["rating"]}
+            ).set_index("player")
+            comp_df = pd.DataFrame(
+                z["comp_values"], index=z["comp_player"].tolist(), columns=z["comp_columns"].tolist()
+            )
+    except Exception:
+        return None
+    return ratings_df, comp_df
+
+@lru_cache(maxsize=4)
+def _ratings_for_snapshot(key: str):
+    path = ratings_snapshot_path(key)
+    snap = load_ratings_snapshot(path)
+    cache_event("ratings_snapshot", snap is not None)
+    if snap is not None:
+        return snap
+
+    with span("compute_player_ratings"):
+        ratings_df, comp_df = compute_player_ratings_and_components()
+    try:
+        save_ratings_snapshot(path, ratings_df, comp_df)
+    except OSError:
+        pass  # read-only deploy: still serve the freshly computed ratings
+    return ratings_df, comp_df
+
+def build_player_ratings_and_components():
+    """
+    (ratings_df, comp_df) for the current inputs: in-process cache, then
+    on-disk snapshot, then full rebuild. Shared frames: copy before mutating.
+    """
+    return cached("ratings", _ratings_for_snapshot, ratings_snapshot_key())
+
+# ----------------------------
+# Integer index (player -> id -> contiguous rating array)
+# ----------------------------
+class RatingIndex:
+    """
+    Players as integer ids into one float array. Unknown players get id -1,
+    which points at a trailing 0.0, so an XI's strength is one fancy-indexed
+    sum and a (k, 11) id matrix scores k XIs in one call.
+    """
+
+    def __init__(self, ratings_df: pd.DataFrame, squads_df: pd.DataFrame = None):
+        self.players = ratings_df.index.tolist()
+        self.id_of = {p: i for i, p in enumerate(self.players)}
+        r = ratings_df["rating"].to_numpy(dtype=float)
+        self.values = np.append(np.where(np.isfinite(r), r, 0.0), 0.0)   # nan/inf count as 0, like team_strength
+        self.team_ids = {}
+        if squads_df is not None:
+            for team, g in squads_df.groupby("Team", sort=True):
+                self.team_ids[team] = self.ids(g["Player"])
+
+    def __contains__(self, player) -> bool:
+        return player in self.id_of
+
+    def ids(self, players) -> np.ndarray:
+        return np.fromiter((self.id_of.get(p, -1) for p in players), dtype=np.intp)
+
+    def rating(self, players) -> np.ndarray:
+        return self.values[self.ids(players)]
+
+    def strength(self, xi) -> float:
+        s = float(self.values[self.ids(xi)].sum())
+        return s if np.isfinite(s) else 0.0
+
+    def id_matrix(self, xis) -> np.ndarray:
+        """(k, width) ids for k XIs of any length, padded with -1."""
+        width = max((len(xi) for xi in xis), default=0)
+        out = np.full((len(xis), width), -1, dtype=np.intp)
+        for row, xi in enumerate(xis):
+            out[row, :len(xi)] = self.ids(xi)
+        return out
+
+    def strengths(self, xis) -> np.ndarray:
+        """Strength of many XIs at once: lists of names, or an id matrix from id_matrix()."""
+        ids = xis if isinstance(xis, np.ndarray) else self.id_matrix(xis)
+        s = self.values[ids].sum(axis=1)
+        return np.where(np.isfinite(s), s, 0.0)
+
+
+_RATING_INDEXES = {}
+
+def rating_index(ratings_df: pd.DataFrame) -> RatingIndex:
+    """RatingIndex for a ratings frame, built once per frame object (frames are shared read-only)."""
+    key = id(ratings_df)
+    hit = _RATING_INDEXES.get(key)
+    if hit is not None and hit[0]() is ratings_df:
+        return hit[1]
+    index = RatingIndex(ratings_df)
+    _RATING_INDEXES[key] = (weakref.ref(ratings_df, lambda _, k=key: _RATING_INDEXES.pop(k, None)), index)
+    return index
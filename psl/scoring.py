@@ -0,0 +1,125 @@
+# psl/scoring.py  (leaderboard component scores -> blended player ratings)
+# ---------------------------------------------------------
+
+import numpy as np
+import pandas as pd
+
+from .config import W_BAT, W_BOWL, W_FIELD, W_MVP
+from .normalize import to_num_array, zscore_rows, pick_name_col, find_col, clean_names
+from .loaders import load_squads
+from .seasons import LEADERBOARDS, discover_seasons, read_season_leaderboards, season_weights
+from .matching import season_source
+from .identity import NO_PID, player_ids
+from .profiling import span
+
+# ----------------------------
+# Scoring
+# ----------------------------
+def _num_col(df: pd.DataFrame, col, default=0.0) -> np.ndarray:
+    """Parsed numeric column, or a constant column when the leaderboard doesn't have it."""
+    if col is None:
+        return np.full(len(df), default, dtype=float)
+    return to_num_array(df[col])
+
+def _keyed_scores(df: pd.DataFrame, score: np.ndarray, pids=None) -> dict:
+    """
+    {pid: score} for the rows with a pid, or {clean_name(player): score}
+    (blank/nan names skipped) without; later rows win like dict assignment.
+    """
+    score = np.asarray(score, dtype=float)
+    if pids is not None:
+        keep = pids != NO_PID
+        return dict(zip(pids[keep].tolist(), score[keep].tolist()))
+    raw = df[pick_name_col(df)].astype(str).str.strip().fillna("nan")
+    keep = ((raw != "") & (raw.str.lower() != "nan")).to_numpy(dtype=bool)
+    keys = clean_names(raw[keep])  # ✅ normalized key
+    return dict(zip(keys.tolist(), score[keep].tolist()))
+
+def build_component_scores(bat, bowl, field, mvp, pids=None):
+    """
+    Build component score dictionaries keyed by person: by pid when `pids`
+    (one int array per leaderboard, see identity.py) is given, else by
+    clean_name(player) so messy CSV names still match your canonical squad names.
+    Columns are resolved once and scored as whole arrays (no per-row loop).
+    """
+    pids = pids or (None,) * len(LEADERBOARDS)
+
+    # --------------------
+    # Batting
+    # --------------------
+    runs = _num_col(bat, find_col(bat, ["runs"]))
+    sr   = _num_col(bat, find_col(bat, ["sr", "strike rate"]))
+    avg  = _num_col(bat, find_col(bat, ["avg", "average"]))
+    inns = np.fmax(_num_col(bat, find_col(bat, ["inns", "innings"]), 1.0), 1.0)  # fmax: max(1.0, nan) -> 1.0
+    f50  = _num_col(bat, find_col(bat, ["50s", "fifties"]))
+    f100 = _num_col(bat, find_col(bat, ["100s", "centuries"]))
+
+    bat_score = _keyed_scores(
+        bat, runs + (sr * 0.6) + (avg * 0.8) + (f50 * 10) + (f100 * 25) + (np.log(inns + 1) * 2), pids[0]
+    )
+
+    # --------------------
+    # Bowling
+    # --------------------
+    wk   = _num_col(bowl, find_col(bowl, ["wkts", "wickets"]))
+    eco  = _num_col(bowl, find_col(bowl, ["econ", "economy"]))
+    avg2 = _num_col(bowl, find_col(bowl, ["avg", "average"]))
+    sr2  = _num_col(bowl, find_col(bowl, ["sr", "strike rate"]))
+    mat  = np.fmax(_num_col(bowl, find_col(bowl, ["mat", "matches"]), 1.0), 1.0)
+
+    bowl_score = _keyed_scores(
+        bowl, (wk * 25) + (np.log(mat + 1) * 2) - (eco * 8) - (avg2 * 0.6) - (sr2 * 0.4), pids[1]
+    )
+
+    # --------------------
+    # Fielding
+    # --------------------
+    ct = _num_col(field, find_col(field, ["catches", "ct"]))
+    ro = _num_col(field, find_col(field, ["run out", "runouts", "ro"]))
+
+    field_score = _keyed_scores(field, (ct * 8) + (ro * 10), pids[2])
+
+    # --------------------
+    # MVP
+    # --------------------
+    mvp_score = _keyed_scores(mvp, _num_col(mvp, find_col(mvp, ["points", "pts", "score"])), pids[3])
+
+    return bat_score, bowl_score, field_score, mvp_score
+
+
+def _season_matrix(season_maps, keys) -> np.ndarray:
+    """(seasons, components, players) raw scores; a player a season doesn't list scores 0 there."""
+    out = np.zeros((len(season_maps), len(LEADERBOARDS), len(keys)))
+    for i, maps in enumerate(season_maps):
+        for j, scores in enumerate(maps):
+            out[i, j] = pd.Series(scores, dtype=float).reindex(keys, fill_value=0.0).to_numpy()
+    return out
+
+
+def compute_player_ratings_and_components():
+    seasons = discover_seasons()
+    ids = player_ids()
+    season_maps = []
+    for s, frames in zip(seasons, read_season_leaderboards(seasons)):
+        with span("build_component_scores", season=s["season"]):
+            season_maps.append(build_component_scores(*frames, pids=ids.of_frames(frames, season_source(s))))
+
+    # Build canonical player list from squads
+    squads = load_squads()
+    players = list(dict.fromkeys(squads["Player"].astype(str).tolist()))
+    keys = ids.of_players(players)
+
+    # z-score every (season, component) row over the squad, then one weighted sum across seasons
+    with span("zscore_blend", seasons=len(seasons)):
+        z = zscore_rows(_season_matrix(season_maps, keys))
+        blended = np.tensordot(season_weights(len(seasons)), z, axes=1)   # (components, players)
+        rating = np.array([W_BAT, W_BOWL, W_FIELD, W_MVP]) @ blended
+
+    ratings_df = pd.DataFrame({"player": players, "rating": rating}).set_index("player")
+
+    comp_df = pd.DataFrame(
+        {"Batting": blended[0], "Bowling": blended[1], "Fielding": blended[2], "MVP": blended[3], "Overall": rating},
+        index=pd.Index(players),
+    )
+
+    return ratings_df, comp_df
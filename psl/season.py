@@ -0,0 +1,88 @@
+# psl/season.py  (season projection from the Matches sheet)
+# ---------------------------------------------------------
+# Glue between the compliance log, the matchup matrix and the
+# tournament.py engine.
+# ---------------------------------------------------------
+
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from .config import COMPLIANCE_XLSX, SEASON_RUNS, SIM_SEED
+from .normalize import find_col
+from .loaders import load_squads
+from .compliance import MATCH_TEAM_A_COLS, MATCH_TEAM_B_COLS, _compliance_log_state, load_compliance_log
+from .prediction import matchup_matrix, matchup_snapshot_key
+from .tournament import season_state, simulate_season, QUALIFY_TOP
+from .profiling import cached
+
+# ----------------------------
+# Season projection (remaining fixtures, rating-model win chances)
+# ----------------------------
+MATCH_RESULT_COLS = ["Result", "Winner", "Outcome"]
+
+def season_fixtures(matches_df: pd.DataFrame) -> list:
+    """[(team1, team2, result)] from the Matches sheet; result is None while unplayed."""
+    if matches_df.empty:
+        return []
+    colA = find_col(matches_df, MATCH_TEAM_A_COLS)
+    colB = find_col(matches_df, MATCH_TEAM_B_COLS)
+    if not colA or not colB:
+        return []
+    colR = find_col(matches_df, MATCH_RESULT_COLS)
+    ta = matches_df[colA].astype(object).map(str).str.strip().tolist()
+    tb = matches_df[colB].astype(object).map(str).str.strip().tolist()
+    res = matches_df[colR].astype(object).where(matches_df[colR].notna(), None).tolist() if colR else [None] * len(ta)
+    return list(zip(ta, tb, res))
+
+def fixture_win_probs(state: dict, teams) -> np.ndarray:
+    """Home-side win chance per remaining fixture, read off the matchup matrix."""
+    mm = matchup_matrix()
+    p = mm["p"].reindex(index=teams, columns=teams).to_numpy(dtype=float)
+    return np.nan_to_num(p[state["home"], state["away"]], nan=0.5)
+
+def season_projection_version() -> str:
+    load_compliance_log(COMPLIANCE_XLSX)
+    return repr((_compliance_log_state(COMPLIANCE_XLSX)["sig"], matchup_snapshot_key()))
+
+@lru_cache(maxsize=4)
+def _season_projection(version: str, n_runs: int) -> dict:
+    matches_df, _ = load_compliance_log(COMPLIANCE_XLSX)
+    teams = sorted(load_squads()["Team"].unique().tolist())
+
+    state = season_state(season_fixtures(matches_df), teams)
+    p_home = fixture_win_probs(state, teams)
+    proj = simulate_season(state, p_home, n_runs=n_runs, seed=SIM_SEED)
+
+    table = pd.DataFrame({
+        "Team": teams,
+        "P": state["played"],
+        "W": state["won"],
+        "L": state["lost"],
+        "NR": state["shared"],
+        "Pts": state["points"],
+        "Left": np.bincount(np.concatenate([state["home"], state["away"]]), minlength=len(teams)),
+        "Proj Pts": proj["exp_points"].round(1),
+        f"Top {QUALIFY_TOP} %": (proj["p_qualify"] * 100).round(1),
+        "1st %": (proj["p_first"] * 100).round(1),
+        "Avg Pos": proj["exp_position"].round(2),
+    })
+    positions = pd.DataFrame(proj["pos_probs"] * 100, index=teams, columns=[f"#{k}" for k in range(1, len(teams) + 1)])
+    table = table.sort_values(["Proj Pts", f"Top {QUALIFY_TOP} %"], ascending=False).reset_index(drop=True)
+    fixtures = pd.DataFrame({
+        "Team 1": [teams[i] for i in state["home"]],
+        "Team 2": [teams[j] for j in state["away"]],
+        "Team 1 win %": (p_home * 100).round(1),
+    })
+    return {
+        "table": table,
+        "positions": positions.loc[table["Team"]],
+        "fixtures": fixtures,
+        "n_runs": proj["n_runs"],
+        "remaining": int(len(state["home"])),
+    }
+
+def season_projection(n_runs: int = SEASON_RUNS) -> dict:
+    """Projected points table + position probabilities (%) for the current log and ratings."""
+    return cached("season_projection", _season_projection, season_projection_version(), n_runs)
@@ -0,0 +1,127 @@
+# psl/seasons.py  (season registry: leaderboard discovery + recency weights)
+# ---------------------------------------------------------
+# A season is one "Season NN/<tournament id>_<kind>_leaderboard.csv" set
+# under DATA_DIR with all four kinds present; Season 03 is a file drop.
+# Seasons are ordered oldest first (folder number, then tournament id) and
+# look like the old S01/S02 dicts: {"season", "tournament", "bat", "bowl",
+# "field", "mvp"}.
+#
+# Blends weight a season `age` seasons back by SEASON_DECAY ** age,
+# normalized to sum 1; with two seasons that is the old 32/68 split.
+#
+# Reads only parse the columns the models resolve (LEADERBOARD_COLUMNS,
+# matched against each file's header with the models' own find_col /
+# pick_name_col, so they see the same columns as in the full file) and use
+# pyarrow's multithreaded parser for files big enough to repay its startup.
+# ---------------------------------------------------------
+
+import os, re, csv, glob
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .config import DATA_DIR, SEASON_DECAY
+from .normalize import pick_name_col, find_col
+from .profiling import span
+
+try:
+    import pyarrow  # noqa: F401  (only as pandas' read_csv engine)
+    _PYARROW = True
+except ImportError:
+    _PYARROW = False
+
+LEADERBOARDS = ("bat", "bowl", "field", "mvp")
+LEADERBOARD_FILES = {"bat": "batting", "bowl": "bowling", "field": "fielding", "mvp": "mvp"}
+READ_WORKERS = 8
+PYARROW_MIN_BYTES = 256 << 10   # smaller files parse faster with the C engine
+POOL_MIN_BYTES = 1 << 20        # below this (our real leaderboards are ~10 KB each) threads cost more than they save
+
+# Every find_col option list scoring.py, selection.py, prediction.py and
+# identity.py use on a leaderboard. Other columns (batting_hand, highest_run,
+# ...) are never parsed, so a model reading a new column adds its options here.
+PLAYER_ID_COLUMN = ["player_id"]   # the MVP files have none
+LEADERBOARD_COLUMNS = {
+    "bat": (
+        PLAYER_ID_COLUMN, ["runs"], ["sr", "strike rate"], ["avg", "average"], ["inns", "innings"], ["50s", "fifties"],
+        ["100s", "centuries"], ["ball_faced", "balls faced", "bf"], ["strike_rate", "strike rate"],
+    ),
+    "bowl": (
+        PLAYER_ID_COLUMN, ["wkts", "wickets"], ["econ", "economy"], ["avg", "average"], ["sr", "strike rate"], ["mat", "matches"],
+        ["balls"], ["total_wickets", "wickets", "wkts"],
+    ),
+    "field": (
+        PLAYER_ID_COLUMN, ["catches", "ct"], ["run out", "runouts", "ro"], ["stumpings"], ["caught_behind", "caught behind"],
+        ["total_match", "matches", "mat"],
+    ),
+    "mvp": (PLAYER_ID_COLUMN, ["points", "pts", "score"]),
+}
+
+# (path, kind) -> ((size, mtime_ns), columns); a header is only re-resolved after its file changes
+_COLUMNS = {}
+
+_SEASON_DIR_RE = re.compile(r"^Season\s*(\d+)$", re.IGNORECASE)
+_FILE_RE = re.compile(r"^(\d+)_(batting|bowling|fielding|mvp)_leaderboard\.csv$", re.IGNORECASE)
+
+
+def discover_seasons(data_dir: str = DATA_DIR) -> list:
+    """Every complete leaderboard set under data_dir, oldest season first."""
+    kinds = {v: k for k, v in LEADERBOARD_FILES.items()}
+    found = {}
+    for folder in glob.glob(os.path.join(data_dir, "Season*")):
+        m = _SEASON_DIR_RE.match(os.path.basename(folder))
+        if not m or not os.path.isdir(folder):
+            continue
+        for path in os.listdir(folder):
+            f = _FILE_RE.match(path)
+            if f:
+                key = (int(m.group(1)), int(f.group(1)))
+                found.setdefault(key, {"season": os.path.basename(folder), "tournament": f.group(1)})
+                found[key][kinds[f.group(2).lower()]] = os.path.join(folder, path)
+    # a set still missing a kind (mid-upload) is left out until it is whole
+    return [s for _, s in sorted(found.items()) if all(k in s for k in LEADERBOARDS)]
+
+
+def season_files(seasons) -> list:
+    """Every leaderboard path of `seasons`, in a stable order (for input hashes)."""
+    return [s[k] for s in seasons for k in LEADERBOARDS]
+
+
+def season_weights(n: int, decay: float = SEASON_DECAY) -> np.ndarray:
+    """Recency weights for n seasons (oldest first), summing to 1."""
+    w = np.power(float(decay), np.arange(n - 1, -1, -1, dtype=float))
+    return w / w.sum() if n else w
+
+
+def leaderboard_columns(path: str, kind: str) -> list:
+    """The header columns the models would pick from this file, in file order."""
+    info = os.stat(path)
+    sig = (info.st_size, info.st_mtime_ns)
+    hit = _COLUMNS.get((path, kind))
+    if hit and hit[0] == sig:
+        return hit[1]
+
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        header = pd.DataFrame(columns=next(csv.reader(f), []))
+    used = {pick_name_col(header), *(find_col(header, opts) for opts in LEADERBOARD_COLUMNS[kind])}
+    cols = [c for c in header.columns if c in used]
+    _COLUMNS[(path, kind)] = (sig, cols)
+    return cols
+
+
+def read_leaderboard(path: str, kind: str) -> pd.DataFrame:
+    engine = "pyarrow" if _PYARROW and os.path.getsize(path) >= PYARROW_MIN_BYTES else "c"
+    return pd.read_csv(path, usecols=leaderboard_columns(path, kind), engine=engine)
+
+
+def read_season_leaderboards(seasons, kinds=LEADERBOARDS) -> list:
+    """[[DataFrame per kind] per season]; all files are parsed on a small thread pool."""
+    jobs = [(s[k], k) for s in seasons for k in kinds]
+    with span("read_leaderboards", seasons=len(seasons), files=len(jobs)):
+        if len(jobs) <= 1 or sum(os.path.getsize(p) for p, _ in jobs) < POOL_MIN_BYTES:
+            frames = [read_leaderboard(*j) for j in jobs]
+        else:
+            with ThreadPoolExecutor(max_workers=min(READ_WORKERS, len(jobs))) as pool:
+                frames = list(pool.map(lambda j: read_leaderboard(*j), jobs))
+    n = len(kinds)
+    return [frames[i:i + n] for i in range(0, len(frames), n)]
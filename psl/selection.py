@@ -0,0 +1,155 @@
+# psl/selection.py  (playing XI solver)
+# ---------------------------------------------------------
+# solve_xi is plain NumPy: it takes each squad's ratings plus role flags
+# (bowler / keeper / batter, read from the leaderboards below) and returns
+# the highest-rated XI that meets the role minimums.
+#
+# Players with the same set of flags are interchangeable except for rating,
+# so only the best k of each flag-combination class can be picked. That
+# turns the search into a small DP over (players picked, requirement counts)
+# instead of a search over squad subsets.
+# ---------------------------------------------------------
+
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from .config import XI_MINIMUMS, BOWLER_MIN_BALLS, BATTER_MIN_BALLS, NON_PLAYING_ROLES
+from .normalize import find_col
+from .loaders import load_squads
+from .scoring import _num_col
+from .seasons import discover_seasons, read_season_leaderboards
+from .matching import season_source
+from .identity import NO_PID, player_ids
+from .ratings import ratings_snapshot_key, rating_index
+from .compliance import role_bucket
+from .profiling import span, cached
+
+XI_SIZE = 11
+
+
+def solve_xi(ratings, flags: dict, minimums: dict, size: int = XI_SIZE):
+    """
+    ratings: per-player values (nan/inf count as 0).
+    flags: {requirement: bool array per player}; minimums: {requirement: int}.
+    Returns (sorted player indices, {requirement: shortfall}). When the minimums
+    cannot all be met, the XI with the smallest total shortfall is returned.
+    """
+    value = np.nan_to_num(np.asarray(ratings, dtype=float), nan=0.0, posinf=0.0, neginf=0.0)
+    n = len(value)
+    target = min(size, n)
+    names = [k for k in minimums if minimums[k] > 0]
+    req = tuple(int(minimums[k]) for k in names)
+    bits = np.column_stack([np.asarray(flags[k], dtype=bool) for k in names]) if names else np.zeros((n, 0), bool)
+
+    # classes of identical flags, best-rated first (stable, like the old sort)
+    classes = {}
+    for i in sorted(range(n), key=lambda i: -value[i]):
+        classes.setdefault(tuple(bits[i].tolist()), []).append(i)
+
+    # state: (picked, capped requirement counts) -> (total rating, picks per class)
+    states = {(0, (0,) * len(req)): (0.0, ())}
+    for mask, members in classes.items():
+        prefix = np.concatenate([[0.0], np.cumsum(value[members])])
+        nxt = {}
+        for (picked, have), (total, picks) in states.items():
+            for k in range(0, min(len(members), target - picked) + 1):
+                have_k = tuple(min(r, h + k * b) for r, h, b in zip(req, have, mask))
+                key = (picked + k, have_k)
+                cand = total + prefix[k]
+                if key not in nxt or cand > nxt[key][0] + 1e-12:
+                    nxt[key] = (cand, picks + (k,))
+        states = nxt
+
+    best = max(
+        (item for item in states.items() if item[0][0] == target),
+        key=lambda item: (-sum(r - h for r, h in zip(req, item[0][1])), item[1][0]),
+    )
+    (_, have), (_, picks) = best
+
+    chosen = []
+    for (mask, members), k in zip(classes.items(), picks):
+        chosen.extend(members[:k])
+    shortfall = {name: r - h for name, r, h in zip(names, req, have)}
+    return sorted(chosen, key=lambda i: -value[i]), shortfall
+
+
+def solve_xis(squads: dict, minimums: dict, size: int = XI_SIZE) -> dict:
+    """Batch form: {team: (ratings, flags)} -> {team: (indices, shortfall)}."""
+    return {team: solve_xi(r, f, minimums, size) for team, (r, f) in squads.items()}
+
+# ----------------------------
+# XI roles (bowler / keeper / batter flags per squad player)
+# ----------------------------
+def _role_counts(frames, pids) -> pd.DataFrame:
+    """Per pid: balls faced, balls bowled, keeping dismissals for one season's bat/bowl/field frames."""
+    parts = []
+    for df, key, (name, opts) in zip(frames, pids, (
+        ("bat_balls", [["ball_faced", "balls faced", "bf"]]),
+        ("bowl_balls", [["balls"]]),
+        ("keeping", [["stumpings"], ["caught_behind", "caught behind"]]),
+    )):
+        part = pd.DataFrame({"key": key})
+        part[name] = sum(np.nan_to_num(_num_col(df, find_col(df, o))) for o in opts)
+        parts.append(part)
+    out = pd.concat(parts, ignore_index=True).fillna(0.0)
+    return out[out["key"] != NO_PID].groupby("key").sum()
+
+def compute_xi_roles() -> pd.DataFrame:
+    """bowler/keeper/batter/eligible flags indexed by squad Player (every season counts)."""
+    seasons, ids = discover_seasons(), player_ids()
+    counts = pd.concat([
+        _role_counts(f, ids.of_frames(f, season_source(s)))
+        for s, f in zip(seasons, read_season_leaderboards(seasons, ("bat", "bowl", "field")))
+    ]).groupby(level=0).sum()
+
+    squads = load_squads().drop_duplicates("Player", keep="last")
+    rows = counts.reindex(ids.of_players(squads["Player"])).fillna(0.0)
+    rows.index = squads["Player"].tolist()
+
+    played = (rows[["bat_balls", "bowl_balls", "keeping"]] > 0).any(axis=1)
+    roles = squads["Role"].map(role_bucket).reindex(squads.index)
+    return pd.DataFrame({
+        "bowler": (rows["bowl_balls"] >= BOWLER_MIN_BALLS).to_numpy(),
+        "keeper": (rows["keeping"] > 0).to_numpy(),
+        "batter": (rows["bat_balls"] >= BATTER_MIN_BALLS).to_numpy(),
+        "eligible": (~roles.isin(NON_PLAYING_ROLES)).to_numpy() | played.to_numpy(),
+    }, index=rows.index)
+
+@lru_cache(maxsize=4)
+def _xi_roles_for(key: str) -> pd.DataFrame:
+    return compute_xi_roles()
+
+def load_xi_roles() -> pd.DataFrame:
+    return cached("xi_roles", _xi_roles_for, ratings_snapshot_key())
+
+# ----------------------------
+# Best XI
+# ----------------------------
+def _xi_inputs(team_squad, ratings_df, roles, only_eligible=True):
+    index = rating_index(ratings_df)
+    valid = [p for p in team_squad if p in index]
+    rows = roles.reindex(valid)
+    if only_eligible:
+        keep = rows["eligible"].fillna(True).to_numpy(dtype=bool)
+        valid, rows = [p for p, k in zip(valid, keep) if k], rows[keep]
+    flags = {k: rows[k].fillna(False).to_numpy(dtype=bool) for k in XI_MINIMUMS}
+    return valid, index.rating(valid), flags
+
+def best_xi(team_squad, ratings_df, n=11, only_eligible=True):
+    """Highest-rated n from the squad that still meets XI_MINIMUMS (bowlers, keeper, batters)."""
+    valid, rating, flags = _xi_inputs(team_squad, ratings_df, load_xi_roles(), only_eligible)
+    with span("solve_xi", squad=len(valid)):
+        picked, _ = solve_xi(rating, flags, XI_MINIMUMS, n)
+    return [valid[i] for i in picked]
+
+def best_xis(squads_df, ratings_df, n=11) -> dict:
+    """best_xi for every team in one call: {team: [players]}."""
+    roles = load_xi_roles()
+    inputs = {
+        team: _xi_inputs(squads_df.loc[squads_df["Team"] == team, "Player"].tolist(), ratings_df, roles)
+        for team in sorted(squads_df["Team"].unique().tolist())
+    }
+    solved = solve_xis({t: (r, f) for t, (_, r, f) in inputs.items()}, XI_MINIMUMS, n)
+    return {t: [inputs[t][0][i] for i in picked] for t, (picked, _) in solved.items()}
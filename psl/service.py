@@ -0,0 +1,247 @@
+# psl/service.py  (local HTTP/JSON prediction service)
+# ---------------------------------------------------------
+#   python -m psl serve --port 8765
+#   python -m psl loadtest --url http://127.0.0.1:8765/predict?team_a=...&team_b=... -n 20000 -c 64
+#
+# Plain asyncio (no web framework), HTTP/1.1 with keep-alive.
+#   GET  /health
+#   GET  /teams
+#   GET  /best_xi?team=...
+#   GET  /predict?team_a=...&team_b=...      (best XIs)
+#   POST /predict  {"team_a", "team_b", "xi_a"?, "xi_b"?}
+#   GET  /matchups
+#   GET  /compliance?team=...                (omit team for the league summary)
+#
+# Everything a request needs sits in one immutable Snapshot. A watcher polls
+# the input versions and builds a fresh Snapshot off the event loop when
+# they change, then swaps the reference: requests see the old or the new
+# data, never a mix.
+# ---------------------------------------------------------
+
+import asyncio, hashlib, json, time
+from urllib.parse import urlsplit, parse_qsl
+
+from .config import COMPLIANCE_XLSX, MIN_MATCHES_REQUIRED
+from .cli import Predictor, predict_stream
+from .compliance import load_compliance_log, load_compliance_index, compliance_index_version
+from .prediction import matchup_matrix, matchup_snapshot_key
+
+RELOAD_INTERVAL = 2.0       # seconds between input version checks
+MAX_BODY = 1 << 20
+
+
+def data_version() -> str:
+    load_compliance_log(COMPLIANCE_XLSX)   # stat check, picks up a saved log
+    key = repr((matchup_snapshot_key(), compliance_index_version()))
+    return hashlib.sha256(key.encode()).hexdigest()[:16]
+
+
+class Snapshot:
+    """Ratings, best XIs and pre-rendered JSON for one input version."""
+
+    def __init__(self, version: str):
+        self.version = version
+        self.loaded_at = time.time()
+        self.predictor = Predictor()
+
+        mm = matchup_matrix()
+        p = mm["p"].round(6)
+        self.matchups = _dumps({
+            "teams": mm["teams"],
+            "strength": {t: round(float(v), 6) for t, v in mm["strength"].items()},
+            "p": {a: {b: (None if a == b else float(p.at[a, b])) for b in mm["teams"]} for a in mm["teams"]},
+        })
+        self.teams = _dumps({"teams": sorted(self.predictor.best)})
+
+        index = load_compliance_index()
+        summary = index["summary"]
+        met_col = f"Min {MIN_MATCHES_REQUIRED} Met"
+        self.compliance = {}
+        if not summary.empty:
+            for team, g in summary.groupby("Team", sort=True):
+                self.compliance[team] = [
+                    {
+                        "player": r["Player's Name"],
+                        "role": r["TRole"],
+                        "matches_played": int(r["Matches Played"]),
+                        "team_matches": int(r["Total Team Matches"]),
+                        "min_met": r[met_col] == "✅",
+                    }
+                    for r in g.to_dict("records")
+                ]
+        self.league = _dumps({
+            team: {
+                "members": len(rows),
+                "matches": max((r["team_matches"] for r in rows), default=0),
+                "min_met": sum(r["min_met"] for r in rows),
+            }
+            for team, rows in self.compliance.items()
+        })
+
+
+def _dumps(obj) -> bytes:
+    return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+
+class PredictionService:
+    def __init__(self, reload_interval: float = RELOAD_INTERVAL):
+        self.reload_interval = reload_interval
+        self.snapshot = None
+        self.requests = 0
+
+    async def start(self):
+        version = await asyncio.to_thread(data_version)
+        self.snapshot = await asyncio.to_thread(Snapshot, version)
+        self._watcher = asyncio.create_task(self._watch())
+
+    async def _watch(self):
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            try:
+                version = await asyncio.to_thread(data_version)
+                if version != self.snapshot.version:
+                    self.snapshot = await asyncio.to_thread(Snapshot, version)   # atomic swap
+            except Exception:
+                pass  # half-saved input: keep serving the last good snapshot, retry next tick
+
+    # ----------------------------
+    # Routes
+    # ----------------------------
+    def route(self, method: str, path: str, query: dict, body: bytes):
+        snap = self.snapshot
+        if path == "/health":
+            return 200, _dumps({"ok": True, "version": snap.version, "loaded_at": snap.loaded_at,
+                                "requests": self.requests})
+        if path == "/teams":
+            return 200, snap.teams
+        if path == "/matchups":
+            return 200, snap.matchups
+        if path == "/best_xi":
+            team = snap.predictor.team(query.get("team"))
+            xi = snap.predictor.best[team]
+            return 200, _dumps({"team": team, "xi": xi, "strength": snap.predictor.strength(tuple(xi))})
+        if path == "/predict":
+            row = json.loads(body or b"{}") if method == "POST" else query
+            out = next(predict_stream([row], snap.predictor))
+            return (400 if "error" in out else 200), _dumps(out)
+        if path == "/compliance":
+            team = query.get("team")
+            if not team:
+                return 200, snap.league
+            team = snap.predictor.team(team)
+            return 200, _dumps({"team": team, "players": snap.compliance.get(team, [])})
+        return 404, _dumps({"error": f"no route: {path}"})
+
+    # ----------------------------
+    # HTTP/1.1
+    # ----------------------------
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                    break
+                lines = head.decode("latin-1").split("\r\n")
+                try:
+                    method, target, version = lines[0].split(" ", 2)
+                except ValueError:
+                    break
+                headers = {}
+                for line in lines[1:]:
+                    if ":" in line:
+                        k, v = line.split(":", 1)
+                        headers[k.strip().lower()] = v.strip()
+
+                self.requests += 1
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                try:
+                    length = int(headers.get("content-length") or 0)
+                except ValueError:
+                    length = -1
+                if length < 0 or length > MAX_BODY:
+                    # the body can't be skipped safely: answer, then close the connection
+                    if length > MAX_BODY:
+                        status, payload = 413, _dumps({"error": f"body over {MAX_BODY} bytes"})
+                    else:
+                        status, payload = 400, _dumps({"error": "bad Content-Length"})
+                    keep_alive = False
+                else:
+                    body = await reader.readexactly(length) if length else b""
+                    url = urlsplit(target)
+                    try:
+                        status, payload = self.route(method.upper(), url.path, dict(parse_qsl(url.query)), body)
+                    except ValueError as e:          # unknown team, bad JSON
+                        status, payload = 400, _dumps({"error": str(e)})
+                    except Exception as e:
+                        status, payload = 500, _dumps({"error": str(e)})
+
+                writer.write(
+                    f"HTTP/1.1 {status} {_REASONS.get(status, 'OK')}\r\n"
+                    f"Content-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(payload)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + payload
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass   # client went away, possibly mid-body
+        finally:
+            writer.close()
+
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+async def serve(host: str = "127.0.0.1", port: int = 8765, reload_interval: float = RELOAD_INTERVAL):
+    service = PredictionService(reload_interval)
+    await service.start()
+    server = await asyncio.start_server(service.handle, host, port, backlog=1024)
+    print(f"serving on http://{host}:{port}", flush=True)
+    async with server:
+        await server.serve_forever()
+
+
+# ----------------------------
+# Stand-in client for load tests
+# ----------------------------
+async def _client(host, port, request: bytes, n: int, latencies: list):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for _ in range(n):
+            t = time.perf_counter()
+            writer.write(request)
+            await writer.drain()
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = 0
+            for line in head.split(b"\r\n"):
+                if line.lower().startswith(b"content-length:"):
+                    length = int(line.split(b":", 1)[1])
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - t)
+    finally:
+        writer.close()
+
+
+async def loadtest(url: str, requests: int = 10000, concurrency: int = 32) -> dict:
+    """Keep-alive GETs from `concurrency` connections; returns throughput and latency percentiles."""
+    u = urlsplit(url)
+    target = u.path + (f"?{u.query}" if u.query else "")
+    request = f"GET {target} HTTP/1.1\r\nHost: {u.netloc}\r\n\r\n".encode("latin-1")
+    per, extra = divmod(requests, concurrency)
+    latencies = []
+    t = time.perf_counter()
+    await asyncio.gather(*[
+        _client(u.hostname, u.port or 80, request, per + (i < extra), latencies) for i in range(concurrency)
+    ])
+    elapsed = time.perf_counter() - t
+    latencies.sort()
+    pct = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000 if latencies else 0.0
+    return {
+        "requests": len(latencies),
+        "seconds": round(elapsed, 3),
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(pct(0.50), 3),
+        "p99_ms": round(pct(0.99), 3),
+    }
@@ -0,0 +1,119 @@
+# psl/simulation.py  (Monte Carlo match engine)
+# ---------------------------------------------------------
+# Pure NumPy: no Streamlit import, so it can be used from worker
+# processes and scripts. prediction.py builds the per-player rates from the
+# Season leaderboards (build_sim_team) and calls simulate_match().
+#
+# A team is a dict of arrays, one entry per XI player, in batting order:
+#   bat_rpb      runs per ball faced
+#   bat_pout     chance of getting out on a ball faced
+#   bowl_runs    runs-conceded factor vs league (1.0 = league average)
+#   bowl_wkts    wicket-taking factor vs league
+#   field        fielding multiplier applied to the *opponent's* dismissal chance
+# ---------------------------------------------------------
+
+from statistics import NormalDist
+
+import numpy as np
+
+SIM_OVERS = 10              # PSL innings (~60 balls per team per match in the leaderboards)
+MAX_OVERS_PER_BOWLER = 2
+MAX_OUT_PROB = 0.6          # per-ball cap, keeps extreme small-sample rates sane
+
+
+def bowling_plan(team: dict, overs: int = SIM_OVERS, max_overs: int = MAX_OVERS_PER_BOWLER) -> np.ndarray:
+    """Bowler index for each over: best bowlers first, each bowling at most `max_overs`."""
+    # cost < 0 is better than league average: fewer runs, more wickets
+    cost = np.asarray(team["bowl_runs"], dtype=float) - np.asarray(team["bowl_wkts"], dtype=float)
+    order = np.argsort(cost, kind="stable")
+    n_bowlers = min(len(order), -(-overs // max_overs))
+    return np.resize(order[:n_bowlers], overs)
+
+
+def simulate_innings(bat: dict, bowl: dict, n: int, rng, target=None, overs: int = SIM_OVERS):
+    """
+    Vectorized over `n` innings: one NumPy step per ball.
+    `target` (array, optional) is the score to beat; a chase stops once it is passed.
+    Returns (runs, wickets, balls) arrays.
+    """
+    bat_rpb = np.asarray(bat["bat_rpb"], dtype=float)
+    bat_pout = np.asarray(bat["bat_pout"], dtype=float)
+    last_wicket = max(1, len(bat_rpb) - 1)
+    plan = bowling_plan(bowl, overs)
+    field = float(bowl.get("field", 1.0))
+
+    runs = np.zeros(n, dtype=np.int64)
+    wkts = np.zeros(n, dtype=np.int64)
+    balls = np.zeros(n, dtype=np.int64)
+    active = np.ones(n, dtype=bool)
+    if target is not None:
+        target = np.asarray(target)
+
+    for over in range(overs):
+        b = plan[over]
+        run_f = float(bowl["bowl_runs"][b])
+        out_f = float(bowl["bowl_wkts"][b]) * field
+        for _ in range(6):
+            striker = np.minimum(wkts, len(bat_rpb) - 1)
+            p_out = np.minimum(bat_pout[striker] * out_f, MAX_OUT_PROB)
+            out = (rng.random(n) < p_out) & active
+            scored = rng.poisson(bat_rpb[striker] * run_f)
+            scored[out | ~active] = 0
+
+            runs += scored
+            wkts += out
+            balls += active
+            active &= wkts < last_wicket
+            if target is not None:
+                active &= runs <= target
+            if not active.any():
+                return runs, wkts, balls
+    return runs, wkts, balls
+
+
+def _interval(x: np.ndarray, level: float):
+    lo, hi = np.percentile(x, [50 * (1 - level), 50 * (1 + level)])
+    return float(lo), float(hi)
+
+
+def simulate_match(team_a: dict, team_b: dict, n_sims: int = 20000, seed=None,
+                   overs: int = SIM_OVERS, level: float = 0.90) -> dict:
+    """
+    Monte Carlo result for A vs B. Half the runs have A batting first and half B,
+    so the toss is neutral. Same `seed` -> same result.
+    """
+    rng = np.random.default_rng(seed)
+    half = n_sims // 2
+    rest = n_sims - half
+
+    # A sets, B chases
+    a_first, _, _ = simulate_innings(team_a, team_b, half, rng, overs=overs)
+    b_chase, _, _ = simulate_innings(team_b, team_a, half, rng, target=a_first, overs=overs)
+    # B sets, A chases
+    b_first, _, _ = simulate_innings(team_b, team_a, rest, rng, overs=overs)
+    a_chase, _, _ = simulate_innings(team_a, team_b, rest, rng, target=b_first, overs=overs)
+
+    score_a = np.concatenate([a_first, a_chase])
+    score_b = np.concatenate([b_chase, b_first])
+
+    wins_a = int((score_a > score_b).sum())
+    ties = int((score_a == score_b).sum())
+    p_a = (wins_a + 0.5 * ties) / max(1, n_sims)
+    z = NormalDist().inv_cdf(0.5 + level / 2)
+    se = np.sqrt(p_a * (1 - p_a) / max(1, n_sims))
+
+    return {
+        "n_sims": int(n_sims),
+        "p_a": float(p_a),
+        "p_b": float(1 - p_a),
+        "p_tie": ties / max(1, n_sims),
+        "p_a_ci": (float(max(0.0, p_a - z * se)), float(min(1.0, p_a + z * se))),
+        "scores_a": score_a,
+        "scores_b": score_b,
+        "median_a": float(np.median(score_a)),
+        "median_b": float(np.median(score_b)),
+        "score_ci_a": _interval(score_a, level),
+        "score_ci_b": _interval(score_b, level),
+        "level": level,
+    }
+
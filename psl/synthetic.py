@@ -0,0 +1,239 @@
+# psl/synthetic.py  (synthetic league data for benchmarks)
+# ---------------------------------------------------------
+#   generate_league("/tmp/x10", scale=10)
+#
+# Writes a data directory in the same layout and schemas as the real one
+# (PSL_Team_Players.xlsx "Team Players", Season NN leaderboard CSVs,
+# PSL02_Compliance_Log.xlsx Matches/Appearances), so the whole pipeline runs
+# on it unchanged with PSL_DATA_DIR pointing there. `seasons` sets how many
+# Season NN folders are written (default: our two).
+#
+# scale=1 is our real size: 8 teams x 21 squad members, ~145 leaderboard
+# rows per season, a 28-match round robin with 18 results and ~670
+# appearances. scale=k is k such 8-team groups side by side. Names are made
+# of letters only (clean_name drops digits) and carry the same noise as the
+# real files: "(c)" in squads, trailing dots, initials and misspelt surnames
+# in leaderboards (the last only join through matching.py).
+# ---------------------------------------------------------
+
+import os, json, itertools
+
+import numpy as np
+import pandas as pd
+
+from .config import TEAM_LOGOS
+from .seasons import LEADERBOARD_FILES
+
+GENERATOR_VERSION = 2
+MANIFEST = "synthetic.json"   # spec + sizes; also marks the directory as disposable for the bench worker
+REAL_TEAMS = list(TEAM_LOGOS)
+SQUAD_SIZE = 21
+SQUAD_ROLES = (
+    ["Team Manager", "Mentor", "Brand Ambassador"] + ["Supporter"] * 3 + ["Squad"] * 15
+)  # 21 per team, about our real mix
+MATCHES_PLAYED = 18      # of the 28 round-robin fixtures per group
+APPEARANCES_PER_SIDE = 12
+TOURNAMENTS = ("1441602", "1786448")   # our Season 01/02 ids; Season NN after them gets 19000NN
+
+_SYLLABLES = ["ba", "ka", "ra", "sa", "ta", "na", "ma", "za", "da", "la",
+              "ha", "fa", "ja", "qa", "wa", "ya", "shi", "ro", "ne", "mi"]
+_FIRST = ["Ahmed", "Ali", "Bilal", "Danish", "Fahad", "Hamza", "Imran", "Junaid", "Kashif",
+          "Mazhar", "Muhammad", "Nasir", "Owais", "Rizwan", "Saad", "Shahid", "Tariq", "Umar",
+          "Waqar", "Yasir", "Zafar", "Zubair"]
+_VENUES = ["Dr Shahid K Haq Cricket Ground, Karachi", "PARCO Ground, Qasba", "KCCA Stadium, Karachi"]
+
+
+def _word(i: int, syllables: int) -> str:
+    out = []
+    for _ in range(syllables):
+        i, d = divmod(i, len(_SYLLABLES))
+        out.append(_SYLLABLES[d])
+    return "".join(out).capitalize()
+
+
+def team_names(scale: int) -> list:
+    """Group 0 is the real eight; later groups add a letters-only suffix."""
+    names = list(REAL_TEAMS)
+    for g in range(1, scale):
+        names += [f"{t} {_word(g, 3)}" for t in REAL_TEAMS]
+    return names
+
+
+def make_squads(scale: int, rng) -> pd.DataFrame:
+    teams = team_names(scale)
+    n = len(teams) * SQUAD_SIZE
+    ids = np.arange(n)
+    first = np.array(_FIRST, dtype=object)[ids % len(_FIRST)]
+    players = [f"{f} {_word(i, 5)}" for f, i in zip(first, ids)]
+    squads = pd.DataFrame({
+        "Team": np.repeat(teams, SQUAD_SIZE),
+        "Player": players,
+        "Role": SQUAD_ROLES * len(teams),
+    })
+    # one captain per team, marked the way the real sheet does
+    captain = np.arange(len(teams)) * SQUAD_SIZE + SQUAD_ROLES.index("Squad")
+    squads.loc[captain, "Player"] = squads.loc[captain, "Player"] + " (c)"
+    squads["player_id"] = 30_000_000 + ids
+    squads["team_id"] = 9_726_000 + np.repeat(np.arange(len(teams)), SQUAD_SIZE)
+    return squads
+
+
+def _noisy(names: pd.Series, rng) -> pd.Series:
+    """Leaderboard spellings: no "(c)", some trailing dots, some leading initials, some surname typos."""
+    out = names.str.replace(r"\s*\(.*?\)", "", regex=True)
+    r = rng.random(len(out))
+    out = out.where(r >= 0.05, out + ".")
+    out = out.where((r < 0.05) | (r >= 0.08), "M " + out)
+    out = out.where((r < 0.08) | (r >= 0.10), out.str.replace(r"(\w{3})\w(\w*)$", r"\1\2", regex=True))
+    return out
+
+
+def make_leaderboards(squads: pd.DataFrame, rng) -> dict:
+    """{"bat"/"bowl"/"field"/"mvp": DataFrame} for one season, in the real CSV schemas."""
+    pool = squads[squads["Role"].isin(["Squad", "Supporter"])]
+    pick = pool[rng.random(len(pool)) < 0.96].reset_index(drop=True)
+    n = len(pick)
+    names = _noisy(pick["Player"], rng)
+    base = {
+        "player_id": pick["player_id"].to_numpy(),
+        "name": names.to_numpy(),
+        "team_id": pick["team_id"].to_numpy(),
+        "team_name": pick["Team"].to_numpy(),
+    }
+    mat = rng.integers(1, 11, n)
+
+    inns = np.minimum(mat, rng.integers(1, 11, n))
+    balls = rng.integers(1, 30, n) * inns
+    sr = rng.normal(160, 45, n).clip(40, 420)
+    runs = np.round(balls * sr / 100).astype(int)
+    not_out = rng.binomial(inns, 0.3)
+    bat = pd.DataFrame({
+        **base, "total_match": mat, "innings": inns, "total_runs": runs,
+        "highest_run": np.minimum(runs, rng.integers(5, 130, n)),
+        "average": np.round(runs / np.maximum(inns - not_out, 1), 2), "not_out": not_out,
+        "strike_rate": np.round(runs * 100 / balls, 2), "ball_faced": balls,
+        "batting_hand": rng.choice(["RHB", "LHB"], n, p=[0.8, 0.2]),
+        "4s": rng.poisson(runs / 40), "6s": rng.poisson(runs / 12),
+        "50s": rng.poisson(runs / 300), "100s": rng.poisson(runs / 1200),
+    })
+
+    b_inns = np.minimum(mat, rng.integers(0, 11, n))
+    b_balls = b_inns * rng.integers(6, 13, n)
+    b_runs = np.round(b_balls * rng.normal(2.0, 0.4, n).clip(0.8, 4)).astype(int)
+    wkts = rng.binomial(b_balls, 0.08)
+    bowl = pd.DataFrame({
+        **base, "total_match": mat, "innings": b_inns, "total_wickets": wkts, "balls": b_balls,
+        "highest_wicket": np.minimum(wkts, rng.integers(0, 5, n)),
+        "economy": np.round(b_runs * 6 / np.maximum(b_balls, 1), 2),
+        "SR": np.round(b_balls / np.maximum(wkts, 1), 2), "maidens": rng.binomial(b_inns, 0.03),
+        "avg": np.round(b_runs / np.maximum(wkts, 1), 2), "runs": b_runs,
+        "bowling_style": rng.choice(["Right-arm fast", "Right-arm Off Break", "Left-arm orthodox"], n),
+        "overs": np.round(b_balls // 6 + (b_balls % 6) / 10, 1), "dot_balls": rng.binomial(b_balls, 0.3),
+    })
+
+    catches = rng.poisson(mat * 0.6)
+    behind = np.where(rng.random(n) < 0.08, rng.poisson(mat * 0.5), 0)
+    ro = rng.poisson(mat * 0.2)
+    field = pd.DataFrame({
+        **base, "total_match": mat, "catches": catches, "caught_behind": behind, "run_outs": ro,
+        "assist_run_outs": rng.poisson(mat * 0.1), "stumpings": rng.binomial(behind, 0.2),
+        "caught_and_bowl": rng.binomial(catches, 0.05), "total_catches": catches + behind,
+        "total_dismissal": catches + behind + ro,
+    })
+
+    mvp_rows = rng.random(n) < 0.8
+    m_bat = np.round(runs / 10 + rng.normal(0, 2, n), 3)
+    m_bowl = np.round(wkts * 1.5 - b_runs / 60, 3)
+    m_field = np.round((catches + ro) * 0.4, 3)
+    mvp = pd.DataFrame({
+        "Player Name": names, "Team Name": pick["Team"], "Player Role": "",
+        "Bowling Style": bowl["bowling_style"], "Batting Hand": bat["batting_hand"], "Matches": mat,
+        "Batting": m_bat, "Bowling": m_bowl, "Fielding": m_field,
+        "Total": np.round(m_bat + m_bowl + m_field, 3),
+    })[mvp_rows]
+
+    order = lambda df, col: df.sort_values(col, ascending=False, kind="stable").reset_index(drop=True)
+    return {
+        "bat": order(bat, "total_runs"), "bowl": order(bowl, "total_wickets"),
+        "field": order(field, "total_dismissal"), "mvp": order(mvp, "Total"),
+    }
+
+
+def make_compliance_log(squads: pd.DataFrame, rng):
+    """(Matches, Appearances) in PSL02_Compliance_Log.xlsx's shape."""
+    teams = squads["Team"].drop_duplicates().tolist()
+    pairs = list(itertools.combinations(range(len(REAL_TEAMS)), 2))   # 28 per group
+    start = pd.Timestamp("2026-01-16")
+    rows = []
+    for k, (i, j) in enumerate(pairs):          # matchday-major, so every group plays on the same days
+        for g in range(len(teams) // len(REAL_TEAMS)):
+            t1, t2 = teams[g * len(REAL_TEAMS) + i], teams[g * len(REAL_TEAMS) + j]
+            day = start + pd.Timedelta(days=k // 2)
+            time = "15:30" if k % 2 == 0 else "19:30"
+            rows.append({
+                "MatchID": len(rows) + 1, "Series": "PARCO SUPER LEAGUE -02",
+                "MatchDate": day, "MatchTime": time, "MatchDateTime": f"{day:%Y-%m-%d} {time}",
+                "Venue": _VENUES[k % len(_VENUES)], "Team1": t1, "Team2": t2,
+                "Toss": f"{t1 if rng.random() < 0.5 else t2} opt to bat", "played": k < MATCHES_PLAYED,
+                "MatchKey": f"{day:%Y-%m-%d}|{time}:00|{t1}|{t2}",
+            })
+    matches = pd.DataFrame(rows)
+    won_1 = rng.random(len(matches)) < 0.5
+    margin = np.where(rng.random(len(matches)) < 0.5, "wickets", "runs")
+    by = np.where(margin == "wickets", rng.integers(1, 10, len(matches)), rng.integers(1, 60, len(matches)))
+    result = [
+        f"{a if w else b} won by {n} {m}" for a, b, w, n, m in zip(matches["Team1"], matches["Team2"], won_1, by, margin)
+    ]
+    matches.insert(matches.columns.get_loc("played"), "Result", np.where(matches["played"], result, None))
+    matches = matches.drop(columns="played")
+
+    playing = squads[squads["Role"] == "Squad"].groupby("Team")["Player"].apply(list).to_dict()
+    apps = []
+    for mid, day, t1, t2 in zip(matches["MatchID"], matches["MatchDate"], matches["Team1"], matches["Team2"]):
+        for team in (t1, t2):
+            xi = rng.choice(playing[team], APPEARANCES_PER_SIDE, replace=False)
+            roles = ["captain"] + ["playing-squad"] * 7 + [None] * (APPEARANCES_PER_SIDE - 8)
+            for p, role in zip(xi, roles):
+                apps.append((mid, day, team, p, role, float(role == "captain") if role else None, 0.0 if role else None))
+    appearances = pd.DataFrame(
+        apps, columns=["MatchID", "MatchDate", "Team", "Player", "Role", "IsCaptain", "IsWicketKeeper"]
+    )
+    return matches, appearances
+
+
+def generate_league(out_dir: str, scale: int = 1, seed: int = 2026, seasons: int = 2) -> dict:
+    """Write a synthetic data directory (skipped if an identical one is already there); returns its sizes."""
+    manifest_path = os.path.join(out_dir, MANIFEST)
+    spec = {"generator": GENERATOR_VERSION, "scale": scale, "seed": seed, "seasons": seasons}
+    try:
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest["spec"] == spec:
+            return manifest["sizes"]
+    except (OSError, ValueError, KeyError):
+        pass
+
+    rng = np.random.default_rng(seed)
+    squads = make_squads(scale, rng)
+    sizes = {"teams": int(squads["Team"].nunique()), "squad_rows": len(squads)}
+
+    for i in range(seasons):
+        season = f"Season {i + 1:02d}"
+        prefix = TOURNAMENTS[i] if i < len(TOURNAMENTS) else str(1900000 + i + 1)
+        os.makedirs(os.path.join(out_dir, season), exist_ok=True)
+        for kind, df in make_leaderboards(squads, rng).items():
+            df.to_csv(os.path.join(out_dir, season, f"{prefix}_{LEADERBOARD_FILES[kind]}_leaderboard.csv"), index=False)
+            sizes[f"{season[-2:]}_{kind}_rows"] = len(df)
+
+    with pd.ExcelWriter(os.path.join(out_dir, "PSL_Team_Players.xlsx")) as xw:
+        squads[["Team", "Player", "Role"]].to_excel(xw, sheet_name="Team Players", index=False)
+
+    matches, appearances = make_compliance_log(squads, rng)
+    with pd.ExcelWriter(os.path.join(out_dir, "PSL02_Compliance_Log.xlsx")) as xw:
+        matches.to_excel(xw, sheet_name="Matches", index=False)
+        appearances.to_excel(xw, sheet_name="Appearances", index=False)
+    sizes.update(matches=len(matches), appearances=len(appearances))
+
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump({"spec": spec, "sizes": sizes}, f, indent=2)
+    return sizes
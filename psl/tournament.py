@@ -0,0 +1,164 @@
+# psl/tournament.py  (season projection engine)
+# ---------------------------------------------------------
+# Pure NumPy, like simulation.py. season.py turns the Matches sheet into
+# fixtures and gives a win probability for every remaining fixture.
+#
+# Big projections go to a spawn process pool. A spawned worker imports
+# psl.tournament through the psl package (pandas and all), about 0.4 s per
+# worker, while a run costs ~14 ns per remaining fixture inline; so the pool
+# is only used when the work (runs x fixtures) takes well over a second.
+# The default 100k-run projection of a real season stays in-process.
+#
+# Points: win 2, tie / no result 1 each. Run rate is not in the log, so
+# level teams are split by a coin flip inside each simulated season.
+# ---------------------------------------------------------
+
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from difflib import SequenceMatcher
+from multiprocessing import get_context
+
+import numpy as np
+
+POINTS_WIN = 2
+POINTS_SHARED = 1
+QUALIFY_TOP = 4
+CHUNK_RUNS = 25000          # fixed chunk size: same seed -> same result for any worker count
+INLINE_MAX_WORK = 100_000_000   # runs x remaining fixtures (~1.4 s inline); below this a pool costs more than it saves
+
+_WON_RE = re.compile(r"^\s*(.+?)\s+won\b", re.IGNORECASE)
+_SHARED_RE = re.compile(r"\b(tied|tie|no result|abandoned|draw)\b", re.IGNORECASE)
+
+
+def _similarity(a: str, b: str) -> float:
+    return SequenceMatcher(None, a.strip().lower(), b.strip().lower()).ratio()
+
+
+def parse_result(result, team1: str, team2: str):
+    """
+    "Kemari Kings won by 8 wickets" -> 1 or 2 (which side won), "shared" for a
+    tie / no result, None when there is no result yet. The winner is matched to
+    the closer of the two fixture names, so sheet spellings ("Kemari") still count.
+    """
+    if result is None or (isinstance(result, float) and np.isnan(result)):
+        return None
+    text = str(result).strip()
+    if not text or text.lower() == "nan":
+        return None
+    m = _WON_RE.match(text)
+    if m:
+        winner = m.group(1)
+        return 1 if _similarity(winner, team1) >= _similarity(winner, team2) else 2
+    if _SHARED_RE.search(text):
+        return "shared"
+    return None
+
+
+def season_state(fixtures, teams):
+    """
+    fixtures: iterable of (team1, team2, result). Returns the current table
+    (played/won/lost/shared/points arrays over `teams`) and the remaining
+    fixtures as (home_idx, away_idx) int arrays. Fixtures naming an unknown
+    team are ignored.
+    """
+    idx = {t: i for i, t in enumerate(teams)}
+    n = len(teams)
+    played, won, lost, shared = (np.zeros(n, dtype=np.int64) for _ in range(4))
+    home, away = [], []
+    for team1, team2, result in fixtures:
+        i, j = idx.get(team1), idx.get(team2)
+        if i is None or j is None or i == j:
+            continue
+        outcome = parse_result(result, team1, team2)
+        if outcome is None:
+            home.append(i)
+            away.append(j)
+            continue
+        played[[i, j]] += 1
+        if outcome == "shared":
+            shared[[i, j]] += 1
+        else:
+            w, l = (i, j) if outcome == 1 else (j, i)
+            won[w] += 1
+            lost[l] += 1
+    points = POINTS_WIN * won + POINTS_SHARED * shared
+    return {
+        "played": played, "won": won, "lost": lost, "shared": shared, "points": points,
+        "home": np.asarray(home, dtype=np.int64), "away": np.asarray(away, dtype=np.int64),
+    }
+
+
+def simulate_season_chunk(base_points, home, away, p_home, n_runs, seed, top=QUALIFY_TOP):
+    """
+    Worker: `n_runs` seasons at once. Returns (position counts [team, position],
+    summed final points [team], qualification counts [team]).
+    """
+    rng = np.random.default_rng(seed)
+    base_points = np.asarray(base_points, dtype=float)
+    n_teams = len(base_points)
+    n_fix = len(home)
+
+    # one-hot fixture -> team, so a whole batch of results is two matmuls
+    onehot_h = np.zeros((n_fix, n_teams))
+    onehot_a = np.zeros((n_fix, n_teams))
+    onehot_h[np.arange(n_fix), home] = 1.0
+    onehot_a[np.arange(n_fix), away] = 1.0
+
+    home_wins = rng.random((n_runs, n_fix)) < np.asarray(p_home, dtype=float)
+    points = base_points + POINTS_WIN * (home_wins @ onehot_h + (~home_wins) @ onehot_a)
+
+    # points move in whole steps, so a [0, 0.5) jitter only breaks ties
+    order = np.argsort(-(points + 0.5 * rng.random((n_runs, n_teams))), axis=1, kind="stable")
+    position = np.empty_like(order)
+    np.put_along_axis(position, order, np.arange(n_teams)[None, :], axis=1)
+
+    team_ids = np.broadcast_to(np.arange(n_teams), position.shape)
+    pos_counts = np.bincount((team_ids * n_teams + position).ravel(), minlength=n_teams * n_teams)
+    return (
+        pos_counts.reshape(n_teams, n_teams),
+        points.sum(axis=0),
+        (position < top).sum(axis=0),
+    )
+
+
+def _chunks(n_runs: int, size: int):
+    full, rest = divmod(n_runs, size)
+    return [size] * full + ([rest] if rest else [])
+
+
+def simulate_season(state: dict, p_home, n_runs: int = 100000, seed=None,
+                    workers=None, top: int = QUALIFY_TOP) -> dict:
+    """
+    Projected table from `season_state()` output and a home-win probability per
+    remaining fixture. Runs are split into fixed-size chunks with independent
+    seeds and spread across a process pool when there is enough work to pay
+    for one (`workers=1` always keeps it in-process).
+    """
+    base = state["points"]
+    n_teams = len(base)
+    sizes = _chunks(int(n_runs), CHUNK_RUNS)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    jobs = [(base, state["home"], state["away"], p_home, size, s, top) for size, s in zip(sizes, seeds)]
+
+    if workers is None:
+        workers = min(len(jobs), os.cpu_count() or 1)
+    if workers <= 1 or n_runs * max(1, len(state["home"])) <= INLINE_MAX_WORK:
+        results = [simulate_season_chunk(*job) for job in jobs]
+    else:
+        # spawn: the caller may be a threaded server, where fork is unsafe
+        with ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn")) as pool:
+            results = list(pool.map(simulate_season_chunk, *zip(*jobs)))
+
+    pos_counts = sum(r[0] for r in results)
+    total = max(1, sum(sizes))
+    pos_probs = pos_counts / total
+    return {
+        "n_runs": int(sum(sizes)),
+        "pos_probs": pos_probs,                                    # [team, position]
+        "exp_points": sum(r[1] for r in results) / total,
+        "p_qualify": sum(r[2] for r in results) / total,
+        "p_first": pos_probs[:, 0],
+        "exp_position": pos_probs @ np.arange(1, n_teams + 1),
+        "top": top,
+    }
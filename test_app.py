@@ -1,536 +1,470 @@
-import os, base64
+# test_app.py  (pytest checks for the psl package)
+# ---------------------------------------------------------
+#   python -m pytest -q
+#
+# Runs against a synthetic league (psl/synthetic.py) in a temp directory,
+# so the real squads, compliance log and pid registry are never touched.
+# PSL_DATA_DIR has to be set before psl is imported: config reads it once.
+# ---------------------------------------------------------
+
+import io, os, json, asyncio, atexit, shutil, tempfile
+
+DATA_DIR = tempfile.mkdtemp(prefix="psl-test-")
+os.environ["PSL_DATA_DIR"] = DATA_DIR
+atexit.register(shutil.rmtree, DATA_DIR, True)
+
 import numpy as np
 import pandas as pd
-import streamlit as st
-from PIL import Image
+import pytest
+
+from psl.synthetic import generate_league
+
+generate_league(DATA_DIR, scale=1)
+
+from psl import mapper
+from psl.config import COMPLIANCE_XLSX, MATCH_MIN_SCORE, MATCH_MARGIN
+from psl.normalize import clean_name, clean_names
+from psl.loaders import load_squads
+from psl.seasons import season_weights
+from psl.scoring import build_component_scores
+from psl.selection import solve_xi, best_xis
+from psl.simulation import simulate_match
+from psl.ratings import RatingIndex, rating_index, build_player_ratings_and_components
+from psl.prediction import (
+    simulate_xi_match, predict_match, matchup_matrix, save_matchup_snapshot, load_matchup_snapshot,
+)
+from psl.matching import NameIndex, leaderboard_matches
+from psl.identity import NO_PID, load_registry, save_registry, resolve_identity
+from psl.tournament import parse_result, season_state, simulate_season
+from psl.compliance import load_compliance_log, build_compliance_matrix
+from psl.cli import Predictor, read_fixtures, predict_stream
+from psl.service import MAX_BODY, PredictionService
+
 
 # ----------------------------
-# App Config
+# Names
 # ----------------------------
-st.set_page_config(page_title="PSL 2.0 AI App", layout="wide")
-
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-SQUADS_XLSX = os.path.join(BASE_DIR, "PSL_Team_Players.xlsx")
-BG_IMAGE = os.path.join(BASE_DIR, "assets", "bg.jpg")
-LOGO_DIR = os.path.join(BASE_DIR, "team logos")
-
-S01 = {
-    "bat": os.path.join(BASE_DIR, "Season 01", "1441602_batting_leaderboard.csv"),
-    "bowl": os.path.join(BASE_DIR, "Season 01", "1441602_bowling_leaderboard.csv"),
-    "field": os.path.join(BASE_DIR, "Season 01", "1441602_fielding_leaderboard.csv"),
-    "mvp": os.path.join(BASE_DIR, "Season 01", "1441602_mvp_leaderboard.csv"),
-}
-S02 = {
-    "bat": os.path.join(BASE_DIR, "Season 02", "1786448_batting_leaderboard.csv"),
-    "bowl": os.path.join(BASE_DIR, "Season 02", "1786448_bowling_leaderboard.csv"),
-    "field": os.path.join(BASE_DIR, "Season 02", "1786448_fielding_leaderboard.csv"),
-    "mvp": os.path.join(BASE_DIR, "Season 02", "1786448_mvp_leaderboard.csv"),
-}
-
-# Match your folder filenames exactly
-TEAM_LOGOS = {
-    "Bubak Blasters": "Bubak.jpg",
-    "Fazilpur Falcons": "Fazilpur.jpg",
-    "Kot Bahadur Shah Bulls": "KBS.jpg",
-    "Keamari Kings": "Keamari.jpg",
-    "Mahmoodkot Mavericks": "MKM.jpg",
-    "Macchike Mustangs": "Mustangs.jpg",
-    "Port Qasim Panthers": "PortQasim.jpg",
-    "Shikarpur Stallions": "Shikarpur.jpg",
-}
+@pytest.mark.parametrize("raw, key", [
+    ("A.H. Asad Mughni (vc)", "asad mughni"),
+    ("  Muhammad  Zubair. ", "muhammad zubair"),
+    ("Mazhar Iqbal (c)", "mazhar iqbal"),
+    ("M Kaleem-Ullah 2", "kaleem ullah"),
+    ("", ""),
+])
+def test_clean_name(raw, key):
+    assert clean_name(raw) == key
+
+def test_clean_names_matches_clean_name():
+    names = pd.Series(["A.H. Asad Mughni (vc)", "Umer Farooq", None, np.nan, "Umer Farooq", "x"], dtype=object)
+    assert clean_names(names).tolist() == [clean_name(n) for n in names]
+
 
 # ----------------------------
-# Hidden model settings (simple + stable)
+# Name matching
 # ----------------------------
-W_RECENT = 0.68
-W_BAT, W_BOWL, W_FIELD, W_MVP = 0.40, 0.40, 0.10, 0.10
-PROB_SCALE = 3.2
+SQUAD_NAMES = ["Kaleemullah", "Kaleem Akhtar", "Babar Azam", "Faraz Ahmed", "Asif Ali"]
+
+def test_name_index_match():
+    report = NameIndex(SQUAD_NAMES).match(["Babar Azam (c)", "Kaleem Ullah", "Fraz Asif", " ", None], source="t")
+    rows = report.set_index("name")
+    assert report["name"].tolist() == ["Babar Azam (c)", "Kaleem Ullah", "Fraz Asif"]   # blanks dropped
+    assert (report["source"] == "t").all()
+
+    assert rows.loc["Babar Azam (c)", ["match", "score", "status"]].tolist() == ["Babar Azam", 1.0, "exact"]
+    assert rows.loc["Kaleem Ullah", ["match", "match_key", "status"]].tolist() == ["Kaleemullah", "kaleemullah", "fuzzy"]
+    assert rows.loc["Kaleem Ullah", "runner_up"] == "Kaleem Akhtar"
+    assert rows.loc["Kaleem Ullah", "score"] - rows.loc["Kaleem Ullah", "runner_up_score"] >= MATCH_MARGIN
+
+    fraz = rows.loc["Fraz Asif"]
+    assert fraz["status"] == "unmatched" and 0 < fraz["score"] < MATCH_MIN_SCORE
+    assert 0 < fraz["runner_up_score"] <= fraz["score"]
+
+def test_name_index_group_members_are_different_people():
+    report = NameIndex(["Imad Wasim", "Imad Waseem"]).match(["Imad Wasim", "Imaad Wasem"], groups=["A", "A"])
+    assert report.set_index("name")["match"].to_dict() == {"Imad Wasim": "Imad Wasim", "Imaad Wasem": "Imad Waseem"}
+
 
 # ----------------------------
-# UI Styling
+# Player identity
 # ----------------------------
-def file_to_base64(path: str) -> str:
-    with open(path, "rb") as f:
-        return base64.b64encode(f.read()).decode()
-
-bg_b64 = file_to_base64(BG_IMAGE) if os.path.exists(BG_IMAGE) else ""
-
-st.markdown(
-f"""
-<style>
-@import url('https://fonts.googleapis.com/css2?family=Inter:wght@400;600;800;900&display=swap');
-html, body, [class*="css"] {{ font-family: 'Inter', system-ui, -apple-system, Segoe UI, Roboto, Arial, sans-serif; }}
-
-.stApp {{
-  background:
-    linear-gradient(180deg, rgba(8,12,24,0.68) 0%, rgba(8,12,24,0.84) 55%, rgba(8,12,24,0.92) 100%),
-    url("data:image/jpg;base64,{bg_b64}");
-  background-size: cover;
-  background-position: center;
-  background-attachment: fixed;
-}}
-
-.block-container {{ padding-top: 74px; max-width: 1300px; }}
-
-header[data-testid="stHeader"] {{ background: transparent; }}
-div[data-testid="stToolbar"] {{ visibility:hidden; height:0px; }}
-
-/* Top bar */
-.topbar {{
-  position: fixed; top:0; left:0; right:0; z-index:999;
-  height:60px; display:flex; align-items:center; justify-content:space-between;
-  padding: 0 18px;
-  background: rgba(255,255,255,0.07);
-  border-bottom: 1px solid rgba(255,255,255,0.14);
-  backdrop-filter: blur(14px);
-}}
-.brand {{ display:flex; align-items:center; gap:10px; }}
-.badge {{
-  width: 34px; height: 34px; border-radius: 12px;
-  background: linear-gradient(135deg, #7aa2ff 0%, #ff7ad9 100%);
-  box-shadow: 0 16px 40px rgba(0,0,0,0.35);
-}}
-.title {{
-  color: rgba(245,247,255,0.96);
-  font-weight: 900;
-  font-size: 16px;
-  margin: 0;
-}}
-
-/* Premium bordered containers */
-div[data-testid="stVerticalBlockBorderWrapper"] {{
-  background: rgba(255,255,255,0.09);
-  border: 1px solid rgba(255,255,255,0.16);
-  border-radius: 18px;
-  box-shadow: 0 18px 60px rgba(0,0,0,0.36);
-  backdrop-filter: blur(14px);
-}}
-
-/* Buttons */
-.stButton > button {{
-  border-radius: 14px !important;
-  padding: 11px 14px !important;
-  font-weight: 900 !important;
-  border: 0 !important;
-  color: #0b1020 !important;
-  background: linear-gradient(135deg, #ffffff 0%, #dfe7ff 60%, #ffd7f1 100%) !important;
-  box-shadow: 0 14px 34px rgba(0,0,0,0.28) !important;
-}}
-button[kind="primary"] {{
-  color: #0b1020 !important;
-  background: linear-gradient(135deg, #7aa2ff 0%, #ff7ad9 100%) !important;
-}}
-.stButton > button:disabled {{ opacity: 0.55 !important; }}
-
-/* Text */
-h1,h2,h3,h4 {{ color: rgba(245,247,255,0.96) !important; }}
-.small {{ color: rgba(225,232,255,0.78); font-size: 12.5px; }}
-
-/* Team Tile */
-.tile {{
-  background: rgba(255,255,255,0.06);
-  border: 1px solid rgba(255,255,255,0.14);
-  border-radius: 18px;
-  padding: 10px;
-  text-align: center;
-}}
-.tileSelected {{
-  border: 2px solid rgba(255,122,217,0.85) !important;
-  box-shadow: 0 18px 50px rgba(255,122,217,0.18);
-}}
-.tileName {{
-  margin-top: 8px;
-  font-weight: 900;
-  color: rgba(245,247,255,0.92);
-  font-size: 12.5px;
-}}
-/* Fix st.data_editor look slightly */
-div[data-testid="stDataFrame"] {{
-  background: rgba(255,255,255,0.05);
-  border-radius: 16px;
-  border: 1px solid rgba(255,255,255,0.14);
-  overflow: hidden;
-}}
-</style>
-
-<div class="topbar">
-  <div class="brand">
-    <div class="badge"></div>
-    <div class="title">PSL 2.0 AI App</div>
-  </div>
-</div>
-""",
-unsafe_allow_html=True
-)
+@pytest.fixture
+def registry(tmp_path):
+    """(squads, name-match report, registry path) with the first resolve already saved."""
+    squads, report = load_squads(), leaderboard_matches()
+    path = str(tmp_path / "player_identity.csv")
+    ids, new = resolve_identity(load_registry(path), squads, report)
+    save_registry(new, path)
+    return squads, report, path, ids
+
+def test_identity_pids_survive_reload(registry):
+    squads, report, path, ids = registry
+    assert sorted(ids.squad.values()) == list(range(1, len(ids.squad) + 1))
+    again, new = resolve_identity(load_registry(path), squads, report)
+    assert new.empty
+    assert again.squad == ids.squad and again.seasons == ids.seasons
+
+def test_identity_new_names_do_not_renumber(registry):
+    squads, report, path, ids = registry
+    grown = pd.concat([squads.head(1).assign(Player="Zubair Newcomer"), squads], ignore_index=True)   # listed first
+    again, new = resolve_identity(load_registry(path), grown, report)
+    top = max(ids.squad.values())
+    assert new[["pid", "kind", "ref"]].values.tolist() == [[top + 1, "squad", "zubair newcomer"]]
+    assert {k: p for k, p in again.squad.items() if k != "zubair newcomer"} == ids.squad
+
+def test_identity_aliases_share_a_pid(registry):
+    _, report, _, ids = registry
+    name = next(iter(ids.by_player))
+    pid = ids.by_player[name]
+    assert ids.of_players([name, f"M {name.upper()}.", clean_name(name)]).tolist() == [pid] * 3
+
+    first, second = ids.seasons.values()
+    both = set(first["ids"]) & set(second["ids"])       # one account, spelled per season
+    assert both and all(first["ids"][a] == second["ids"][a] for a in both)
+    fuzzy = report[report["status"] == "fuzzy"]
+    assert len(fuzzy)
+    for src, key, match_key in fuzzy[["source", "key", "match_key"]].itertuples(index=False):
+        assert ids.seasons[src]["names"][key] == ids.squad[match_key]
+
 
 # ----------------------------
-# Data helpers
+# Season weights
 # ----------------------------
-def pick_name_col(df: pd.DataFrame) -> str:
-    cols = list(df.columns)
-    for c in cols:
-        if c.strip().lower() in ["player", "player name", "name", "batsman", "bowler", "fielder"]:
-            return c
-    for c in cols:
-        if "player" in c.lower() or "name" in c.lower():
-            return c
-    return cols[0]
-
-def find_col(df: pd.DataFrame, options):
-    cols_lower = [c.lower() for c in df.columns]
-    for opt in options:
-        if opt.lower() in cols_lower:
-            return df.columns[cols_lower.index(opt.lower())]
-    for opt in options:
-        for i, c in enumerate(cols_lower):
-            if opt.lower() in c:
-                return df.columns[i]
-    return None
-
-def to_num(x):
-    try:
-        return float(str(x).replace(",", "").strip())
-    except:
-        return 0.0
-
-def zscore(series: pd.Series) -> pd.Series:
-    v = series.astype(float)
-    mu = v.mean()
-    sd = v.std(ddof=0)
-    if sd == 0 or np.isnan(sd):
-        sd = 1.0
-    out = (v - mu) / sd
-    return out.replace([np.inf, -np.inf], 0).fillna(0)
-
-def sigmoid(x):
-    if np.isnan(x) or np.isinf(x):
-        return 0.5
-    return float(1 / (1 + np.exp(-x)))
-
-@st.cache_data(show_spinner=False)
-def load_squads():
-    df = pd.read_excel(SQUADS_XLSX, sheet_name="Team Players")
-    df["Team"] = df["Team"].astype(str).str.strip()
-    df["Player"] = df["Player"].astype(str).str.strip()
-    return df
-
-def build_component_scores(bat, bowl, field, mvp):
-    # Batting
-    bname = pick_name_col(bat)
-    runs_c = find_col(bat, ["runs"])
-    sr_c   = find_col(bat, ["sr", "strike rate"])
-    avg_c  = find_col(bat, ["avg", "average"])
-    inns_c = find_col(bat, ["inns", "innings"])
-    f50_c  = find_col(bat, ["50s", "fifties"])
-    f100_c = find_col(bat, ["100s", "centuries"])
-
-    bat["__player__"] = bat[bname].astype(str).str.strip()
-    bat_score = {}
-    for _, r in bat.iterrows():
-        p = r["__player__"]
-        if not p or p.lower() == "nan":
-            continue
-        runs = to_num(r.get(runs_c, 0)) if runs_c else 0
-        sr   = to_num(r.get(sr_c, 0)) if sr_c else 0
-        avg  = to_num(r.get(avg_c, 0)) if avg_c else 0
-        inns = max(1.0, to_num(r.get(inns_c, 1))) if inns_c else 1.0
-        f50  = to_num(r.get(f50_c, 0)) if f50_c else 0
-        f100 = to_num(r.get(f100_c, 0)) if f100_c else 0
-        bat_score[p] = runs + (sr*0.6) + (avg*0.8) + (f50*10) + (f100*25) + (np.log(inns+1)*2)
-
-    # Bowling
-    wname = pick_name_col(bowl)
-    wk_c  = find_col(bowl, ["wkts", "wickets"])
-    eco_c = find_col(bowl, ["econ", "economy"])
-    avg_c2= find_col(bowl, ["avg", "average"])
-    sr_c2 = find_col(bowl, ["sr", "strike rate"])
-    mat_c = find_col(bowl, ["mat", "matches"])
-
-    bowl["__player__"] = bowl[wname].astype(str).str.strip()
-    bowl_score = {}
-    for _, r in bowl.iterrows():
-        p = r["__player__"]
-        if not p or p.lower() == "nan":
-            continue
-        wk  = to_num(r.get(wk_c, 0)) if wk_c else 0
-        eco = to_num(r.get(eco_c, 0)) if eco_c else 0
-        avg2= to_num(r.get(avg_c2, 0)) if avg_c2 else 0
-        sr2 = to_num(r.get(sr_c2, 0)) if sr_c2 else 0
-        mat = max(1.0, to_num(r.get(mat_c, 1))) if mat_c else 1.0
-        bowl_score[p] = (wk*25) + (np.log(mat+1)*2) - (eco*8) - (avg2*0.6) - (sr2*0.4)
-
-    # Fielding
-    fname = pick_name_col(field)
-    ct_c  = find_col(field, ["catches", "ct"])
-    ro_c  = find_col(field, ["run out", "runouts", "ro"])
-
-    field["__player__"] = field[fname].astype(str).str.strip()
-    field_score = {}
-    for _, r in field.iterrows():
-        p = r["__player__"]
-        if not p or p.lower() == "nan":
-            continue
-        ct = to_num(r.get(ct_c, 0)) if ct_c else 0
-        ro = to_num(r.get(ro_c, 0)) if ro_c else 0
-        field_score[p] = (ct*8) + (ro*10)
-
-    # MVP
-    mname = pick_name_col(mvp)
-    pts_c = find_col(mvp, ["points", "pts", "score"])
-
-    mvp["__player__"] = mvp[mname].astype(str).str.strip()
-    mvp_score = {}
-    for _, r in mvp.iterrows():
-        p = r["__player__"]
-        if not p or p.lower() == "nan":
-            continue
-        mvp_score[p] = to_num(r.get(pts_c, 0)) if pts_c else 0
-
-    return bat_score, bowl_score, field_score, mvp_score
-
-@st.cache_data(show_spinner=False)
-def build_player_ratings():
-    s1_maps = build_component_scores(
-        pd.read_csv(S01["bat"]), pd.read_csv(S01["bowl"]), pd.read_csv(S01["field"]), pd.read_csv(S01["mvp"])
-    )
-    s2_maps = build_component_scores(
-        pd.read_csv(S02["bat"]), pd.read_csv(S02["bowl"]), pd.read_csv(S02["field"]), pd.read_csv(S02["mvp"])
-    )
-
-    players = sorted(set().union(*[set(d.keys()) for d in s1_maps], *[set(d.keys()) for d in s2_maps]))
-
-    def blended(comp_idx):
-        v1 = pd.Series({p: float(s1_maps[comp_idx].get(p, 0)) for p in players})
-        v2 = pd.Series({p: float(s2_maps[comp_idx].get(p, 0)) for p in players})
-        z1 = zscore(v1); z2 = zscore(v2)
-        return ((1 - W_RECENT)*z1 + W_RECENT*z2).replace([np.inf, -np.inf], 0).fillna(0)
-
-    bat_z, bowl_z, field_z, mvp_z = blended(0), blended(1), blended(2), blended(3)
-    rating = (W_BAT*bat_z) + (W_BOWL*bowl_z) + (W_FIELD*field_z) + (W_MVP*mvp_z)
-    rating = rating.replace([np.inf, -np.inf], 0).fillna(0)
-
-    return pd.DataFrame({"player": players, "rating": rating.values}).set_index("player")
-
-def get_logo(team_name: str):
-    fn = TEAM_LOGOS.get(team_name)
-    if not fn:
-        return None
-    path = os.path.join(LOGO_DIR, fn)
-    if os.path.exists(path):
-        return Image.open(path)
-    return None
-
-def best_xi(team_squad, ratings_df, n=11):
-    valid = [p for p in team_squad if p in ratings_df.index]
-    valid_sorted = sorted(valid, key=lambda p: float(ratings_df.loc[p, "rating"]), reverse=True)
-    return valid_sorted[:n]
-
-def team_strength(xi, ratings_df):
-    s = 0.0
-    for p in xi:
-        if p in ratings_df.index:
-            v = float(ratings_df.loc[p, "rating"])
-            if not np.isnan(v) and not np.isinf(v):
-                s += v
-    if np.isnan(s) or np.isinf(s):
-        return 0.0
-    return float(s)
+def test_season_weights_default_split():
+    np.testing.assert_allclose(season_weights(2), [0.32, 0.68])
+    assert season_weights(1).tolist() == [1.0] and season_weights(0).size == 0
+
+@pytest.mark.parametrize("n, decay", [(5, 0.5), (4, 0.9), (3, 1.0)])
+def test_season_weights_monotone_and_normalized(n, decay):
+    w = season_weights(n, decay)
+    assert len(w) == n and w.sum() == pytest.approx(1.0)
+    assert (np.diff(w) >= 0).all()                        # oldest first, newest heaviest
+    np.testing.assert_allclose(w[:-1] / w[1:], decay)     # each older season is `decay` of the next
+
 
 # ----------------------------
-# Team Picker (logo tiles)
+# Component scores
 # ----------------------------
-def team_tile_grid(title, teams, selected_key):
-    st.markdown(f"### {title}")
-    st.markdown('<div class="small">Click a logo to select.</div>', unsafe_allow_html=True)
+BAT = pd.DataFrame({
+    "Player": ["Babar Azam (c)", "Shan Masood", "nan"],
+    "Runs": [100, 40, 5], "SR": [150, 80, 50], "Avg": [25, 20, 5], "Inns": [4, 0, 1], "50s": [1, 0, 0], "100s": [0, 0, 0],
+})
+BOWL = pd.DataFrame({
+    "Player": ["Shaheen Afridi"], "Wkts": [10], "Econ": [7.5], "Avg": [15], "SR": [12], "Mat": [5],
+})
+FIELD = pd.DataFrame({"Player": ["Babar Azam", "Shan Masood"], "Catches": [3, 1], "Run Out": [1, 0]})
+MVP = pd.DataFrame({"Player": ["Babar Azam"], "Points": [42.5]})
+
+def test_build_component_scores_by_name():
+    bat, bowl, field, mvp = build_component_scores(BAT, BOWL, FIELD, MVP)
+    assert set(bat) == {"babar azam", "shan masood"}   # blank/"nan" names are skipped
+    assert bat["babar azam"] == pytest.approx(100 + 150 * 0.6 + 25 * 0.8 + 10 + np.log(5) * 2)
+    assert bat["shan masood"] == pytest.approx(40 + 80 * 0.6 + 20 * 0.8 + np.log(2) * 2)   # innings floored at 1
+    assert bowl["shaheen afridi"] == pytest.approx(250 + np.log(6) * 2 - 60 - 9 - 4.8)
+    assert field == {"babar azam": 34.0, "shan masood": 8.0}
+    assert mvp == {"babar azam": 42.5}
+
+def test_build_component_scores_by_pid():
+    pids = [np.array([7, 8, NO_PID]), np.array([9]), np.array([7, NO_PID]), np.array([7])]
+    bat, bowl, field, mvp = build_component_scores(BAT, BOWL, FIELD, MVP, pids=pids)
+    by_name = build_component_scores(BAT, BOWL, FIELD, MVP)
+    assert bat == {7: by_name[0]["babar azam"], 8: by_name[0]["shan masood"]}
+    assert bowl == {9: by_name[1]["shaheen afridi"]}
+    assert field == {7: 34.0}
+    assert mvp == {7: 42.5}
 
-    cols = st.columns(4)
-    for i, t in enumerate(teams):
-        col = cols[i % 4]
-        with col:
-            selected = (st.session_state.get(selected_key) == t)
 
-            # Tile container
-            tile_class = "tile tileSelected" if selected else "tile"
-            st.markdown(f'<div class="{tile_class}">', unsafe_allow_html=True)
+# ----------------------------
+# XI solver
+# ----------------------------
+def test_solve_xi_meets_minimums():
+    ratings = [9, 8, 7, 1, 0.5]
+    flags = {"bowler": [False, False, False, True, True]}
+    picked, shortfall = solve_xi(ratings, flags, {"bowler": 2}, size=3)
+    assert picked == [0, 3, 4]
+    assert shortfall == {"bowler": 0}
 
-            logo = get_logo(t)
-            if logo:
-                st.image(logo, use_container_width=True)
-            else:
-                st.caption("Logo missing")
+def test_solve_xi_best_effort_when_infeasible():
+    ratings = [5, float("nan"), 3, 4]
+    flags = {"keeper": [False, False, True, False], "bowler": [False, True, False, False]}
+    picked, shortfall = solve_xi(ratings, flags, {"keeper": 2, "bowler": 1}, size=3)
+    assert picked == [0, 2, 1]                   # nan rates 0 but is the only bowler
+    assert shortfall == {"keeper": 1, "bowler": 0}
+
+def test_solve_xi_without_minimums_is_top_k():
+    picked, shortfall = solve_xi([1, 5, 3, 4], {}, {}, size=2)
+    assert picked == [1, 3] and shortfall == {}
+
+
+# ----------------------------
+# Mapper watermark
+# ----------------------------
+@pytest.fixture
+def league():
+    _, apps = load_compliance_log(COMPLIANCE_XLSX)
+    return load_squads(), apps
 
-            st.markdown(f'<div class="tileName">{t}</div>', unsafe_allow_html=True)
+def _frame(df):
+    return df.sort_values(["MatchID", "Team", "Player"]).reset_index(drop=True)
 
-            # Button under logo (keeps UX consistent)
-            if st.button("Select", key=f"{selected_key}_{t}", use_container_width=True):
-                st.session_state[selected_key] = t
+def test_mapper_incremental_equals_rebuild(league):
+    squads, apps = league
+    last = apps["MatchID"].max()
+    first = mapper.update_mappings(squads, apps[apps["MatchID"] < last], rebuild=True)
+    assert first["rebuilt"] and first["saved"]
+
+    step = mapper.update_mappings(squads, apps)
+    assert not step["rebuilt"]
+    assert step["new_rows"] == int((apps["MatchID"] == last).sum())
+
+    full = mapper.update_mappings(squads, apps, rebuild=True)
+    pd.testing.assert_frame_equal(_frame(step["appearances"]), _frame(full["appearances"]))
+    assert mapper.update_mappings(squads, apps)["new_rows"] == 0   # up to date: nothing mapped
+
+def test_mapper_late_row_forces_rebuild(league):
+    squads, apps = league
+    mapper.update_mappings(squads, apps, rebuild=True)
+    late = apps[apps["MatchID"] == apps["MatchID"].min()].head(1).assign(Player="Late Entry")
+    out = mapper.update_mappings(squads, pd.concat([apps, late], ignore_index=True))
+    assert out["rebuilt"]
+    assert len(out["appearances"]) == len(apps) + 1
+
+
+# ----------------------------
+# Compliance matrix
+# ----------------------------
+def test_build_compliance_matrix():
+    squad = pd.DataFrame({
+        "Player": ["Zain", "Ali", "Bilal", "Danish"],
+        "TRole": ["Batter", "Bowler", "Batter", "Batter"],
+        "player_id": ["p1", "p2", None, "p4"],
+        "player_name_key": ["zain", "ali", "bilal", "danish"],
+    })
+    apps = pd.DataFrame({
+        "MatchID": [10, 12, 11, 10, 11, 12, 99, 10],
+        "player_id": ["p1", "p1", None, None, None, None, "p4", None],
+        "player_name_key": ["zed", "zed", "ali", "bilal", "bilal", "bilal", "danish", "zain"],
+    })
+    labels = {10: "vs A", 11: "vs B", 12: "vs C"}
+    out = build_compliance_matrix(squad, apps, [10, 11, 12], labels)
+
+    assert out.columns.tolist() == ["Player's Name", "TRole", "vs A", "vs B", "vs C", "Matches Played", "Total Team Matches"]
+    assert out["Player's Name"].tolist() == ["Bilal", "Danish", "Zain", "Ali"]   # by TRole, then Player
+    assert out[["vs A", "vs B", "vs C"]].values.tolist() == [
+        ["✅", "✅", "✅"],   # no pid: matched on name key
+        ["❌", "❌", "❌"],   # only appeared outside the team's matches
+        ["✅", "❌", "✅"],   # pid hits win over the stray name-key row
+        ["❌", "✅", "❌"],   # pid with no hits falls back to the name key
+    ]
+    assert out["Matches Played"].tolist() == [3, 0, 2, 1]
+    assert out["Total Team Matches"].tolist() == [3, 3, 3, 3]
+
+
+# ----------------------------
+# Rating index
+# ----------------------------
+RATINGS = pd.DataFrame({"rating": [10.0, 5.5, np.nan, 2.0]}, index=["Babar Azam", "Shan Masood", "Newbie", "Imad Wasim"])
+
+def test_rating_index_lookups():
+    index = RatingIndex(RATINGS)
+    assert "Babar Azam" in index and "Nobody" not in index
+    assert index.ids(["Imad Wasim", "Nobody", "Babar Azam"]).tolist() == [3, -1, 0]
+    assert index.rating(["Shan Masood", "Newbie", "Nobody"]).tolist() == [5.5, 0.0, 0.0]   # nan and unknown rate 0
+    assert index.strength(["Babar Azam", "Shan Masood", "Nobody"]) == 15.5
+
+def test_rating_index_many_xis():
+    index = RatingIndex(RATINGS)
+    xis = [["Babar Azam", "Imad Wasim"], ["Shan Masood"], []]
+    ids = index.id_matrix(xis)
+    assert ids.tolist() == [[0, 3], [1, -1], [-1, -1]]
+    assert index.strengths(xis).tolist() == index.strengths(ids).tolist() == [12.0, 5.5, 0.0]
+    assert index.strengths(xis).tolist() == [index.strength(xi) for xi in xis]
+
+def test_rating_index_team_ids_and_memo():
+    squads = pd.DataFrame({"Team": ["B", "A", "A"], "Player": ["Nobody", "Imad Wasim", "Babar Azam"]})
+    index = RatingIndex(RATINGS, squads)
+    assert {t: ids.tolist() for t, ids in index.team_ids.items()} == {"A": [3, 0], "B": [-1]}
+    assert rating_index(RATINGS) is rating_index(RATINGS)
+    assert rating_index(RATINGS.copy()) is not rating_index(RATINGS)
 
-            st.markdown("</div>", unsafe_allow_html=True)
 
 # ----------------------------
-# XI Selector (table + checkbox)
+# Matchup matrix
 # ----------------------------
-def xi_editor(team_name, squad, ratings_df, state_key):
-    # Initialize XI
-    if state_key not in st.session_state:
-        st.session_state[state_key] = best_xi(squad, ratings_df, 11)
-
-    search = st.text_input(f"Search players ({team_name})", "", key=f"search_{state_key}")
-
-    df = pd.DataFrame({"Player": squad})
-    df["Rating"] = df["Player"].apply(lambda p: float(ratings_df.loc[p, "rating"]) if p in ratings_df.index else 0.0)
-    df["In XI"] = df["Player"].isin(st.session_state[state_key])
-
-    df = df.sort_values("Rating", ascending=False).reset_index(drop=True)
-
-    if search.strip():
-        s = search.strip().lower()
-        df = df[df["Player"].str.lower().str.contains(s)].reset_index(drop=True)
-
-    edited = st.data_editor(
-        df,
-        use_container_width=True,
-        hide_index=True,
-        column_config={
-            "In XI": st.column_config.CheckboxColumn("In XI"),
-            "Rating": st.column_config.NumberColumn("Rating", format="%.2f"),
-        },
-        disabled=["Player", "Rating"],
-        height=380
-    )
-
-    chosen = edited.loc[edited["In XI"] == True, "Player"].tolist()
-
-    # Enforce max 11 (if user checks >11, keep best 11 by rating)
-    if len(chosen) > 11:
-        # keep top 11 by rating from the FULL squad dataframe
-        full = pd.DataFrame({"Player": squad})
-        full["Rating"] = full["Player"].apply(lambda p: float(ratings_df.loc[p, "rating"]) if p in ratings_df.index else 0.0)
-        keep = full[full["Player"].isin(chosen)].sort_values("Rating", ascending=False)["Player"].tolist()[:11]
-        chosen = keep
-        st.warning("You selected more than 11. I kept the best 11 (by rating).")
-
-    st.session_state[state_key] = chosen
-
-    st.caption(f"Selected: {len(chosen)}/11")
-    return chosen
+def test_matchup_matrix_is_consistent():
+    mm = matchup_matrix()
+    p = mm["p"]
+    assert list(p.index) == list(p.columns) == mm["teams"] == list(mm["strength"].index)
+    assert len(mm["teams"]) == load_squads()["Team"].nunique()
+    assert np.isnan(np.diag(p)).all()
+
+    off = ~np.eye(len(p), dtype=bool)
+    np.testing.assert_allclose((p + p.T).to_numpy()[off], 1.0)   # p_a + p_b == 1 for every pair
+
+    ratings, _ = build_player_ratings_and_components()
+    xis = best_xis(load_squads(), ratings, 11)
+    a, b = mm["teams"][:2]
+    assert p.loc[a, b] == pytest.approx(predict_match(xis[a], xis[b], ratings)["p_a"])
+
+def test_matchup_snapshot_round_trip(tmp_path):
+    mm = matchup_matrix()
+    path = str(tmp_path / "matchups_test.npz")
+    assert load_matchup_snapshot(path) is None
+    save_matchup_snapshot(path, mm)
+    snap = load_matchup_snapshot(path)
+    assert snap["teams"] == mm["teams"]
+    pd.testing.assert_series_equal(snap["strength"], mm["strength"])
+    pd.testing.assert_frame_equal(snap["p"], mm["p"])
+    assert os.listdir(tmp_path) == ["matchups_test.npz"]   # no temp file left behind
+
+
+# ----------------------------
+# Season projection
+# ----------------------------
+TEAMS = ["Kemari Kings", "Lyari Lions", "Malir Mavericks", "Saddar Stars"]
+FIXTURES = [
+    ("Kemari Kings", "Lyari Lions", "Kemari won by 8 wickets"),
+    ("Malir Mavericks", "Saddar Stars", "Match tied"),
+    ("Kemari Kings", "Malir Mavericks", None),
+    ("Lyari Lions", "Saddar Stars", ""),
+    ("Kemari Kings", "Nowhere XI", "Kemari Kings won by 1 run"),   # unknown team: ignored
+]
+
+@pytest.mark.parametrize("result, outcome", [
+    ("Kemari won by 8 wickets", 1),
+    ("Lyari Lions won by 12 runs", 2),
+    ("No result (rain)", "shared"),
+    (None, None),
+    (float("nan"), None),
+    ("  ", None),
+])
+def test_parse_result(result, outcome):
+    assert parse_result(result, "Kemari Kings", "Lyari Lions") == outcome
+
+def test_season_state():
+    state = season_state(FIXTURES, TEAMS)
+    assert state["points"].tolist() == [2, 0, 1, 1]
+    assert state["played"].tolist() == [1, 1, 1, 1]
+    assert list(zip(state["home"].tolist(), state["away"].tolist())) == [(0, 2), (1, 3)]
+
+def test_simulate_season():
+    state = season_state(FIXTURES, TEAMS)
+    sure = simulate_season(state, [1.0, 0.0], n_runs=2000, seed=1, workers=1, top=2)
+    assert sure["exp_points"].tolist() == [4, 0, 1, 3]   # Kemari beat Malir, Saddar beat Lyari
+    assert sure["p_first"].tolist() == [1, 0, 0, 0] and sure["p_qualify"].tolist() == [1, 0, 0, 1]
+
+    out = simulate_season(state, [0.5, 0.5], n_runs=3000, seed=7, workers=1, top=2)
+    assert out["n_runs"] == 3000
+    np.testing.assert_allclose(out["pos_probs"].sum(axis=0), 1.0)
+    np.testing.assert_allclose(out["pos_probs"].sum(axis=1), 1.0)
+    assert out["p_qualify"].sum() == pytest.approx(2.0)
+    again = simulate_season(state, [0.5, 0.5], n_runs=3000, seed=7, workers=1, top=2)
+    np.testing.assert_array_equal(out["pos_probs"], again["pos_probs"])
+
 
 # ----------------------------
-# App
+# CLI error rows
 # ----------------------------
-tab_pred, tab_rec = st.tabs(["Predictions", "Recommendations"])
+def test_predict_stream_reports_bad_rows():
+    predictor = Predictor()
+    a, b = sorted(predictor.best)[:2]
+    lines = [
+        json.dumps({"team_a": a, "team_b": b}),
+        "{not json",
+        "",
+        "[1, 2]",
+        json.dumps({"team_a": "Nowhere XI", "team_b": b}),
+    ]
+    out = list(predict_stream(read_fixtures(io.StringIO("\n".join(lines)), "jsonl"), predictor))
+
+    assert len(out) == 4
+    assert "error" not in out[0] and 0 < out[0]["p_a"] < 1
+    assert out[1]["line"] == 2 and "error" in out[1]
+    assert out[2] == {"line": 4, "error": "fixture must be a JSON object, not list"}
+    assert out[3]["line"] == 5 and out[3]["team_a"] == "Nowhere XI" and "unknown team" in out[3]["error"]
+
+@pytest.mark.parametrize("xi, error", [
+    ("Nobody Here|Foo", "not in the"),
+    (5, "not int"),
+    ("[not json", "xi_a:"),
+    (lambda xi: xi[:10], "needs 11 players, got 10"),
+    (lambda xi: xi[:10] + xi[:1], "listed twice"),
+])
+def test_predict_rejects_bad_xi(xi, error):
+    predictor = Predictor()
+    a, b = sorted(predictor.best)[:2]
+    given = xi(predictor.best[a]) if callable(xi) else xi
+    out = next(predict_stream([{"team_a": a, "team_b": b, "xi_a": given}], predictor))
+    assert "p_a" not in out and error in out["error"]
+
+def test_predict_accepts_full_squad_xi():
+    predictor = Predictor()
+    a, b = sorted(predictor.best)[:2]
+    given = "|".join(p.upper() for p in predictor.best[a])   # spelled differently, same people
+    out = next(predict_stream([{"team_a": a, "team_b": b, "xi_a": given}], predictor))
+    assert out["xi_a"] == predictor.best[a] and "error" not in out
 
-with tab_pred:
-    squads_df = load_squads()
-    ratings = build_player_ratings()
 
-    teams = sorted(squads_df["Team"].unique().tolist())
-
-    with st.container(border=True):
-        st.subheader("Team Selection")
-
-        cA, cB = st.columns(2)
-        with cA:
-            team_tile_grid("Team A", teams, "team_a")
-        with cB:
-            team_tile_grid("Team B", teams, "team_b")
-
-        sel_a = st.session_state.get("team_a")
-        sel_b = st.session_state.get("team_b")
-
-        go_disabled = (not sel_a) or (not sel_b) or (sel_a == sel_b)
-
-        if sel_a and sel_b and sel_a == sel_b:
-            st.warning("Select two different teams.")
-
-        go = st.button("Go", type="primary", use_container_width=True, disabled=go_disabled)
-
-    if "go_done" not in st.session_state:
-        st.session_state.go_done = False
-
-    if go:
-        st.session_state.go_done = True
-
-        # reset XI when teams change
-        for k in ["xi_a", "xi_b"]:
-            if k in st.session_state:
-                del st.session_state[k]
-
-    if st.session_state.go_done:
-        team_a = st.session_state.get("team_a")
-        team_b = st.session_state.get("team_b")
-
-        if not team_a or not team_b or team_a == team_b:
-            st.stop()
-
-        squad_a = squads_df.loc[squads_df["Team"] == team_a, "Player"].tolist()
-        squad_b = squads_df.loc[squads_df["Team"] == team_b, "Player"].tolist()
-
-        with st.container(border=True):
-            st.subheader("Playing XI")
-            st.markdown('<div class="small">Tick players in XI (exactly 11). Use Auto-pick buttons for speed.</div>', unsafe_allow_html=True)
-
-            b1, b2, b3 = st.columns([1, 1, 1])
-            with b1:
-                if st.button("Auto-pick Best XI (Team A)", use_container_width=True):
-                    st.session_state["xi_a"] = best_xi(squad_a, ratings, 11)
-            with b2:
-                if st.button("Auto-pick Best XI (Team B)", use_container_width=True):
-                    st.session_state["xi_b"] = best_xi(squad_b, ratings, 11)
-            with b3:
-                if st.button("Reset Both", use_container_width=True):
-                    st.session_state["xi_a"] = best_xi(squad_a, ratings, 11)
-                    st.session_state["xi_b"] = best_xi(squad_b, ratings, 11)
-
-            left, right = st.columns(2)
-
-            with left:
-                with st.container(border=True):
-                    logo = get_logo(team_a)
-                    if logo:
-                        st.image(logo, width=90)
-                    st.markdown(f"### {team_a}")
-                    xi_a = xi_editor(team_a, squad_a, ratings, "xi_a")
-
-            with right:
-                with st.container(border=True):
-                    logo = get_logo(team_b)
-                    if logo:
-                        st.image(logo, width=90)
-                    st.markdown(f"### {team_b}")
-                    xi_b = xi_editor(team_b, squad_b, ratings, "xi_b")
-
-        can_predict = (len(st.session_state.get("xi_a", [])) == 11 and len(st.session_state.get("xi_b", [])) == 11)
-
-        with st.container(border=True):
-            predict = st.button("Predict", type="primary", use_container_width=True, disabled=not can_predict)
-            if not can_predict:
-                st.warning("Select exactly 11 players for both teams.")
-
-        if predict:
-            xi_a = st.session_state["xi_a"]
-            xi_b = st.session_state["xi_b"]
-
-            sA = team_strength(xi_a, ratings)
-            sB = team_strength(xi_b, ratings)
-
-            pA = sigmoid((sA - sB) / PROB_SCALE)
-            pB = 1 - pA
-
-            r1, r2 = st.columns(2)
-            with r1:
-                with st.container(border=True):
-                    st.markdown(f"### {team_a}")
-                    st.metric("Win %", f"{int(round(pA*100))}%")
-                    st.caption(f"XI strength: {sA:.2f}")
-
-            with r2:
-                with st.container(border=True):
-                    st.markdown(f"### {team_b}")
-                    st.metric("Win %", f"{int(round(pB*100))}%")
-                    st.caption(f"XI strength: {sB:.2f}")
-
-with tab_rec:
-    with st.container(border=True):
-        st.subheader("Recommendations")
-        st.caption("Tell me what you want here (batting order, bowling plan, field positions), I’ll implement next.")
+# ----------------------------
+# Service
+# ----------------------------
+def test_service_rejects_bad_content_length():
+    async def ask(port, head):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(head)
+        writer.write_eof()
+        reply = await asyncio.wait_for(reader.read(), 30)
+        writer.close()
+        return reply.split(b"\r\n", 1)[0].decode()
+
+    async def run():
+        service = PredictionService()
+        await service.start()
+        server = await asyncio.start_server(service.handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            return [await ask(port, f"POST /predict HTTP/1.1\r\nContent-Length: {n}\r\n\r\n".encode())
+                    for n in ("abc", "-5", MAX_BODY + 1)]
+        finally:
+            server.close()
+            service._watcher.cancel()
+
+    assert asyncio.run(run()) == [
+        "HTTP/1.1 400 Bad Request", "HTTP/1.1 400 Bad Request", "HTTP/1.1 413 Payload Too Large",
+    ]
+
+
+# ----------------------------
+# Monte Carlo seeds
+# ----------------------------
+def _sim_team(rpb, pout):
+    ones = np.ones(11)
+    return {"bat_rpb": rpb * ones, "bat_pout": pout * ones, "bowl_runs": ones, "bowl_wkts": ones, "field": 1.0}
+
+def test_simulate_match_same_seed_same_result():
+    a, b = _sim_team(1.2, 0.05), _sim_team(1.0, 0.06)
+    one, two = simulate_match(a, b, n_sims=2000, seed=11), simulate_match(a, b, n_sims=2000, seed=11)
+    assert one["p_a"] == two["p_a"] and one["p_tie"] == two["p_tie"]
+    np.testing.assert_array_equal(one["scores_a"], two["scores_a"])
+    np.testing.assert_array_equal(one["scores_b"], two["scores_b"])
+
+def test_simulate_match_different_seeds_differ():
+    a, b = _sim_team(1.2, 0.05), _sim_team(1.0, 0.06)
+    one, two = simulate_match(a, b, n_sims=2000, seed=11), simulate_match(a, b, n_sims=2000, seed=12)
+    assert not np.array_equal(one["scores_a"], two["scores_a"])
+
+def test_simulate_match_probabilities():
+    out = simulate_match(_sim_team(1.2, 0.05), _sim_team(1.0, 0.06), n_sims=2001, seed=3)
+    assert out["p_a"] + out["p_b"] == pytest.approx(1.0)
+    assert 0.0 <= out["p_tie"] <= 1.0 and len(out["scores_a"]) == 2001
+    lo, hi = out["p_a_ci"]
+    assert 0.0 <= lo <= out["p_a"] <= hi <= 1.0
+
+def test_simulate_xi_match_is_seeded():
+    best = Predictor().best
+    a, b = sorted(best)[:2]
+    one = simulate_xi_match(best[a], best[b], n_sims=2000, seed=5)
+    two = simulate_xi_match(best[a], best[b], n_sims=2000, seed=5)
+    other = simulate_xi_match(best[a], best[b], n_sims=2000, seed=6)
+    assert one["p_a"] == two["p_a"] and one["p_a"] + one["p_b"] == pytest.approx(1.0)
+    np.testing.assert_array_equal(one["scores_a"], two["scores_a"])
+    assert not np.array_equal(one["scores_a"], other["scores_a"])